@@ -10,12 +10,32 @@ from laika_pipeline.api import (
     load_assets,
     add_asset,
     add_asset_version,
+    publish_next_version,
     list_assets,
     list_asset_versions,
+    iter_assets,
+    iter_asset_versions,
+    list_assets_page,
+    list_asset_versions_page,
     get_asset,
     get_asset_version,
+    get_assets_bulk,
+    get_asset_versions_bulk,
+    get_latest_version,
+    get_latest_versions,
+    set_version_status,
+    set_version_status_bulk,
     save,
     load,
+    refresh,
+    export,
+    export_manifest,
+    import_manifest,
+    snapshot,
+    check_integrity,
+    prune_versions,
+    subscribe,
+    serve_events,
     get_validation_errors,
     clear,
     get_project,
@@ -36,12 +56,32 @@ __all__ = [
     "load_assets",
     "add_asset",
     "add_asset_version",
+    "publish_next_version",
     "list_assets",
     "list_asset_versions",
+    "iter_assets",
+    "iter_asset_versions",
+    "list_assets_page",
+    "list_asset_versions_page",
     "get_asset",
     "get_asset_version",
+    "get_assets_bulk",
+    "get_asset_versions_bulk",
+    "get_latest_version",
+    "get_latest_versions",
+    "set_version_status",
+    "set_version_status_bulk",
     "save",
     "load",
+    "refresh",
+    "export",
+    "export_manifest",
+    "import_manifest",
+    "snapshot",
+    "check_integrity",
+    "prune_versions",
+    "subscribe",
+    "serve_events",
     "get_validation_errors",
     "clear",
     "get_project",
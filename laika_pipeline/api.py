@@ -7,10 +7,15 @@ complexity of Project management and provides a clean interface. I still
 allow to access the underlying Project instance for advanced use cases.
 """
 
-from typing import Optional
+from typing import Iterable, Iterator, Optional
 from laika_pipeline.pipeline.asset import Asset
 from laika_pipeline.pipeline.asset_version import AssetVersion
+from laika_pipeline.pipeline.status import Status
+from laika_pipeline.pipeline.events import (
+    ChangeType, EventSocketServer, Subscription)
 from laika_pipeline.pipeline.project import Project
+from laika_pipeline.pipeline.retention import RetentionPolicy
+from laika_pipeline.pipeline.snapshot import ProjectSnapshot
 from laika_pipeline.db.storage_backend import StorageBackend
 
 
@@ -48,7 +53,9 @@ def _ensure_initialized() -> None:
 
 
 def load_assets(
-        file_path: str
+        file_path: str,
+        trusted: bool = False,
+        sort: bool = False
 ) -> dict:
     """
     Load assets and versions from a JSON file.
@@ -57,8 +64,16 @@ def load_assets(
     file, validates each entry, and stores valid assets. Invalid entries are
     skipped and logged in the validation errors.
 
+    Trusted files, e.g. restored from a backup, skip the contextual checks
+    entry by entry and are checked by a single consistency sweep afterwards,
+    whose violations are logged in the validation errors.
+
     Args:
         file_path (str): Path to the JSON file containing assets.
+        trusted (bool): Defer the contextual checks. Defaults to False.
+        sort (bool): Order each asset's versions per department before
+            validating, accepting complete manifests listed out of order.
+            Defaults to False.
 
     Returns:
         dict: Report containing:
@@ -72,7 +87,7 @@ def load_assets(
         >>> print(f"Loaded {report['valid']} valid assets")
     """
     _ensure_initialized()
-    _project.load_assets(file_path)
+    _project.load_assets(file_path, trusted, sort)
 
     # Return a report-style dict
     return {
@@ -144,6 +159,55 @@ def add_asset_version(asset_version: AssetVersion) -> dict:
     }
 
 
+def publish_next_version(
+        asset_name: str,
+        asset_type: str,
+        department: str,
+        status: str = "active"
+) -> dict:
+    """
+    Add the next version of an asset in a department, allocating its number
+    atomically. With a storage backend the number is taken from the head
+    stored by the backend, so threads and processes publishing to the same
+    storage each get their own, and the version is saved right away.
+
+    Args:
+        asset_name (str): The name of the asset.
+        asset_type (str): The type of the asset.
+        department (str): The department of the new version.
+        status (str): The status of the new version. Defaults to "active".
+
+    Returns:
+        dict: Operation result with:
+            - 'success': Whether the operation succeeded
+            - 'asset_code': The asset code (if successful)
+            - 'version': The allocated version number (if successful)
+            - 'fetched': Number of versions other publishers stored since
+              the project was loaded, now added to it (if successful)
+            - 'error': Error message (if failed)
+
+    Example:
+        >>> from laika_pipeline.api import publish_next_version
+        >>> result = publish_next_version("hero", "character", "modeling")
+        >>> print(f"Published v{result['version']}")
+    """
+    _ensure_initialized()
+    try:
+        result = _project.publish_next_version(
+            asset_name, asset_type, department, status)
+    except Exception as e:
+        return {'success': False, 'asset_code': None, 'version': None,
+                'fetched': None, 'error': str(e)}
+    data = result.data or {}
+    return {
+        'success': result.success,
+        'asset_code': data.get('asset_code'),
+        'version': data.get('version'),
+        'fetched': data.get('fetched'),
+        'error': result.error_message
+    }
+
+
 def list_assets() -> list[Asset]:
     """
     List all assets in the project.
@@ -187,10 +251,182 @@ def list_asset_versions(
     if not asset:
         return []
 
-    return [
-        av for av in _project.asset_versions
-        if av.asset == asset.code
-    ]
+    return list(_project.iter_asset_versions(asset.code))
+
+
+def iter_assets(
+    offset: int = 0,
+    limit: Optional[int] = None,
+    after: Optional[str] = None
+) -> Iterator[Asset]:
+    """
+    Lazily iterate over the assets in the project, ordered by asset code.
+
+    Args:
+        offset (int): Number of assets to skip. Defaults to 0.
+        limit (int, optional): Maximum number of assets to yield.
+        after (str, optional): Cursor, only yield assets whose code sorts
+            after this one.
+
+    Returns:
+        Iterator[Asset]: Generator over the requested assets.
+
+    Raises:
+        ValueError: if offset or limit is negative
+
+    Example:
+        >>> from laika_pipeline.api import iter_assets
+        >>> for asset in iter_assets(offset=100, limit=50):
+        ...     print(asset.code)
+    """
+    _ensure_initialized()
+    error = _paging_error(offset, limit, min_limit=0)
+    if error:
+        raise ValueError(error)
+    return _project.iter_assets(offset=offset, limit=limit, after=after)
+
+
+def iter_asset_versions(
+    asset_name: str,
+    asset_type: str,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    after: Optional[tuple[str, int]] = None
+) -> Iterator[AssetVersion]:
+    """
+    Lazily iterate over the versions of an asset, ordered by
+    (department, version).
+
+    Args:
+        asset_name (str): Name of the asset.
+        asset_type (str): Type of the asset.
+        offset (int): Number of versions to skip. Defaults to 0.
+        limit (int, optional): Maximum number of versions to yield.
+        after (tuple[str, int], optional): Cursor (department, version), only
+            yield versions that sort after it.
+
+    Returns:
+        Iterator[AssetVersion]: Generator over the requested versions, empty
+            if the asset is not found.
+
+    Raises:
+        ValueError: if offset or limit is negative
+
+    Example:
+        >>> from laika_pipeline.api import iter_asset_versions
+        >>> for version in iter_asset_versions("hero", "character", limit=10):
+        ...     print(version.department, version.version)
+    """
+    _ensure_initialized()
+    error = _paging_error(offset, limit, min_limit=0)
+    if error:
+        raise ValueError(error)
+    asset = _project.get_asset(asset_name, asset_type)
+    if not asset:
+        return iter(())
+    cursor = (asset.code, *after) if after is not None else None
+    return _project.iter_asset_versions(
+        asset.code, offset=offset, limit=limit, after=cursor)
+
+
+def list_assets_page(
+    limit: int = 100,
+    after: Optional[str] = None
+) -> dict:
+    """
+    Retrieve one page of assets using cursor based pagination.
+
+    Args:
+        limit (int): Page size, at least 1. Defaults to 100.
+        after (str, optional): Cursor returned as 'next_cursor' by the
+            previous page, None for the first page.
+
+    Returns:
+        dict: Page with:
+            - 'success': False if the limit is invalid
+            - 'items': List of assets in this page
+            - 'next_cursor': Cursor for the next page, None on the last page
+            - 'error': Error message (if failed)
+
+    Example:
+        >>> from laika_pipeline.api import list_assets_page
+        >>> page = list_assets_page(limit=50)
+        >>> while page['items']:
+        ...     page = list_assets_page(50, after=page['next_cursor'])
+    """
+    _ensure_initialized()
+    error = _paging_error(limit=limit)
+    if error:
+        return {'success': False, 'items': [], 'next_cursor': None,
+                'error': error}
+    items = list(_project.iter_assets(limit=limit + 1, after=after))
+    has_more = len(items) > limit
+    items = items[:limit]
+    return {
+        'success': True,
+        'items': items,
+        'next_cursor': items[-1].code if has_more else None,
+        'error': None
+    }
+
+
+def list_asset_versions_page(
+    asset_name: str,
+    asset_type: str,
+    limit: int = 100,
+    after: Optional[tuple[str, int]] = None
+) -> dict:
+    """
+    Retrieve one page of versions of an asset using cursor based pagination.
+
+    Args:
+        asset_name (str): Name of the asset.
+        asset_type (str): Type of the asset.
+        limit (int): Page size, at least 1. Defaults to 100.
+        after (tuple[str, int], optional): Cursor returned as 'next_cursor'
+            by the previous page, None for the first page.
+
+    Returns:
+        dict: Page with:
+            - 'success': False if the limit is invalid
+            - 'items': List of asset versions in this page
+            - 'next_cursor': (department, version) cursor for the next page,
+              None on the last page
+            - 'error': Error message (if failed)
+    """
+    _ensure_initialized()
+    error = _paging_error(limit=limit)
+    if error:
+        return {'success': False, 'items': [], 'next_cursor': None,
+                'error': error}
+    items = list(iter_asset_versions(
+        asset_name, asset_type, limit=limit + 1, after=after))
+    has_more = len(items) > limit
+    items = items[:limit]
+    return {
+        'success': True,
+        'items': items,
+        'next_cursor': (
+            (items[-1].department, items[-1].version) if has_more else None
+        ),
+        'error': None
+    }
+
+
+def _paging_error(
+    offset: int = 0,
+    limit: Optional[int] = None,
+    min_limit: int = 1
+) -> Optional[str]:
+    """Return why paging arguments are invalid, None if they are valid."""
+    if isinstance(offset, bool) or not isinstance(offset, int) or offset < 0:
+        return f"offset must be an integer of at least 0, not {offset!r}"
+    if limit is not None and (isinstance(limit, bool)
+                              or not isinstance(limit, int)
+                              or limit < min_limit):
+        return (f"limit must be an integer of at least {min_limit}, not "
+                f"{limit!r}")
+    return None
 
 
 def get_asset(
@@ -243,10 +479,253 @@ def get_asset_version(
     return _project.get_asset_version(asset_name, asset_type, version_num)
 
 
-def save() -> dict:
+def get_assets_bulk(keys: Iterable[tuple[str, str]]) -> dict:
+    """
+    Retrieve many assets by (asset_name, asset_type) in a single pass.
+
+    Unlike get_asset, misses are reported in the result rather than added
+    to the validation errors.
+
+    Args:
+        keys (Iterable[tuple[str, str]]): (asset_name, asset_type) tuples.
+
+    Returns:
+        dict: Lookup result with:
+            - 'results': Assets aligned with the input keys, None on a miss
+            - 'missing': List of the keys that were not found
+
+    Example:
+        >>> from laika_pipeline.api import get_assets_bulk
+        >>> found = get_assets_bulk([("hero", "character"), ("sword", "prop")])
+        >>> hero, sword = found['results']
+    """
+    _ensure_initialized()
+    results, missing = _project.get_assets_bulk(keys)
+    return {'results': results, 'missing': missing}
+
+
+def get_asset_versions_bulk(keys: Iterable[tuple[str, str, int]]) -> dict:
+    """
+    Retrieve many asset versions by (asset_name, asset_type, version_num) in
+    a single pass.
+
+    Unlike get_asset_version, misses are reported in the result rather than
+    added to the validation errors.
+
+    Args:
+        keys (Iterable[tuple[str, str, int]]): (asset_name, asset_type,
+            version_num) tuples.
+
+    Returns:
+        dict: Lookup result with:
+            - 'results': Asset versions aligned with the input keys, None on
+              a miss
+            - 'missing': List of the keys that were not found
+
+    Example:
+        >>> from laika_pipeline.api import get_asset_versions_bulk
+        >>> found = get_asset_versions_bulk([("hero", "character", 2)])
+        >>> if not found['missing']:
+        ...     print(found['results'][0].status.value)
+    """
+    _ensure_initialized()
+    results, missing = _project.get_asset_versions_bulk(keys)
+    return {'results': results, 'missing': missing}
+
+
+def get_latest_version(
+    asset_name: str,
+    asset_type: str,
+    department: str,
+    status: Optional[str | Status] = None
+) -> AssetVersion | None:
+    """
+    Retrieve the latest version of an asset in a department.
+
+    The latest versions are cached per (asset, department, status) and kept
+    up to date on every add and status change, so this is a dictionary hit.
+
+    Args:
+        asset_name (str): Name of the asset.
+        asset_type (str): Type of the asset.
+        department (str): Department of the version.
+        status (str | Status, optional): Only consider versions with this
+            status (e.g. 'active'). None considers every version.
+
+    Returns:
+        AssetVersion | None: The latest version if found, None otherwise.
+
+    Example:
+        >>> from laika_pipeline.api import get_latest_version
+        >>> latest = get_latest_version(
+        ...     "hero", "character", "modeling", status="active")
+    """
+    _ensure_initialized()
+    asset = _project.find_asset(asset_name, asset_type)
+    if not asset:
+        return None
+    return _project.get_latest_version(asset.code, department, status)
+
+
+def get_latest_versions(
+    keys: Iterable[tuple[str, str, str]],
+    status: Optional[str | Status] = None
+) -> list[AssetVersion | None]:
+    """
+    Resolve the latest version of many (asset_name, asset_type, department)
+    keys at once, e.g. every asset of a shot.
+
+    Args:
+        keys (Iterable[tuple[str, str, str]]): (asset_name, asset_type,
+            department) tuples to resolve.
+        status (str | Status, optional): Only consider versions with this
+            status. None considers every version.
+
+    Returns:
+        list[AssetVersion | None]: The latest versions aligned with the input
+            keys, None where nothing matches. All None for an invalid status,
+            like get_latest_version.
+
+    Example:
+        >>> from laika_pipeline.api import get_latest_versions
+        >>> shot = [("hero", "character", "rigging"),
+        ...         ("sword", "prop", "modeling")]
+        >>> versions = get_latest_versions(shot, status="active")
+    """
+    _ensure_initialized()
+    keys = list(keys)
+    if isinstance(status, str):
+        status, _ = Status.from_string(status)
+        # None would consider every version
+        if status is None:
+            return [None] * len(keys)
+    results = []
+    for asset_name, asset_type, department in keys:
+        asset = _project.find_asset(asset_name, asset_type)
+        results.append(
+            _project.get_latest_version(asset.code, department, status)
+            if asset else None
+        )
+    return results
+
+
+def set_version_status(
+        asset_name: str,
+        asset_type: str,
+        department: str,
+        version_num: int,
+        status: str | Status
+) -> dict:
+    """
+    Change the status of an asset version, e.g. deprecate it. The latest
+    version caches are updated and the next save writes only this version.
+
+    Args:
+        asset_name (str): Name of the asset.
+        asset_type (str): Type of the asset.
+        department (str): Department of the version.
+        version_num (int): Version number to change.
+        status (str | Status): The new status.
+
+    Returns:
+        dict: Operation result with:
+            - 'success': Whether the operation succeeded
+            - 'asset_code': The asset code (if successful)
+            - 'version': The version number (if successful)
+            - 'status': The new status (if successful)
+            - 'error': Error message (if failed)
+
+    Example:
+        >>> from laika_pipeline.api import set_version_status
+        >>> result = set_version_status(
+        ...     "hero", "character", "modeling", 2, "deprecated")
+    """
+    _ensure_initialized()
+    asset = _project.find_asset(asset_name, asset_type)
+    if asset is None:
+        return {
+            'success': False, 'asset_code': None, 'version': None,
+            'status': None,
+            'error': (f"Asset '{asset_name}' of type '{asset_type}' not "
+                      f"found in project.")
+        }
+    result = _project.set_version_status(
+        AssetVersion(asset.code, department, version_num), status)
+    data = result.data or {}
+    return {
+        'success': result.success,
+        'asset_code': data.get('asset_code'),
+        'version': data.get('version'),
+        'status': data.get('status'),
+        'error': result.error_message
+    }
+
+
+def set_version_status_bulk(
+        status: str | Status,
+        asset_name: Optional[str] = None,
+        asset_type: Optional[str] = None,
+        department: Optional[str] = None,
+        older_than: Optional[int] = None,
+        current_status: Optional[str | Status] = None
+) -> dict:
+    """
+    Change the status of every asset version matching the filters in one
+    pass, e.g. deprecate every modeling version below 10. Versions already
+    in the status are left alone.
+
+    Args:
+        status (str | Status): The new status.
+        asset_name (str, optional): Only versions of this asset, with
+            asset_type. None for every asset.
+        asset_type (str, optional): Type of the asset.
+        department (str, optional): Only versions of this department.
+        older_than (int, optional): Only versions numbered below this.
+        current_status (str | Status, optional): Only versions currently in
+            this status.
+
+    Returns:
+        dict: Operation result with:
+            - 'success': Whether the operation succeeded
+            - 'changed': Number of versions whose status changed
+            - 'error': Error message (if failed)
+
+    Example:
+        >>> from laika_pipeline.api import set_version_status_bulk
+        >>> result = set_version_status_bulk(
+        ...     "deprecated", department="modeling", older_than=10)
+        >>> print(f"Deprecated {result['changed']} versions")
+    """
+    _ensure_initialized()
+    asset_codes = None
+    if asset_name is not None:
+        asset = _project.find_asset(asset_name, asset_type)
+        if asset is None:
+            return {
+                'success': False,
+                'changed': 0,
+                'error': (f"Asset '{asset_name}' of type '{asset_type}' not "
+                          f"found in project.")
+            }
+        asset_codes = [asset.code]
+    result = _project.set_version_status_bulk(
+        status, asset_codes, department, older_than, current_status)
+    return {
+        'success': result.success,
+        'changed': result.data.get('changed', 0) if result.data else 0,
+        'error': result.error_message
+    }
+
+
+def save(full: bool = False) -> dict:
     """
     Save the project to the configured storage backend.
 
+    Args:
+        full (bool): Write every record instead of the ones added or changed
+            since the last load or save, overwriting the stored ones.
+            Defaults to False.
+
     Returns:
         dict: Operation result with:
             - 'success': Whether the save succeeded
@@ -260,7 +739,7 @@ def save() -> dict:
     """
     _ensure_initialized()
     try:
-        _project.save()
+        _project.save(full)
         return {'success': True, 'error': None}
     except Exception as e:
         return {'success': False, 'error': str(e)}
@@ -289,6 +768,311 @@ def load() -> dict:
         return {'success': False, 'error': str(e)}
 
 
+def refresh() -> dict:
+    """
+    Merge assets and versions that other processes saved to the storage
+    backend since the last load() or refresh().
+
+    Only new or changed storage files are read, so the cost scales with the
+    amount of change rather than with the project size. Records already in
+    the project are kept.
+
+    Returns:
+        dict: Operation result with:
+            - 'success': Whether the refresh succeeded
+            - 'assets': Number of new assets merged
+            - 'asset_versions': Number of new asset versions merged
+            - 'status_changes': Number of status changes applied
+            - 'error': Error message (if failed)
+
+    Example:
+        >>> from laika_pipeline.api import refresh
+        >>> result = refresh()
+        >>> print(f"{result['asset_versions']} new versions")
+    """
+    _ensure_initialized()
+    try:
+        result = _project.refresh()
+        return {'success': True, **result.data, 'error': None}
+    except Exception as e:
+        return {'success': False, 'error': str(e)}
+
+
+def export(
+    file_path: str,
+    format: str = 'jsonl',
+    record_type: str = 'asset_versions'
+) -> dict:
+    """
+    Export every asset or asset version to a JSON Lines or CSV file.
+
+    Records are streamed straight from the storage backend one at a time,
+    so memory use does not grow with the project size. Save first to
+    include unsaved changes. Without a storage backend the in-memory
+    records are exported.
+
+    Args:
+        file_path (str): Path of the file to write.
+        format (str): 'jsonl' or 'csv'. Defaults to 'jsonl'.
+        record_type (str): 'assets' or 'asset_versions'. Defaults to
+            'asset_versions'.
+
+    Returns:
+        dict: Operation result with:
+            - 'success': Whether the export succeeded
+            - 'count': Number of exported records
+            - 'error': Error message (if failed)
+
+    Example:
+        >>> from laika_pipeline.api import export
+        >>> result = export("versions.csv", format="csv")
+        >>> print(f"{result['count']} versions exported")
+    """
+    _ensure_initialized()
+    try:
+        with open(file_path, 'w', newline='') as stream:
+            result = _project.export(stream, format, record_type)
+        if not result.success:
+            return {'success': False, 'count': 0,
+                    'error': result.error_message}
+        return {'success': True, 'count': result.data['count'],
+                'error': None}
+    except Exception as e:
+        return {'success': False, 'count': 0, 'error': str(e)}
+
+
+def export_manifest(file_path: str) -> dict:
+    """
+    Export every asset version to a manifest file, the JSON format read by
+    load_assets and import_manifest.
+
+    Entries are streamed from the storage backend one at a time, save first
+    to include unsaved changes.
+
+    Args:
+        file_path (str): Path of the manifest to write.
+
+    Returns:
+        dict: Operation result with:
+            - 'success': Whether the export succeeded
+            - 'count': Number of exported entries
+            - 'orphans': Number of versions left out because their asset is
+              unknown
+            - 'error': Error message (if failed)
+
+    Example:
+        >>> from laika_pipeline.api import export_manifest
+        >>> result = export_manifest("show_manifest.json")
+    """
+    _ensure_initialized()
+    try:
+        with open(file_path, 'w') as stream:
+            result = _project.export_manifest(stream)
+        return {'success': True, **result.data, 'error': None}
+    except Exception as e:
+        return {'success': False, 'count': 0, 'orphans': 0, 'error': str(e)}
+
+
+def import_manifest(file_path: str, trusted: bool = False) -> dict:
+    """
+    Add the entries of a manifest file to the project.
+
+    Untrusted manifests are validated entry by entry like load_assets. Use
+    trusted=True for manifests exported from another project or backend to
+    skip validation and import millions of versions in seconds.
+
+    Args:
+        file_path (str): Path of the manifest.
+        trusted (bool): Skip validation. Defaults to False.
+
+    Returns:
+        dict: Operation result with:
+            - 'success': Whether the import succeeded
+            - 'assets': Number of added assets
+            - 'asset_versions': Number of added asset versions
+            - 'error': Error message (if failed)
+
+    Example:
+        >>> from laika_pipeline.api import import_manifest, save
+        >>> import_manifest("show_manifest.json", trusted=True)
+        >>> save()
+    """
+    _ensure_initialized()
+    try:
+        result = _project.import_manifest(file_path, trusted)
+        return {'success': True, **result.data, 'error': None}
+    except Exception as e:
+        return {'success': False, 'assets': 0, 'asset_versions': 0,
+                'error': str(e)}
+
+
+def snapshot() -> ProjectSnapshot:
+    """
+    Take a frozen, read-only view of the project. Queries and exports on the
+    snapshot are not affected by records added or statuses changed
+    afterwards, e.g. by another thread.
+
+    Returns:
+        ProjectSnapshot: the snapshot, close it once done
+
+    Example:
+        >>> from laika_pipeline.api import snapshot
+        >>> with snapshot() as view, open('versions.jsonl', 'w') as stream:
+        ...     view.export(stream)
+    """
+    _ensure_initialized()
+    return _project.snapshot()
+
+
+def check_integrity(from_storage: bool = False) -> dict:
+    """
+    Check the project for gaps in version sequences, duplicate keys, versions
+    whose asset is missing and assets without versions.
+
+    Args:
+        from_storage (bool): Stream the records from the storage backend
+            instead of checking the loaded project. Defaults to False.
+
+    Returns:
+        dict: Result containing:
+            - 'success': True if no violation was found
+            - 'report': the report dict ('ok', 'assets', 'asset_versions' and
+              'violations' grouped by rule), None if nothing was checked
+            - 'error': Error message if unsuccessful
+
+    Example:
+        >>> from laika_pipeline.api import check_integrity
+        >>> result = check_integrity(from_storage=True)
+        >>> for rule, violations in result['report']['violations'].items():
+        ...     print(f"{rule}: {len(violations)}")
+    """
+    _ensure_initialized()
+    result = _project.check_integrity(from_storage)
+    return {
+        'success': result.success,
+        'report': result.data["report"].to_dict() if result.data else None,
+        'error': result.error_message
+    }
+
+
+def prune_versions(
+        keep_last: int = 10,
+        statuses: Iterable[str | Status] = ('deprecated',),
+        asset_name: Optional[str] = None,
+        asset_type: Optional[str] = None,
+        archive_path: Optional[str] = None,
+        dry_run: bool = False
+) -> dict:
+    """
+    Delete old asset versions from the project and its storage backend: per
+    asset and department the last keep_last versions and the latest active
+    version are kept, older versions in one of the statuses are pruned.
+
+    Args:
+        keep_last (int): Versions kept per asset and department, at least 1.
+            Defaults to 10.
+        statuses (Iterable[str | Status]): Statuses of the versions that may
+            be pruned. Defaults to deprecated only.
+        asset_name (str, optional): Only prune versions of this asset, with
+            asset_type. None for every asset.
+        asset_type (str, optional): Type of the asset.
+        archive_path (str, optional): JSON Lines file the pruned versions
+            are appended to before they are deleted.
+        dry_run (bool): Only report what would be pruned. Defaults to False.
+
+    Returns:
+        dict: Result containing:
+            - 'success': Whether the operation succeeded
+            - 'report': the report dict ('checked', 'pruned', 'archived',
+              'bytes_reclaimed', 'estimated_load_seconds', 'dry_run' and
+              'keys'), None if nothing was pruned
+            - 'error': Error message if unsuccessful
+
+    Example:
+        >>> from laika_pipeline.api import prune_versions
+        >>> result = prune_versions(keep_last=5, archive_path='archive.jsonl')
+        >>> print(f"Freed {result['report']['bytes_reclaimed']} bytes")
+    """
+    _ensure_initialized()
+    try:
+        policy = RetentionPolicy(keep_last, tuple(statuses))
+    except ValueError as e:
+        return {'success': False, 'report': None, 'error': str(e)}
+    asset_codes = None
+    if asset_name is not None:
+        asset = _project.find_asset(asset_name, asset_type)
+        if asset is None:
+            return {
+                'success': False,
+                'report': None,
+                'error': (f"Asset '{asset_name}' of type '{asset_type}' not "
+                          f"found in project.")
+            }
+        asset_codes = [asset.code]
+    result = _project.prune(policy, asset_codes, archive_path, dry_run)
+    return {
+        'success': result.success,
+        'report': result.data["report"].to_dict() if result.data else None,
+        'error': result.error_message
+    }
+
+
+def subscribe(
+    maxsize: int = 1000,
+    change_types: Optional[Iterable[ChangeType]] = None
+) -> Subscription:
+    """
+    Subscribe to the change events of the current project.
+
+    Events are delivered to a bounded in-process queue; when it is full the
+    oldest events are dropped. Subscriptions belong to the current project
+    and stop receiving events after clear() or initialize().
+
+    Args:
+        maxsize (int): Maximum number of queued events. Defaults to 1000.
+        change_types (Iterable[ChangeType], optional): Only receive these
+            kinds of events. None receives every event.
+
+    Returns:
+        Subscription: Queue to read ChangeEvent objects from.
+
+    Example:
+        >>> from laika_pipeline.api import subscribe
+        >>> from laika_pipeline.pipeline.events import ChangeType
+        >>> subscription = subscribe(change_types=[ChangeType.VERSION_ADDED])
+        >>> event = subscription.get(timeout=5)
+    """
+    _ensure_initialized()
+    return _project.events.subscribe(maxsize, change_types)
+
+
+def serve_events(address: str | tuple[str, int]) -> EventSocketServer:
+    """
+    Fan the current project's change events out over a local socket so
+    other processes can react to new versions instead of polling storage.
+
+    Args:
+        address (str | tuple[str, int]): Unix socket path, or (host, port)
+            for TCP. Use port 0 to pick a free port.
+
+    Returns:
+        EventSocketServer: The started server, call stop() when done.
+
+    Raises:
+        FileExistsError: if a file other than a socket is at the path.
+
+    Example:
+        >>> from laika_pipeline.api import serve_events
+        >>> from laika_pipeline.pipeline.events import iter_socket_events
+        >>> server = serve_events("/tmp/laika_events.sock")
+        >>> # In another process:
+        >>> for event in iter_socket_events("/tmp/laika_events.sock"):
+        ...     print(event.change_type.value, event.data)
+    """
+    _ensure_initialized()
+    return EventSocketServer(_project.events, address).start()
+
+
 def get_validation_errors() -> list[str]:
     """
     Get all validation errors from the current session.
@@ -9,6 +9,9 @@ import laika_pipeline as lp
 from laika_pipeline.lib.load_json import load_json
 from laika_pipeline.db.storage_json import StorageJSON
 
+# Number of lines printed before the list commands wait for the user
+PAGE_SIZE = 50
+
 
 def parse_args():
     parser = argparse.ArgumentParser()
@@ -23,11 +26,17 @@ def parse_args():
         ' directory (for JSON storage) or a single JSON file from which to'
         'load assets and versions'
     )
+    parser.add_argument(
+        '--poll',
+        action='store_true',
+        help='Poll the JSON storage directory for changes instead of using'
+        ' inotify, for network filesystems written by other hosts'
+    )
     return parser.parse_args()
 
 
 def cmd_load(args):
-    """Load assets from a JSON file."""
+    """Load assets from a JSON file, optionally sorting the versions."""
     if not args:
         print("Error: load requires a file path")
         return
@@ -35,8 +44,9 @@ def cmd_load(args):
     if not os.path.exists(filepath):
         print(f"Error: File not found: {filepath}")
         return
+    sort = len(args) > 1 and args[1] == 'sort'
     try:
-        report = lp.load_assets(filepath)
+        report = lp.load_assets(filepath, sort=sort)
         print(f"Loaded {report['valid']} valid assets")
         if report['errors']:
             print(f"{len(report['errors'])} errors during load:")
@@ -86,16 +96,48 @@ def cmd_get(args):
         print(f"Asset not found: {name} ({asset_type})")
 
 
+def _parse_page_size(args):
+    """Return the page size given as first argument, or the default one."""
+    if args:
+        try:
+            return max(int(args[0]), 1)
+        except ValueError:
+            print(f"Invalid page size '{args[0]}', using {PAGE_SIZE}")
+    return PAGE_SIZE
+
+
+def _print_paged(lines, page_size=PAGE_SIZE):
+    """
+    Print lines from an iterator one page at a time, waiting for the user
+    between pages so large listings neither build big lists nor flood the
+    terminal.
+
+    Returns:
+        int: the number of lines printed
+    """
+    count = 0
+    for line in lines:
+        if count and count % page_size == 0:
+            answer = input(f"-- {count} shown, Enter for more, "
+                           f"'q' to stop -- ")
+            if answer.strip().lower() == 'q':
+                break
+        print(line)
+        count += 1
+    return count
+
+
 def cmd_list(args):
-    """List all assets."""
-    assets = lp.list_assets()
-    if not assets:
+    """List all assets, one page at a time."""
+    lines = (
+        f"  - {asset.name} ({asset.asset_type.value}) [code: {asset.code}]"
+        for asset in lp.iter_assets()
+    )
+    count = _print_paged(lines, _parse_page_size(args))
+    if not count:
         print("No assets loaded.")
         return
-    print(f"{len(assets)} assets:")
-    for asset in assets:
-        print(f"  - {asset.name} ({asset.asset_type.value})"
-              f" [code: {asset.code}]")
+    print(f"{count} assets listed.")
 
 
 def cmd_versions_add(args):
@@ -141,6 +183,76 @@ def cmd_versions_add(args):
         print(f"Error adding version: {e}")
 
 
+def cmd_versions_publish(args):
+    """Publish the next version of an asset in a department."""
+    if len(args) < 3:
+        print("Error: versions publish requires "
+              "<asset_name> <asset_type> <department> [status]")
+        return
+    asset_name, asset_type, department = args[0], args[1], args[2]
+    status = args[3] if len(args) > 3 else 'active'
+    result = lp.publish_next_version(
+        asset_name, asset_type, department, status)
+    if result['success']:
+        print(f"Published {result['asset_code']} {department} "
+              f"v{result['version']}")
+    else:
+        print(f"Failed to publish version: {result['error']}")
+
+
+def cmd_versions_status(args):
+    """Change the status of an asset version."""
+    if len(args) < 5:
+        print("Error: versions status requires "
+              "<asset_name> <asset_type> <department> <version> <status>")
+        return
+    asset_name, asset_type, department = args[0], args[1], args[2]
+    try:
+        version_num = int(args[3])
+    except ValueError:
+        print("Error: version must be an integer")
+        return
+    result = lp.set_version_status(
+        asset_name, asset_type, department, version_num, args[4])
+    if result['success']:
+        print(f"{result['asset_code']} {department} v{result['version']} "
+              f"is now {result['status']}")
+    else:
+        print(f"Failed to change status: {result['error']}")
+
+
+def cmd_versions_prune(args):
+    """Delete deprecated versions older than the last N of each department,
+    optionally archiving them, 'dry' only reports them."""
+    if not args:
+        print("Error: versions prune requires <keep_last> [archive_file] [dry]")
+        return
+    try:
+        keep_last = int(args[0])
+    except ValueError:
+        print("Error: keep_last must be an integer")
+        return
+    dry_run = 'dry' in args[1:]
+    archive = [arg for arg in args[1:] if arg != 'dry']
+    result = lp.prune_versions(
+        keep_last, archive_path=archive[0] if archive else None,
+        dry_run=dry_run)
+    if not result['success']:
+        print(f"Failed to prune versions: {result['error']}")
+        return
+    report = result['report']
+    if dry_run:
+        print(f"Would prune {report['pruned']} of {report['checked']} "
+              f"versions, saving an estimated "
+              f"{report['estimated_load_seconds']:.2f}s per load")
+        return
+    print(f"Pruned {report['pruned']} of {report['checked']} versions, "
+          f"freed {report['bytes_reclaimed']} bytes and an "
+          f"estimated {report['estimated_load_seconds']:.2f}s per load")
+    if report['archived']:
+        print(f"Archived {report['archived']} versions to {archive[0]}")
+
+
 def cmd_versions_get(args):
     """Get a specific asset version."""
     if len(args) < 3:
@@ -166,18 +278,20 @@ def cmd_versions_get(args):
 
 
 def cmd_versions_list(args):
-    """List all versions of an asset."""
+    """List all versions of an asset, one page at a time."""
     if len(args) < 2:
         print("Error: versions list requires <asset_name> <asset_type>")
         return
     asset_name, asset_type = args[0], args[1]
-    versions = lp.list_asset_versions(asset_name, asset_type)
-    if not versions:
+    lines = (
+        f"  v{v.version} - {v.department} - {v.status.value}"
+        for v in lp.iter_asset_versions(asset_name, asset_type)
+    )
+    count = _print_paged(lines, _parse_page_size(args[2:]))
+    if not count:
         print(f"No versions found for {asset_name} ({asset_type})")
         return
-    print(f"{len(versions)} versions of {asset_name} ({asset_type}):")
-    for v in sorted(versions, key=lambda x: x.version):
-        print(f"  v{v.version} - {v.department} - {v.status.value}")
+    print(f"{count} versions of {asset_name} ({asset_type}) listed.")
 
 
 def cmd_save(args):
@@ -199,6 +313,95 @@ def cmd_load_project(args):
         print(f"Failed to load project: {result['error']}")
 
 
+def cmd_refresh(args):
+    """Merge changes other processes saved to storage."""
+    result = lp.refresh()
+    if result['success']:
+        print(f"Refreshed: {result['assets']} new assets, "
+              f"{result['asset_versions']} new versions, "
+              f"{result['status_changes']} status changes")
+    else:
+        print(f"Failed to refresh project: {result['error']}")
+
+
+def cmd_export(args):
+    """Export assets or asset versions to a JSON Lines or CSV file."""
+    if not args:
+        print("Error: export requires <file> [jsonl|csv] [assets|versions]")
+        return
+    export_format = args[1] if len(args) > 1 else 'jsonl'
+    record_type = 'assets' if len(args) > 2 and args[2] == 'assets' \
+        else 'asset_versions'
+    result = lp.export(args[0], export_format, record_type)
+    if result['success']:
+        print(f"Exported {result['count']} records to {args[0]}")
+    else:
+        print(f"Failed to export: {result['error']}")
+
+
+def cmd_export_manifest(args):
+    """Export every asset version to a manifest file."""
+    if not args:
+        print("Error: export_manifest requires <file>")
+        return
+    result = lp.export_manifest(args[0])
+    if result['success']:
+        print(f"Exported {result['count']} versions to {args[0]}")
+    else:
+        print(f"Failed to export manifest: {result['error']}")
+
+
+def cmd_import_manifest(args):
+    """Add the entries of a manifest file, optionally without validation."""
+    if not args:
+        print("Error: import_manifest requires <file> [trusted]")
+        return
+    trusted = len(args) > 1 and args[1] == 'trusted'
+    result = lp.import_manifest(args[0], trusted)
+    if result['success']:
+        print(f"Imported {result['assets']} assets and "
+              f"{result['asset_versions']} versions")
+    else:
+        print(f"Failed to import manifest: {result['error']}")
+
+
+def cmd_fsck(args):
+    """Check the project, or its storage with 'storage', for integrity."""
+    from_storage = bool(args) and args[0] == 'storage'
+    result = lp.check_integrity(from_storage)
+    report = result['report']
+    if report is None:
+        print(f"Failed to check integrity: {result['error']}")
+        return
+    print(f"Checked {report['assets']} assets and "
+          f"{report['asset_versions']} versions")
+    if report['ok']:
+        print("No integrity problems found")
+        return
+    for rule, violations in report['violations'].items():
+        print(f"{len(violations)} {rule} violations:")
+        for violation in violations[:5]:
+            print(f"  - {violation['message']}")
+        if len(violations) > 5:
+            print(f"  ... and {len(violations) - 5} more")
+
+
+def cmd_migrate_layout(args):
+    """Move the JSON storage files to another directory layout."""
+    if not args or args[0] not in ('flat', 'hashed'):
+        print("Error: migrate_layout requires <flat|hashed>")
+        return
+    storage = lp.get_project().storage_backend
+    if not isinstance(storage, StorageJSON):
+        print("Error: migrate_layout requires a JSON storage directory")
+        return
+    try:
+        moved = storage.migrate_layout(args[0])
+        print(f"Moved {moved} files to the '{args[0]}' layout")
+    except Exception as e:
+        print(f"Error migrating layout: {e}")
+
+
 def cmd_errors(args):
     """Show validation errors."""
     errors = lp.get_validation_errors()
@@ -215,15 +418,24 @@ def cmd_errors(args):
 def cmd_help(args):
     help_text = """
     Available commands:
-    load <file.json>                           Load assets from JSON file
+    load <file.json> [sort]                    Load assets from JSON file, sort accepts out of order versions
     add <asset.json>                           Add a new asset from JSON file
     get <asset_name> <type>                    Get an asset by name and type
-    list                                       List all assets
+    list [page_size]                           List all assets, paged
     versions add <asset_name> <asset_type> <version.json>   Add a version for an asset
+    versions publish <asset_name> <asset_type> <department> [status]   Publish the next version
+    versions status <asset_name> <asset_type> <department> <version> <status>   Change a version's status
+    versions prune <keep_last> [archive_file] [dry]          Delete deprecated versions older than the last N
     versions get <asset_name> <asset_type> <version>        Get a specific asset version
-    versions list <asset_name> <asset_type>                 List all versions of an asset
+    versions list <asset_name> <asset_type> [page_size]     List all versions of an asset, paged
     save                                       Save project to storage
     load_project                               Load project from storage
+    refresh                                    Merge changes saved by other processes
+    export <file> [jsonl|csv] [assets|versions]   Stream stored records to a file
+    export_manifest <file>                     Export versions in the load format
+    import_manifest <file> [trusted]           Add a manifest, trusted skips validation
+    fsck [storage]                             Check the project or its storage for integrity
+    migrate_layout <flat|hashed>               Move storage files to another layout
     errors                                     Show validation errors
     help                                       Show this help message
     exit                                       Exit the CLI
@@ -261,6 +473,12 @@ def interactive_loop():
         'versions': None,  # Special handling
         'save': cmd_save,
         'load_project': cmd_load_project,
+        'refresh': cmd_refresh,
+        'export': cmd_export,
+        'export_manifest': cmd_export_manifest,
+        'import_manifest': cmd_import_manifest,
+        'fsck': cmd_fsck,
+        'migrate_layout': cmd_migrate_layout,
         'errors': cmd_errors,
         'help': cmd_help,
         'exit': None,  # Special handling
@@ -282,6 +500,12 @@ def interactive_loop():
                     match sub_command:
                         case 'add':
                             cmd_versions_add(args[1:])
+                        case 'publish':
+                            cmd_versions_publish(args[1:])
+                        case 'status':
+                            cmd_versions_status(args[1:])
+                        case 'prune':
+                            cmd_versions_prune(args[1:])
                         case 'get':
                             cmd_versions_get(args[1:])
                         case 'list':
@@ -307,7 +531,8 @@ def main():
     try:
         if args.json_path:
             if os.path.isdir(args.json_path):
-                storage = StorageJSON(args.json_path)
+                storage = StorageJSON(
+                    args.json_path, use_inotify=not args.poll)
                 lp.initialize(args.project_name, storage_backend=storage)
                 print(f"Initialized project '{args.project_name}' "
                       f"with storage at '{args.json_path}'")
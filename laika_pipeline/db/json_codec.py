@@ -0,0 +1,148 @@
+import gzip
+import json
+import zlib
+from enum import Enum
+from typing import Any
+
+# NOTE: orjson and ujson are optional, faster drop-in codecs. They are used
+# only when requested and installed, the stdlib json module is the default.
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+try:
+    import ujson
+except ImportError:  # pragma: no cover - depends on the environment
+    ujson = None
+
+
+class Compression(Enum):
+    """
+    Per file compression applied by JSONCodec.
+    """
+
+    NONE = 'none'
+    GZIP = 'gzip'
+    ZLIB = 'zlib'
+
+
+_GZIP_MAGIC = b'\x1f\x8b'
+
+
+def available_codecs() -> list[str]:
+    """
+    Return the names of the JSON codecs usable in this environment.
+    """
+    codecs = ['json']
+    if orjson is not None:
+        codecs.append('orjson')
+    if ujson is not None:
+        codecs.append('ujson')
+    return codecs
+
+
+class JSONCodec:
+    """
+    Encode and decode records stored as JSON files.
+
+    Decoding does not depend on how the codec is configured: the format is
+    recognised from the first bytes of the file (gzip and zlib headers never
+    start a JSON document), so any mix of pretty, compact and compressed
+    files can be read back.
+    """
+
+    def __init__(
+            self,
+            compact: bool = False,
+            compression: str | Compression = Compression.NONE,
+            codec: str = 'json'
+    ):
+        """
+        Args:
+            compact (bool): write JSON without indentation or whitespace
+            compression (str | Compression): 'none', 'gzip' or 'zlib'
+            codec (str): 'json' (stdlib), 'orjson', 'ujson' or 'auto' for
+                         the fastest installed one
+
+        Raises:
+            ValueError: if the compression or codec is unknown or the codec
+                        is not installed
+        """
+        self.compact = compact
+        self.compression = Compression(compression)
+        if codec == 'auto':
+            codec = 'orjson' if orjson is not None else \
+                'ujson' if ujson is not None else 'json'
+        if codec not in ('json', 'orjson', 'ujson'):
+            raise ValueError(f"Unknown JSON codec '{codec}'")
+        if codec not in available_codecs():
+            raise ValueError(f"JSON codec '{codec}' is not installed")
+        self.codec = codec
+
+    def dumps(self, data: Any) -> bytes:
+        """
+        Encode data as uncompressed JSON bytes.
+        """
+        if self.codec == 'orjson':
+            option = 0 if self.compact else orjson.OPT_INDENT_2
+            return orjson.dumps(data, option=option)
+        if self.codec == 'ujson':
+            return ujson.dumps(data, indent=0 if self.compact else 4).encode()
+        if self.compact:
+            return json.dumps(data, separators=(',', ':')).encode()
+        return json.dumps(data, indent=4).encode()
+
+    def dumps_line(self, data: Any) -> bytes:
+        """
+        Encode data as compact JSON on a single line, for JSON Lines files.
+        """
+        if self.codec == 'orjson':
+            return orjson.dumps(data)
+        if self.codec == 'ujson':
+            return ujson.dumps(data).encode()
+        return json.dumps(data, separators=(',', ':')).encode()
+
+    def encode(self, data: Any) -> bytes:
+        """
+        Encode data into the bytes of a file.
+        """
+        raw = self.dumps(data)
+        if self.compression is Compression.GZIP:
+            # mtime=0 keeps the output deterministic
+            return gzip.compress(raw, compresslevel=6, mtime=0)
+        if self.compression is Compression.ZLIB:
+            return zlib.compress(raw, 6)
+        return raw
+
+    def decode(self, raw: bytes) -> Any:
+        """
+        Decode the bytes of a file written with any configuration.
+
+        Raises:
+            ValueError: if the content is not valid (possibly compressed)
+                        JSON
+        """
+        try:
+            if raw[:2] == _GZIP_MAGIC:
+                raw = gzip.decompress(raw)
+            elif _is_zlib(raw):
+                raw = zlib.decompress(raw)
+        except (OSError, EOFError, zlib.error) as e:
+            raise ValueError(f"Corrupt compressed JSON: {e}") from e
+        return self.loads(raw)
+
+    def loads(self, raw: bytes) -> Any:
+        """
+        Decode uncompressed JSON bytes.
+        """
+        if self.codec == 'orjson':
+            return orjson.loads(raw)
+        if self.codec == 'ujson':
+            return ujson.loads(raw)
+        return json.loads(raw)
+
+
+def _is_zlib(raw: bytes) -> bool:
+    """A zlib stream starts with a deflate CMF byte and a checksummed FLG."""
+    return (len(raw) >= 2 and raw[0] & 0x0F == 8
+            and (raw[0] << 8 | raw[1]) % 31 == 0)
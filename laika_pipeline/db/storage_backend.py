@@ -1,10 +1,50 @@
 from abc import ABC, abstractmethod
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Iterable, Iterator
 if TYPE_CHECKING:
     # Avoid circular imports for type hints
     from laika_pipeline.pipeline.asset import Asset
     from laika_pipeline.pipeline.asset_version import AssetVersion
+    from laika_pipeline.db.storage_watcher import ChangeSet
+
+
+class VersionConflictError(Exception):
+    """
+    Raised when publishing asset versions whose numbers another writer has
+    already used, e.g. two processes publishing the next version of the
+    same asset and department at the same time. Reload the asset's
+    versions and publish again under the next free number.
+    """
+
+    def __init__(
+            self,
+            asset_code: str,
+            department: str,
+            versions: list[int],
+            head: int | None = None
+    ):
+        """
+        Args:
+            asset_code (str): the asset of the refused versions
+            department (str): the department of the refused versions
+            versions (list[int]): the refused version numbers
+            head (int | None): the stored head version, if known
+        """
+        self.asset_code = asset_code
+        self.department = department
+        self.versions = versions
+        self.head = head
+        numbers = ', '.join(str(version) for version in versions)
+        if head is None:
+            message = (
+                f"Asset '{asset_code}' in department '{department}' "
+                f"already has version {numbers} in storage.")
+        else:
+            message = (
+                f"Cannot publish version {numbers} of asset '{asset_code}' "
+                f"in department '{department}', the stored head version "
+                f"is {head}. Expected version {head + 1}.")
+        super().__init__(message)
 
 
 class StorageBackend(ABC):
@@ -19,7 +59,7 @@ class StorageBackend(ABC):
         pass
 
     @abstractmethod
-    def load_asset(self):
+    def load_asset(self, asset_code: str) -> 'Asset':
         # Implement logic to retrieve asset from the storage backend
         pass
 
@@ -39,7 +79,12 @@ class StorageBackend(ABC):
         pass
 
     @abstractmethod
-    def load_asset_version(self):
+    def load_asset_version(
+            self,
+            asset_code: str,
+            department: str,
+            version: int
+    ) -> 'AssetVersion':
         # Implement logic to retrieve an asset version from the storage backend
         pass
 
@@ -52,3 +97,214 @@ class StorageBackend(ABC):
     def load_asset_versions(self):
         # Implement logic to retrieve asset versions from the storage backend
         pass
+
+    # --------------------------------------------------------------------------
+    # Batched and streaming reads
+    #
+    # The defaults below are built on the single record methods, backends
+    # override them with batched I/O.
+    # --------------------------------------------------------------------------
+
+    def load_assets_by_code(
+            self,
+            asset_codes: Iterable[str]
+    ) -> dict[str, 'Asset']:
+        """
+        Load several assets at once.
+
+        Args:
+            asset_codes (Iterable[str]): the codes of the assets
+
+        Returns:
+            dict[str, Asset]: the stored assets by code, codes that are not
+                              stored are left out
+        """
+        assets = {}
+        for asset_code in asset_codes:
+            try:
+                assets[asset_code] = self.load_asset(asset_code)
+            except FileNotFoundError:
+                continue
+        return assets
+
+    def load_asset_versions_by_keys(
+            self,
+            keys: Iterable[tuple[str, str, int]]
+    ) -> dict[tuple[str, str, int], 'AssetVersion']:
+        """
+        Load several asset versions at once.
+
+        Args:
+            keys (Iterable[tuple[str, str, int]]): (asset code, department,
+                                                   version) tuples
+
+        Returns:
+            dict: the stored asset versions by key, keys that are not stored
+                  are left out
+        """
+        asset_versions = {}
+        for asset_code, department, version in keys:
+            try:
+                asset_versions[(asset_code, department, version)] = \
+                    self.load_asset_version(asset_code, department, version)
+            except FileNotFoundError:
+                continue
+        return asset_versions
+
+    def publish_asset_versions(
+            self,
+            asset_versions: list['AssetVersion'],
+            skip_identical: bool = False
+    ) -> None:
+        """
+        Save asset versions that must not be stored yet, e.g. the versions a
+        project added since it was loaded. Unlike save_asset_versions, which
+        overwrites, nothing is written if any of them is already stored.
+
+        The default checks then saves, which is not atomic. Backends shared
+        by several writers override it.
+
+        Args:
+            asset_versions (list[AssetVersion]): the new asset versions
+            skip_identical (bool): skip the versions already stored with the
+                                   same content instead of refusing them,
+                                   e.g. when saving a project again. Leave
+                                   it off to allocate version numbers, two
+                                   publishers of the same next version
+                                   would both succeed otherwise.
+
+        Raises:
+            VersionConflictError: if one of the versions is already stored
+        """
+        if skip_identical:
+            asset_versions = self._drop_identical(asset_versions)
+        stored = self.load_asset_versions_by_keys(
+            [(av.asset, av.department, av.version) for av in asset_versions])
+        if stored:
+            asset_code, department, version = min(stored)
+            raise VersionConflictError(asset_code, department, [version])
+        if asset_versions:
+            self.save_asset_versions(asset_versions)
+
+    def _drop_identical(
+            self,
+            asset_versions: list['AssetVersion']
+    ) -> list['AssetVersion']:
+        """ The asset versions that are not stored with the same content.
+        """
+        stored = self.load_asset_versions_by_keys(
+            [(av.asset, av.department, av.version) for av in asset_versions])
+        return [
+            asset_version for asset_version in asset_versions
+            if (record := stored.get((
+                asset_version.asset, asset_version.department,
+                asset_version.version))) is None
+            or record.to_dict() != asset_version.to_dict()
+        ]
+
+    def get_head(self, asset_code: str, department: str) -> int:
+        """
+        Return the highest stored version number of an asset in a
+        department, 0 if it has none. The default scans every stored
+        version, backends override it with an indexed lookup.
+        """
+        return max((av.version for av in self.iter_asset_versions()
+                    if av.asset == asset_code and av.department == department),
+                   default=0)
+
+    def publish_next_version(
+            self,
+            asset_code: str,
+            department: str,
+            status: str = 'active'
+    ) -> 'AssetVersion':
+        """
+        Store the next version of an asset in a department, allocating its
+        number from the stored head so concurrent publishers each get their
+        own. The default retries publish_asset_versions on conflicts, which
+        is only as safe as that method.
+
+        Args:
+            asset_code (str): the code of the asset
+            department (str): the department of the new version
+            status (str): the status of the new version
+
+        Returns:
+            AssetVersion: the stored version
+        """
+        # Imported here for the same reason as the type hints above
+        from laika_pipeline.pipeline.asset_version import AssetVersion
+        while True:
+            asset_version = AssetVersion(
+                asset_code, department,
+                self.get_head(asset_code, department) + 1, status)
+            try:
+                self.publish_asset_versions([asset_version])
+            except VersionConflictError:
+                continue
+            return asset_version
+
+    def delete_asset_versions(
+            self,
+            keys: Iterable[tuple[str, str, int]]
+    ) -> int:
+        """
+        Delete stored asset versions, e.g. the deprecated versions pruned by
+        a retention policy (see pipeline/retention.py). The deleted keys are
+        remembered as pruned, see list_pruned_asset_version_keys, and their
+        numbers are never allocated again by publish_next_version.
+
+        Args:
+            keys (Iterable[tuple[str, str, int]]): (asset code, department,
+                                                   version) tuples
+
+        Returns:
+            int: the number of bytes of record data deleted
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support deleting asset versions")
+
+    def list_pruned_asset_version_keys(self) -> list[tuple[str, str, int]]:
+        """
+        List the (asset, department, version) key of every asset version
+        deleted by delete_asset_versions, so integrity checks do not report
+        their numbers as missing. Backends that cannot delete have none.
+        """
+        return []
+
+    def iter_assets(self) -> Iterator['Asset']:
+        """
+        Yield every stored asset. Backends that can read records one at a
+        time override this to avoid holding them all in memory.
+        """
+        yield from self.load_assets()
+
+    def iter_asset_versions(self) -> Iterator['AssetVersion']:
+        """
+        Yield every stored asset version. Backends that can read records one
+        at a time override this to avoid holding them all in memory.
+        """
+        yield from self.load_asset_versions()
+
+    def watch(self, baseline: bool = True):
+        """
+        Create a watcher reporting changes made to the storage, e.g. by
+        other processes, so a Project can refresh incrementally. Backends
+        that cannot report changes return None and are fully reloaded.
+
+        Args:
+            baseline (bool): if True, records stored now are not reported by
+                             the first poll
+        """
+        return None
+
+    def load_changes(
+            self,
+            changes: 'ChangeSet'
+    ) -> tuple[list['Asset'], list['AssetVersion']]:
+        """
+        Load the assets and asset versions of the changes reported by the
+        watcher returned by watch().
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support incremental changes")
@@ -0,0 +1,315 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from laika_pipeline.db.storage_backend import StorageBackend
+from laika_pipeline.pipeline.asset import Asset
+from laika_pipeline.pipeline.asset_version import AssetVersion
+
+
+# Keys of the listing entries in the cache
+_ALL_ASSETS = ('assets',)
+_ALL_ASSET_VERSIONS = ('asset_versions',)
+
+
+@dataclass
+class CacheStats:
+    """
+    Counters of a CachedStorage, to size its cache per deployment.
+
+    Attributes:
+        hits (int): loads served from the cache
+        misses (int): loads that went to the wrapped backend
+        evictions (int): entries dropped to respect the bounds
+        entries (int): entries currently cached
+        bytes (int): approximate size of the cached records
+    """
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class CachedStorage(StorageBackend):
+    """
+    Read-through LRU cache in front of any StorageBackend. Point loads and
+    the results of load_assets / load_asset_versions are cached, bounded by
+    entry count and approximate size. Saves write through to the wrapped
+    backend and update the cache.
+
+    Records are cached as dictionaries and a new object is built on every
+    hit, so callers mutating what they loaded never corrupt the cache.
+    """
+
+    def __init__(
+            self,
+            backend: StorageBackend,
+            max_entries: int = 10000,
+            max_bytes: int = 64 * 1024 * 1024
+    ):
+        """
+        Args:
+            backend (StorageBackend): the storage to cache
+            max_entries (int): maximum number of cached entries, a listing
+                               counts as one entry
+            max_bytes (int): maximum approximate size of the cached records
+        """
+        self.backend = backend
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # key -> (records, size), records is a dict or a list of dicts
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = CacheStats()
+
+    def __getattr__(self, name):
+        # Backend specific methods (e.g. StorageJSON.migrate_layout) pass
+        # through, uncached
+        if name == 'backend':
+            raise AttributeError(name)
+        return getattr(self.backend, name)
+
+    # --------------------------------------------------------------------------
+    # StorageBackend interface
+    # --------------------------------------------------------------------------
+
+    def save_asset(self, asset: Asset):
+        self.backend.save_asset(asset)
+        self._stored([('asset', asset.code)], [asset.to_dict()])
+
+    def load_asset(self, asset_code: str):
+        record = self._get(('asset', asset_code))
+        if record is None:
+            asset = self.backend.load_asset(asset_code)
+            self._put(('asset', asset_code), asset.to_dict())
+            return asset
+        return Asset.from_dict(record)
+
+    def save_assets(self, assets: list[Asset]):
+        self.backend.save_assets(assets)
+        self._stored([('asset', asset.code) for asset in assets],
+                     [asset.to_dict() for asset in assets])
+
+    def load_assets(self):
+        records = self._get(_ALL_ASSETS)
+        if records is None:
+            assets = self.backend.load_assets()
+            self._put(_ALL_ASSETS, [asset.to_dict() for asset in assets])
+            return assets
+        return [Asset.from_dict(record) for record in records]
+
+    def save_asset_version(self, asset_version: AssetVersion):
+        self.backend.save_asset_version(asset_version)
+        self._stored([self._version_key(asset_version)],
+                     [asset_version.to_dict()])
+
+    def load_asset_version(self,
+                           asset_code: str,
+                           department: str,
+                           version: int):
+        key = ('asset_version', asset_code, department, version)
+        record = self._get(key)
+        if record is None:
+            asset_version = self.backend.load_asset_version(
+                asset_code, department, version)
+            self._put(key, asset_version.to_dict())
+            return asset_version
+        return AssetVersion.from_dict(record)
+
+    def save_asset_versions(self, asset_versions: list[AssetVersion]):
+        self.backend.save_asset_versions(asset_versions)
+        self._stored([self._version_key(av) for av in asset_versions],
+                     [av.to_dict() for av in asset_versions])
+
+    def publish_asset_versions(
+            self,
+            asset_versions: list[AssetVersion],
+            skip_identical: bool = False
+    ):
+        self.backend.publish_asset_versions(asset_versions, skip_identical)
+        self._stored([self._version_key(av) for av in asset_versions],
+                     [av.to_dict() for av in asset_versions])
+
+    def publish_next_version(
+            self,
+            asset_code: str,
+            department: str,
+            status: str = 'active'
+    ) -> AssetVersion:
+        asset_version = self.backend.publish_next_version(
+            asset_code, department, status)
+        self._stored([self._version_key(asset_version)],
+                     [asset_version.to_dict()])
+        return asset_version
+
+    def get_head(self, asset_code: str, department: str) -> int:
+        # Never cached, other writers move it
+        return self.backend.get_head(asset_code, department)
+
+    def delete_asset_versions(self, keys) -> int:
+        keys = [tuple(key) for key in keys]
+        deleted = self.backend.delete_asset_versions(keys)
+        with self._lock:
+            self._discard(_ALL_ASSET_VERSIONS)
+            for key in keys:
+                self._discard(('asset_version',) + key)
+        return deleted
+
+    def list_pruned_asset_version_keys(self):
+        return self.backend.list_pruned_asset_version_keys()
+
+    def load_asset_versions(self):
+        records = self._get(_ALL_ASSET_VERSIONS)
+        if records is None:
+            asset_versions = self.backend.load_asset_versions()
+            self._put(_ALL_ASSET_VERSIONS,
+                      [av.to_dict() for av in asset_versions])
+            return asset_versions
+        return [AssetVersion.from_dict(record) for record in records]
+
+    def load_assets_by_code(self, asset_codes):
+        assets = {}
+        missing = []
+        for asset_code in asset_codes:
+            record = self._get(('asset', asset_code))
+            if record is None:
+                missing.append(asset_code)
+            else:
+                assets[asset_code] = Asset.from_dict(record)
+        if missing:
+            # One batched backend read for every miss
+            for asset_code, asset in \
+                    self.backend.load_assets_by_code(missing).items():
+                self._put(('asset', asset_code), asset.to_dict())
+                assets[asset_code] = asset
+        return assets
+
+    def load_asset_versions_by_keys(self, keys):
+        asset_versions = {}
+        missing = []
+        for key in keys:
+            key = tuple(key)
+            record = self._get(('asset_version',) + key)
+            if record is None:
+                missing.append(key)
+            else:
+                asset_versions[key] = AssetVersion.from_dict(record)
+        if missing:
+            for key, asset_version in \
+                    self.backend.load_asset_versions_by_keys(missing).items():
+                self._put(('asset_version',) + key, asset_version.to_dict())
+                asset_versions[key] = asset_version
+        return asset_versions
+
+    def watch(self, baseline: bool = True):
+        return self.backend.watch(baseline)
+
+    def load_changes(self, changes):
+        assets, asset_versions = self.backend.load_changes(changes)
+        # Records changed by another process replace the cached ones
+        self._stored(
+            [('asset', asset.code) for asset in assets]
+            + [self._version_key(av) for av in asset_versions],
+            [asset.to_dict() for asset in assets]
+            + [av.to_dict() for av in asset_versions]
+        )
+        if changes.removed:
+            self.invalidate()
+        return assets, asset_versions
+
+    # --------------------------------------------------------------------------
+    # Cache management
+    # --------------------------------------------------------------------------
+
+    def stats(self) -> CacheStats:
+        """
+        Return a copy of the cache counters.
+        """
+        with self._lock:
+            return CacheStats(
+                hits=self._stats.hits,
+                misses=self._stats.misses,
+                evictions=self._stats.evictions,
+                entries=len(self._cache),
+                bytes=self._stats.bytes
+            )
+
+    def reset_stats(self) -> None:
+        """
+        Reset the hit, miss and eviction counters.
+        """
+        with self._lock:
+            self._stats.hits = self._stats.misses = self._stats.evictions = 0
+
+    def invalidate(self) -> None:
+        """
+        Drop every cached entry, e.g. after the storage was changed behind
+        the cache's back.
+        """
+        with self._lock:
+            self._cache.clear()
+            self._stats.bytes = 0
+
+    @staticmethod
+    def _version_key(asset_version: AssetVersion) -> tuple:
+        return ('asset_version', asset_version.asset,
+                asset_version.department, asset_version.version)
+
+    def _get(self, key: tuple):
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                self._stats.misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self._stats.hits += 1
+            return entry[0]
+
+    def _put(self, key: tuple, records) -> None:
+        size = _approximate_size(records)
+        with self._lock:
+            self._discard(key)
+            if size > self.max_bytes:
+                return
+            self._cache[key] = (records, size)
+            self._stats.bytes += size
+            while len(self._cache) > self.max_entries or \
+                    self._stats.bytes > self.max_bytes:
+                _, (_, evicted_size) = self._cache.popitem(last=False)
+                self._stats.bytes -= evicted_size
+                self._stats.evictions += 1
+
+    def _discard(self, key: tuple) -> None:
+        entry = self._cache.pop(key, None)
+        if entry is not None:
+            self._stats.bytes -= entry[1]
+
+    def _stored(self, keys: list[tuple], records: list[dict]) -> None:
+        """ Write through: refresh the point entries of saved records that
+            are cached and drop the listings, which are now stale.
+        """
+        with self._lock:
+            self._discard(_ALL_ASSETS)
+            self._discard(_ALL_ASSET_VERSIONS)
+            cached = [(key, record) for key, record in zip(keys, records)
+                      if key in self._cache]
+        for key, record in cached:
+            self._put(key, record)
+
+
+def _approximate_size(records) -> int:
+    """ Rough memory footprint of a record or a list of records, counting
+        the keys and values as text plus a fixed overhead per record.
+    """
+    if isinstance(records, dict):
+        records = [records]
+    return sum(
+        100 + sum(len(key) + len(str(value)) for key, value in record.items())
+        for record in records
+    )
@@ -0,0 +1,230 @@
+import hashlib
+import json
+import os
+
+from laika_pipeline.lib.atomic_write import atomic_write
+
+
+class StorageIndex:
+    """
+    Project wide index of a StorageJSON directory, stored as an append-only
+    JSON Lines file at its root. It maps every asset code and every
+    (asset, department, version) key to the file holding the record, the
+    byte offset of the record in packed files and a content hash, so that
+    enumeration and existence checks never walk the directories.
+
+    Entries are appended before the record files are written: after a crash
+    the index may list a record whose file was never written (readers skip
+    it) but never misses a written record. Other processes' appends are
+    picked up by reading the new tail of the file.
+
+    Asset versions deleted by retention (see pipeline/retention.py) get a
+    removal entry, after their files are deleted. The removed keys are kept
+    as tombstones, so integrity checks know their version numbers were
+    pruned rather than lost.
+    """
+
+    FILE_NAME = 'index.jsonl'
+
+    def __init__(self, root: str):
+        """
+        Args:
+            root (str): the StorageJSON root directory
+        """
+        self.root = root
+        self.path = os.path.join(root, self.FILE_NAME)
+        # code -> (relative path, hash)
+        self.assets = {}
+        # (asset, department, version) -> (relative path, hash, offset)
+        self.versions = {}
+        # (asset, department, version) of the pruned asset versions
+        self.removed = set()
+        self._pending = []
+        self._offset = 0
+        self._inode = None
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    # --------------------------------------------------------------------------
+    # Reading
+    # --------------------------------------------------------------------------
+
+    def sync(self) -> None:
+        """
+        Apply the entries appended to the index file since the last sync,
+        reloading it entirely if it was rewritten.
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self._reset()
+            return
+        if stat.st_ino != self._inode or stat.st_size < self._offset:
+            self._reset()
+            self._inode = stat.st_ino
+        if stat.st_size == self._offset:
+            return
+        with open(self.path, 'rb') as fp:
+            fp.seek(self._offset)
+            data = fp.read()
+        # Only consume complete lines, a concurrent append may be partial
+        end = data.rfind(b'\n') + 1
+        for line in data[:end].split(b'\n'):
+            if line:
+                try:
+                    self._apply(json.loads(line))
+                except (ValueError, KeyError):
+                    continue
+        self._offset += end
+        for entry in self._pending:
+            self._apply(entry)
+
+    def _reset(self) -> None:
+        self.assets = {}
+        self.versions = {}
+        self.removed = set()
+        self._offset = 0
+        self._inode = None
+        # Entries not flushed yet stay visible to this process
+        for entry in self._pending:
+            self._apply(entry)
+
+    def _apply(self, entry: dict) -> None:
+        kind = entry['k']
+        if kind == 'a':
+            self.assets[entry['code']] = (entry['path'], entry['hash'])
+        elif kind == 'v':
+            key = (entry['asset'], entry['department'], entry['version'])
+            self.versions[key] = (
+                entry['path'], entry['hash'], entry.get('offset'))
+            self.removed.discard(key)
+        elif kind == 'rv':
+            key = (entry['asset'], entry['department'], entry['version'])
+            self.versions.pop(key, None)
+            self.removed.add(key)
+
+    def full_path(self, relative_path: str) -> str:
+        return os.path.join(self.root, *relative_path.split('/'))
+
+    def relative_path(self, path: str) -> str:
+        return os.path.relpath(path, self.root).replace(os.sep, '/')
+
+    # --------------------------------------------------------------------------
+    # Writing
+    # --------------------------------------------------------------------------
+
+    @staticmethod
+    def digest(data: bytes) -> str:
+        return hashlib.sha1(data).hexdigest()
+
+    def add_asset(self, code: str, path: str, data: bytes) -> None:
+        entry = {
+            'k': 'a', 'code': code,
+            'path': self.relative_path(path), 'hash': self.digest(data)
+        }
+        self._apply(entry)
+        self._pending.append(entry)
+
+    def add_asset_version(
+            self,
+            key: tuple[str, str, int],
+            path: str,
+            data: bytes,
+            offset: int | None = None
+    ) -> None:
+        asset, department, version = key
+        entry = {
+            'k': 'v', 'asset': asset, 'department': department,
+            'version': version, 'path': self.relative_path(path),
+            'hash': self.digest(data)
+        }
+        if offset is not None:
+            entry['offset'] = offset
+        self._apply(entry)
+        self._pending.append(entry)
+
+    def remove_asset_version(self, key: tuple[str, str, int]) -> None:
+        asset, department, version = key
+        entry = {'k': 'rv', 'asset': asset, 'department': department,
+                 'version': version}
+        self._apply(entry)
+        self._pending.append(entry)
+
+    @property
+    def has_pending(self) -> bool:
+        """Whether entries are waiting to be appended by flush()."""
+        return bool(self._pending)
+
+    def flush(self, fsync: bool = False) -> None:
+        """
+        Append the pending entries to the index file in a single write.
+        """
+        if not self._pending:
+            return
+        self.sync()
+        data = self._encode(self._pending)
+        with open(self.path, 'ab') as fp:
+            fp.write(data)
+            if fsync:
+                fp.flush()
+                os.fsync(fp.fileno())
+        self._pending = []
+        # Our own entries are already applied, skip them on the next sync
+        # unless another process appended in between.
+        stat = os.stat(self.path)
+        if stat.st_size == self._offset + len(data):
+            self._offset = stat.st_size
+            self._inode = stat.st_ino
+
+    def compact(self) -> None:
+        """
+        Atomically rewrite the index file with one entry per live record and
+        pruned key, dropping superseded entries. Must not run while other
+        processes write to the same storage.
+        """
+        self.sync()
+        self.replace(self.assets, self.versions, self.removed)
+
+    def replace(
+            self,
+            assets: dict,
+            versions: dict,
+            removed: set = frozenset()
+    ) -> None:
+        """
+        Atomically replace the whole index, e.g. after rebuilding it from a
+        directory walk.
+
+        Args:
+            assets (dict): code -> (relative path, hash)
+            versions (dict): (asset, department, version) ->
+                             (relative path, hash, offset)
+            removed (set): (asset, department, version) of the pruned asset
+                           versions
+        """
+        entries = []
+        for code, (path, digest) in assets.items():
+            entries.append({'k': 'a', 'code': code, 'path': path,
+                            'hash': digest})
+        for (asset, department, version), (path, digest, offset) \
+                in versions.items():
+            entry = {'k': 'v', 'asset': asset, 'department': department,
+                     'version': version, 'path': path, 'hash': digest}
+            if offset is not None:
+                entry['offset'] = offset
+            entries.append(entry)
+        for asset, department, version in removed:
+            if (asset, department, version) not in versions:
+                entries.append({'k': 'rv', 'asset': asset,
+                                'department': department, 'version': version})
+        self._pending = []
+        atomic_write(self.path, self._encode(entries))
+        self._reset()
+        self.sync()
+
+    @staticmethod
+    def _encode(entries: list[dict]) -> bytes:
+        return b''.join(
+            json.dumps(entry, separators=(',', ':')).encode() + b'\n'
+            for entry in entries)
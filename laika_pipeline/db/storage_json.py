@@ -1,28 +1,167 @@
+from contextlib import contextmanager
+from enum import Enum
 from pathlib import Path
+import hashlib
 import os
-import json
+import time
+from typing import Iterator
 
-from laika_pipeline.db.storage_backend import StorageBackend
+from laika_pipeline.db.storage_backend import (
+    StorageBackend, VersionConflictError
+)
+from laika_pipeline.lib.atomic_write import atomic_write, fsync_directory
+from laika_pipeline.lib.file_lock import FileLock
+from laika_pipeline.db.json_codec import Compression, JSONCodec
+from laika_pipeline.db.storage_index import StorageIndex
+from laika_pipeline.db.storage_watcher import ChangeSet, create_watcher
 
 
 from laika_pipeline.pipeline.asset import Asset
 from laika_pipeline.pipeline.asset_version import AssetVersion
 
 
+class FsyncPolicy(Enum):
+    """
+    When StorageJSON flushes written files to disk.
+
+    NONE: never, rely on the operating system (fastest).
+    BATCH: once per touched directory at the end of save_assets /
+           save_asset_versions. Relies on the filesystem writing file data
+           before a rename is committed (ext4, XFS, APFS, NTFS).
+    FILE: every file and its directory entry on every write (safest).
+    """
+
+    NONE = 'none'
+    BATCH = 'batch'
+    FILE = 'file'
+
+
+class Layout(Enum):
+    """
+    How StorageJSON arranges record files on disk.
+
+    FLAT: assets/<code>.json and
+          asset_versions/<department>/<code>.<version>.json
+    HASHED: the same names fanned out over two levels of hash prefix
+            directories, e.g. assets/3f/a2/<code>.json, keeping directories
+            small on projects with hundreds of thousands of files. All the
+            versions of an asset share one leaf directory per department.
+    """
+
+    FLAT = 'flat'
+    HASHED = 'hashed'
+
+
+class VersionStorage(Enum):
+    """
+    How StorageJSON stores asset versions.
+
+    FILE: one <code>.<version>.json file per version.
+    PACKED: one append-only <code>.jsonl file per asset and department
+            holding one JSON line per version, so publishing appends a line
+            and an asset's history is loaded with a single read. A later
+            line for the same version (e.g. a status change) supersedes the
+            earlier ones.
+    """
+
+    FILE = 'file'
+    PACKED = 'packed'
+
+
 class StorageJSON(StorageBackend):
     """
     A class representing a JSON storage backend for the Project.
     This class implements the StorageBackend interface to save and retrieve
     assets and asset versions from a JSON file.
+
+    Files are written atomically (temporary file + rename), so a killed
+    process never leaves truncated JSON behind.
+
+    An index file at the root (see StorageIndex) lists every record, so
+    loads and existence checks do not walk the directories.
+
+    Several processes, on several hosts, can write to the same directory.
+    They take turns through an advisory lock file at the root, held only
+    while index entries are appended (and packed files, whose offsets the
+    entries record, are appended to). Record files are written outside of
+    it. publish_asset_versions also checks new versions against the head
+    version of their asset and department, stored on disk under heads/, so
+    two writers can never store the same version number.
     """
-    def __init__(self, file_path: str):
+
+    # Number of queued record writes after which a batch is flushed
+    WRITE_QUEUE_SIZE = 1000
+    # Lock file at the root, see FileLock
+    LOCK_FILE = 'storage.lock'
+    # Seconds to wait for another writer to release the lock
+    LOCK_TIMEOUT = 60.0
+
+    def __init__(
+            self,
+            file_path: str,
+            fsync: str | FsyncPolicy = FsyncPolicy.NONE,
+            compact: bool = False,
+            compression: str | Compression = Compression.NONE,
+            codec: str = 'json',
+            layout: str | Layout = Layout.FLAT,
+            version_storage: str | VersionStorage = VersionStorage.FILE,
+            index: bool = True,
+            use_inotify: bool = True
+    ):
         """
         Initialize a storage JSON handler
 
         Args:
             file_path (str): the root filepath in which we will save
                              and retrieve the JSON files.
+            fsync (str | FsyncPolicy): when written files are flushed to
+                                       disk, 'none', 'batch' or 'file'.
+                                       Defaults to 'none'.
+            compact (bool): write JSON without indentation. Defaults to
+                            False (human readable).
+            compression (str | Compression): compress each file with 'gzip'
+                                             or 'zlib'. Defaults to 'none'.
+            codec (str): JSON codec, 'json' (stdlib), 'orjson', 'ujson' or
+                         'auto'. Defaults to 'json'.
+            layout (str | Layout): directory layout of new files, 'flat' or
+                                   'hashed'. Defaults to 'flat'.
+            version_storage (str | VersionStorage): 'file' for one file per
+                                                    version or 'packed' for
+                                                    one append-only file per
+                                                    asset and department.
+                                                    Defaults to 'file'.
+            index (bool): maintain and read the index file. Defaults to
+                          True. Records written by a StorageJSON without
+                          index are only found after rebuild_index.
+            use_inotify (bool): let watchers, e.g. of Project.load and
+                                refresh, use inotify where available. Set
+                                to False on network filesystems (NFS, SMB)
+                                written by other hosts, whose writes inotify
+                                does not see, to poll instead. Defaults to
+                                True.
+
+        Raises:
+            ValueError: if an option is unknown, or compression is combined
+                        with packed version files (which are appended to).
+
+        Files written with any of these settings can be read back whatever
+        the current settings are, so they can be changed at any time. Use
+        migrate_layout to move existing files to another layout.
         """
+        self.fsync = FsyncPolicy(fsync)
+        self.codec = JSONCodec(compact, compression, codec)
+        self.layout = Layout(layout)
+        self.version_storage = VersionStorage(version_storage)
+        if self.version_storage is VersionStorage.PACKED and \
+                self.codec.compression is not Compression.NONE:
+            raise ValueError(
+                "Compression is not supported with packed version files")
+        # Directories known to exist, saves a stat per write
+        self._directories = set()
+        # Directories written during the current batch, see _batch()
+        self._batch_directories = None
+        # Record writes queued during the current batch, see _queue()
+        self._pending_writes = None
         self.file_path = file_path
         self.asset_path = os.path.join(self.file_path, 'assets')
         self.asset_version_path = os.path.join(self.file_path, 'asset_versions')
@@ -33,76 +172,1137 @@ class StorageJSON(StorageBackend):
             os.makedirs(self.asset_path, exist_ok=True)
         if not Path(self.asset_version_path).exists():
             os.makedirs(self.asset_version_path, exist_ok=True)
+        self.head_path = os.path.join(self.file_path, 'heads')
+        self.index = StorageIndex(self.file_path) if index else None
+        self.use_inotify = use_inotify
+        self.lock = FileLock(
+            os.path.join(self.file_path, self.LOCK_FILE),
+            timeout=self.LOCK_TIMEOUT)
 
     def save_asset(self, asset: Asset):
         data = asset.to_dict()
-        publish_path = os.path.join(self.asset_path, asset.code + '.json')
-        with open(publish_path, 'w') as fp:
-            json.dump(data, fp, indent=4)
+        publish_path = self._asset_file(asset.code)
+        self._write_json(publish_path, data, asset.code)
 
     def load_asset(self, asset_code: str):
-        file_path = os.path.join(self.asset_path, asset_code + '.json')
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"Asset file not found: {file_path}")
-        with open(file_path, 'r') as fp:
-            data = json.load(fp)
-            return Asset.from_dict(data)
+        if self._indexed() is not None:
+            for asset in self._read_indexed_assets([asset_code]):
+                return asset
+            raise FileNotFoundError(f"Asset not found in index: {asset_code}")
+        file_path = self._find_file(
+            lambda layout: self._asset_file(asset_code, layout))
+        if file_path is None:
+            raise FileNotFoundError(
+                f"Asset file not found: {self._asset_file(asset_code)}")
+        return Asset.from_dict(self._read_json(file_path))
 
     def save_assets(self, assets: list[Asset]):
-        for asset in assets:
-            self.save_asset(asset)
+        with self._batch():
+            for asset in assets:
+                self.save_asset(asset)
 
     def load_assets(self):
-        assets = []
-        for file_name in os.listdir(self.asset_path):
-            if file_name.endswith('.json'):
-                with open(os.path.join(self.asset_path, file_name), 'r') as fp:
-                    data = json.load(fp)
-                    asset = Asset.from_dict(data)
-                    assets.append(asset)
-        return assets
+        return list(self.iter_assets())
+
+    def iter_assets(self):
+        index = self._indexed()
+        if index is not None:
+            yield from self._read_indexed_assets(list(index.assets))
+            return
+        # NOTE: both layouts are read. If a record exists in both (e.g. an
+        # interrupted migration) the file in the configured layout wins, so
+        # files in the other layout are read last. Only the codes are kept
+        # to skip them, the records are streamed.
+        seen = set()
+        deferred = []
+        for path, in_layout in self._walk_records(self.asset_path, 0):
+            if not in_layout:
+                deferred.append(path)
+                continue
+            asset = Asset.from_dict(self._read_json(path))
+            if asset.code not in seen:
+                seen.add(asset.code)
+                yield asset
+        for path in deferred:
+            asset = Asset.from_dict(self._read_json(path))
+            if asset.code not in seen:
+                seen.add(asset.code)
+                yield asset
+
+    def load_assets_by_code(self, asset_codes):
+        if self._indexed() is None:
+            return super().load_assets_by_code(asset_codes)
+        return {asset.code: asset
+                for asset in self._read_indexed_assets(asset_codes)}
 
     def save_asset_version(self, asset_version: AssetVersion):
         data = asset_version.to_dict()
-        department_path = os.path.join(self.asset_version_path,
-                                       asset_version.department)
-        if not Path(department_path).exists():
-            os.makedirs(department_path, exist_ok=True)
-        publish_path = os.path.join(
-                        department_path,    
-                        f"{asset_version.asset}.{asset_version.version}.json"
-                    )
-
-        with open(publish_path, 'w') as fp:
-            json.dump(data, fp, indent=4)
+        if self.version_storage is VersionStorage.PACKED:
+            with self.lock:
+                self._append_lines(
+                    self._packed_file(
+                        asset_version.asset, asset_version.department),
+                    [data]
+                )
+                self._flush_packed()
+            return
+        publish_path = self._asset_version_file(
+            asset_version.asset,
+            asset_version.department,
+            asset_version.version
+        )
+        self._write_json(
+            publish_path,
+            data,
+            (asset_version.asset, asset_version.department,
+             asset_version.version)
+        )
 
     def load_asset_version(self,
                            asset_code: str,
                            department: str,
                            version: int):
-        file_path = os.path.join(
-            self.asset_version_path,
-            department,
-            f"{asset_code}.{version}.json"
-        )
-        if not os.path.exists(file_path):
+        if self._indexed() is not None:
+            key = (asset_code, department, version)
+            for asset_version in self._read_indexed_asset_versions([key]):
+                return asset_version
             raise FileNotFoundError(
-                f"Asset Version file not found: {file_path}")
-        with open(file_path, 'r') as fp:
-            data = json.load(fp)
-            return AssetVersion.from_dict(data)
+                f"Asset Version not found in index: {key}")
+        packed_path = self._find_file(
+            lambda layout: self._packed_file(asset_code, department, layout))
+        if packed_path is not None:
+            for asset_version in self._read_packed(packed_path):
+                if asset_version.version == version:
+                    return asset_version
+        file_path = self._find_file(
+            lambda layout: self._asset_version_file(
+                asset_code, department, version, layout))
+        if file_path is None:
+            raise FileNotFoundError(
+                f"Asset Version file not found: "
+                f"{self._asset_version_file(asset_code, department, version)}")
+        return AssetVersion.from_dict(self._read_json(file_path))
 
     def save_asset_versions(self, asset_versions: list[AssetVersion]):
-        for asset_version in asset_versions:
-            self.save_asset_version(asset_version)
+        with self._batch():
+            if self.version_storage is VersionStorage.PACKED:
+                with self.lock:
+                    self._save_packed(asset_versions)
+                    self._flush_packed()
+                return
+            for asset_version in asset_versions:
+                self.save_asset_version(asset_version)
+
+    def publish_asset_versions(
+            self,
+            asset_versions: list[AssetVersion],
+            skip_identical: bool = False
+    ):
+        """
+        Save new asset versions, safely against other processes publishing
+        to the same storage. The versions of each asset and department must
+        directly follow its stored head version (e.g. 4 and 5 when the head
+        is 3). With skip_identical, versions already stored with the same
+        content are left out first. Under the storage lock, the heads are
+        checked, the index entries are appended and the heads are moved,
+        then the record files are written once the lock is released.
+
+        A writer killed before writing its record files leaves the version
+        numbers taken but their files missing, see check_integrity.
+
+        Args:
+            asset_versions (list[AssetVersion]): the new asset versions
+
+        Raises:
+            VersionConflictError: if a version is already stored or does not
+                                  follow the head, nothing is written then
+        """
+        with self._batch():
+            with self.lock:
+                if skip_identical:
+                    asset_versions = self._drop_identical(asset_versions)
+                    if not asset_versions:
+                        return
+                groups = {}
+                for asset_version in sorted(asset_versions,
+                                            key=lambda av: av.version):
+                    groups.setdefault(
+                        (asset_version.asset, asset_version.department), []
+                    ).append(asset_version.version)
+                index = self._indexed()
+                for (asset_code, department), versions in groups.items():
+                    head = self.get_head(asset_code, department)
+                    if versions != list(
+                            range(head + 1, head + 1 + len(versions))):
+                        raise VersionConflictError(
+                            asset_code, department, versions, head)
+                    if index is not None:
+                        stored = [
+                            version for version in versions
+                            if (asset_code, department, version)
+                            in index.versions]
+                        if stored:
+                            raise VersionConflictError(
+                                asset_code, department, stored)
+                if self.version_storage is VersionStorage.PACKED:
+                    self._save_packed(asset_versions)
+                    self._flush_packed()
+                else:
+                    for asset_version in asset_versions:
+                        self.save_asset_version(asset_version)
+                    self._flush_index()
+                for (asset_code, department), versions in groups.items():
+                    self._write_head(asset_code, department, versions[-1])
+
+    def publish_next_version(
+            self,
+            asset_code: str,
+            department: str,
+            status: str = 'active'
+    ) -> AssetVersion:
+        """
+        Store the next version of an asset in a department. The number is
+        read from the head and the version published while holding the
+        storage lock, so concurrent publishers never conflict. The record
+        file is written after the lock is released.
+        """
+        with self._batch():
+            with self.lock:
+                asset_version = AssetVersion(
+                    asset_code, department,
+                    self.get_head(asset_code, department) + 1, status)
+                self.publish_asset_versions([asset_version])
+        return asset_version
+
+    def get_head(self, asset_code: str, department: str) -> int:
+        """
+        Return the highest version number taken in an asset's department,
+        0 if it has none. Storages written before heads existed get the
+        head from the stored versions.
+
+        Args:
+            asset_code (str): the code of the asset
+            department (str): the department of the asset versions
+
+        Returns:
+            int: the head version
+        """
+        try:
+            with open(self._head_file(asset_code, department), 'rb') as fp:
+                return int(fp.read())
+        except FileNotFoundError:
+            pass
+        return max((asset_version.version for asset_version
+                    in self.load_asset_history(asset_code, department)),
+                   default=0)
 
     def load_asset_versions(self):
+        return list(self.iter_asset_versions())
+
+    def iter_asset_versions(self):
+        index = self._indexed()
+        if index is not None:
+            yield from self._iter_indexed_asset_versions()
+            return
+        # NOTE: per version and packed files are both read whatever the
+        # configured mode, the configured mode and layout win on duplicates,
+        # so the other files are read last. Only the keys are kept to skip
+        # them, the records are streamed.
+        seen = set()
+        deferred = []
+        for path, in_layout in self._walk_records(self.asset_version_path, 1):
+            packed = path.endswith('.jsonl')
+            if not in_layout or packed != (
+                    self.version_storage is VersionStorage.PACKED):
+                deferred.append(path)
+                continue
+            yield from self._unseen_asset_versions(path, seen)
+        for path in deferred:
+            yield from self._unseen_asset_versions(path, seen)
+
+    def _unseen_asset_versions(
+            self,
+            path: str,
+            seen: set[tuple[str, str, int]]
+    ) -> Iterator[AssetVersion]:
+        """ Yield the asset versions of a file whose keys are not in seen,
+            adding them to it.
+        """
+        for asset_version in self.read_asset_version_file(path):
+            key = (asset_version.asset, asset_version.department,
+                   asset_version.version)
+            if key not in seen:
+                seen.add(key)
+                yield asset_version
+
+    def load_asset_versions_by_keys(self, keys):
+        if self._indexed() is None:
+            return super().load_asset_versions_by_keys(keys)
+        return {
+            (av.asset, av.department, av.version): av
+            for av in self._read_indexed_asset_versions(keys)
+        }
+
+    def load_asset_history(
+            self,
+            asset_code: str,
+            department: str
+    ) -> list[AssetVersion]:
+        """
+        Load every version of an asset in a department, ordered by version.
+        With packed version files this is a single read.
+
+        Args:
+            asset_code (str): the code of the asset
+            department (str): the department of the asset versions
+
+        Returns:
+            list[AssetVersion]: the versions, empty if there are none
+        """
+        packed_path = self._find_file(
+            lambda layout: self._packed_file(asset_code, department, layout))
+        if packed_path is not None:
+            return self._read_packed(packed_path)
         asset_versions = []
-        for root, dirs, files in os.walk(self.asset_version_path):
+        for layout in Layout:
+            directory = os.path.dirname(
+                self._asset_version_file(asset_code, department, 0, layout))
+            prefix = asset_code + '.'
+            try:
+                names = os.listdir(directory)
+            except FileNotFoundError:
+                continue
+            for name in names:
+                version = name[len(prefix):-len('.json')]
+                if name.startswith(prefix) and name.endswith('.json') \
+                        and version.isdigit():
+                    asset_versions.append(AssetVersion.from_dict(
+                        self._read_json(os.path.join(directory, name))))
+            if asset_versions:
+                break
+        return sorted(asset_versions, key=lambda av: av.version)
+
+    # --------------------------------------------------------------------------
+    # Index
+    # --------------------------------------------------------------------------
+
+    def has_asset(self, asset_code: str) -> bool:
+        """
+        Check whether an asset is stored, from the index when enabled.
+        """
+        index = self._indexed()
+        if index is not None:
+            return asset_code in index.assets
+        return self._find_file(
+            lambda layout: self._asset_file(asset_code, layout)) is not None
+
+    def has_asset_version(
+            self,
+            asset_code: str,
+            department: str,
+            version: int
+    ) -> bool:
+        """
+        Check whether an asset version is stored, from the index when
+        enabled.
+        """
+        index = self._indexed()
+        if index is not None:
+            return (asset_code, department, version) in index.versions
+        try:
+            self.load_asset_version(asset_code, department, version)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def list_asset_codes(self) -> list[str]:
+        """
+        List the codes of every stored asset without reading the records.
+        """
+        index = self._indexed()
+        if index is not None:
+            return list(index.assets)
+        return [asset.code for asset in self.load_assets()]
+
+    def list_asset_version_keys(self) -> list[tuple[str, str, int]]:
+        """
+        List the (asset, department, version) key of every stored asset
+        version without reading the records.
+        """
+        index = self._indexed()
+        if index is not None:
+            return list(index.versions)
+        return [(av.asset, av.department, av.version)
+                for av in self.load_asset_versions()]
+
+    def rebuild_index(self) -> int:
+        """
+        Rebuild the index from a walk of the record files, e.g. after files
+        were written or copied by something that does not maintain it. The
+        storage lock is held during the walk, other writers wait.
+
+        Returns:
+            int: the number of indexed records
+        """
+        with self.lock:
+            return self._rebuild_index()
+
+    def _rebuild_index(self) -> int:
+        # Pruned keys are only known to the index, keep them
+        if self.index.exists():
+            self.index.sync()
+        removed = set(self.index.removed)
+        assets = {}
+        for path, in_layout in self._walk_records(self.asset_path, 0):
+            with open(path, 'rb') as fp:
+                data = fp.read()
+            try:
+                asset_code = self.codec.decode(data)['code']
+            except (ValueError, KeyError):
+                continue
+            if in_layout or asset_code not in assets:
+                assets[asset_code] = (self.index.relative_path(path),
+                                      StorageIndex.digest(data))
+        versions = {}
+        for path, in_layout in self._walk_records(self.asset_version_path, 1):
+            packed = path.endswith('.jsonl')
+            preferred = in_layout and packed == (
+                self.version_storage is VersionStorage.PACKED)
+            if packed:
+                entries = self._packed_entries(path)
+            else:
+                with open(path, 'rb') as fp:
+                    data = fp.read()
+                try:
+                    entries = [(self.codec.decode(data), data, None)]
+                except ValueError:
+                    continue
+            relative_path = self.index.relative_path(path)
+            for record, data, offset in entries:
+                key = (record['asset'], record['department'],
+                       record['version'])
+                if preferred or key not in versions:
+                    versions[key] = (relative_path,
+                                     StorageIndex.digest(data), offset)
+        self.index.replace(assets, versions, removed)
+        return len(assets) + len(versions)
+
+    def compact_index(self) -> None:
+        """
+        Rewrite the index file without superseded entries, holding the
+        storage lock.
+        """
+        if self.index is not None:
+            with self.lock:
+                self.index.compact()
+
+    def _indexed(self) -> StorageIndex | None:
+        """ The up to date index, built on first use for storages written
+            before it existed, or None if disabled.
+        """
+        if self.index is None:
+            return None
+        if self.index.exists():
+            self.index.sync()
+        else:
+            self.rebuild_index()
+        return self.index
+
+    def _read_indexed(self, relative_path: str, path_for_layout, read):
+        """ Read the file of an index entry. If it is missing, e.g. moved by
+            an interrupted layout migration, look for it in every layout.
+        """
+        try:
+            return read(self.index.full_path(relative_path))
+        except FileNotFoundError:
+            path = self._find_file(path_for_layout)
+            if path is None:
+                raise
+            return read(path)
+
+    def _read_indexed_assets(self, asset_codes):
+        """ Yield the indexed assets of the given codes, skipping codes that
+            are not indexed.
+        """
+        for asset_code in asset_codes:
+            entry = self.index.assets.get(asset_code)
+            if entry is None:
+                continue
+            try:
+                yield self._read_indexed(
+                    entry[0],
+                    lambda layout, code=asset_code:
+                        self._asset_file(code, layout),
+                    self.read_asset_file
+                )
+            except FileNotFoundError:
+                # Indexed by a writer killed before writing the file
+                continue
+
+    def _read_indexed_asset_versions(self, keys):
+        """ Yield the indexed asset versions of the given keys, reading each
+            file once: a packed file holds many of them. A version alone in
+            its packed file is read from its indexed line.
+        """
+        keys_by_path = {}
+        for key in keys:
+            entry = self.index.versions.get(tuple(key))
+            if entry is not None:
+                keys_by_path.setdefault(entry[0], {})[tuple(key)] = entry[2]
+        for relative_path, offsets in keys_by_path.items():
+            if len(offsets) == 1:
+                (key, offset), = offsets.items()
+                if offset is not None:
+                    asset_version = self._read_packed_line(
+                        self.index.full_path(relative_path), offset)
+                    if asset_version is not None and \
+                            asset_version.version == key[2]:
+                        yield asset_version
+                        continue
+            try:
+                records = self._read_indexed(
+                    relative_path,
+                    self._version_path_for(relative_path, next(iter(offsets))),
+                    self.read_asset_version_file
+                )
+            except FileNotFoundError:
+                continue
+            for asset_version in records:
+                if (asset_version.asset, asset_version.department,
+                        asset_version.version) in offsets:
+                    yield asset_version
+
+    def _iter_indexed_asset_versions(self):
+        """ Yield every indexed asset version, holding one file's records at
+            a time. Each packed file is read once, when its first version
+            comes up, and yields the versions the index points at it.
+        """
+        packed_paths = set()
+        for key in list(self.index.versions):
+            entry = self.index.versions.get(key)
+            if entry is None:
+                continue
+            relative_path = entry[0]
+            if not relative_path.endswith('.jsonl'):
+                yield from self._read_indexed_asset_versions([key])
+                continue
+            if relative_path in packed_paths:
+                continue
+            packed_paths.add(relative_path)
+            try:
+                records = self._read_indexed(
+                    relative_path,
+                    self._version_path_for(relative_path, key),
+                    self.read_asset_version_file
+                )
+            except FileNotFoundError:
+                continue
+            for asset_version in records:
+                entry = self.index.versions.get(
+                    (asset_version.asset, asset_version.department,
+                     asset_version.version))
+                if entry is not None and entry[0] == relative_path:
+                    yield asset_version
+
+    def _version_path_for(self, relative_path: str, key: tuple):
+        asset_code, department, version = key
+        if relative_path.endswith('.jsonl'):
+            return lambda layout: self._packed_file(
+                asset_code, department, layout)
+        return lambda layout: self._asset_version_file(
+            asset_code, department, version, layout)
+
+    def _index_record(
+            self,
+            key: str | tuple[str, str, int],
+            path: str,
+            data: bytes,
+            offset: int | None = None
+    ) -> None:
+        """ Add the entry of a record about to be written, key is an asset
+            code or an asset version key.
+        """
+        if self.index is None:
+            return
+        if isinstance(key, str):
+            self.index.add_asset(key, path, data)
+        else:
+            self.index.add_asset_version(key, path, data, offset)
+
+    # --------------------------------------------------------------------------
+    # Retention
+    # --------------------------------------------------------------------------
+
+    def delete_asset_versions(self, keys) -> int:
+        """
+        Delete stored asset versions, holding the storage lock. Per version
+        files are removed and packed files are rewritten without the deleted
+        lines (or removed once empty). The index gets a removal entry per
+        key once the files are gone and keeps the keys as pruned. Heads are
+        written first for storages that have none, so the deleted numbers
+        are never published again.
+
+        Args:
+            keys (Iterable[tuple[str, str, int]]): (asset code, department,
+                                                   version) tuples
+
+        Returns:
+            int: the number of bytes freed on disk
+        """
+        groups = {}
+        for asset_code, department, version in keys:
+            groups.setdefault((asset_code, department), set()).add(version)
+        freed = 0
+        with self._batch():
+            with self.lock:
+                self._indexed()
+                for (asset_code, department), versions in groups.items():
+                    if not os.path.exists(
+                            self._head_file(asset_code, department)):
+                        self._write_head(
+                            asset_code, department,
+                            self.get_head(asset_code, department))
+                    freed += self._delete_packed(
+                        asset_code, department, versions)
+                    for version in versions:
+                        path = self._find_file(
+                            lambda layout, version=version:
+                                self._asset_version_file(
+                                    asset_code, department, version, layout))
+                        if path is not None:
+                            freed += os.path.getsize(path)
+                            os.remove(path)
+                    if self.index is not None:
+                        for version in sorted(versions):
+                            self.index.remove_asset_version(
+                                (asset_code, department, version))
+                self._flush_packed()
+        return freed
+
+    def list_pruned_asset_version_keys(self) -> list[tuple[str, str, int]]:
+        """
+        List the keys deleted by delete_asset_versions, kept by the index.
+        Storages without index do not remember them.
+        """
+        index = self._indexed()
+        if index is None:
+            return []
+        return sorted(index.removed)
+
+    def _delete_packed(
+            self,
+            asset_code: str,
+            department: str,
+            versions: set[int]
+    ) -> int:
+        """ Rewrite the packed file of an asset and department without the
+            given versions, returning the number of bytes freed.
+        """
+        path = self._find_file(
+            lambda layout: self._packed_file(asset_code, department, layout))
+        if path is None:
+            return 0
+        records = self._read_packed(path)
+        kept = [asset_version.to_dict() for asset_version in records
+                if asset_version.version not in versions]
+        if len(kept) == len(records):
+            return 0
+        size = os.path.getsize(path)
+        if not kept:
+            os.remove(path)
+            return size
+        return size - self._write_lines(path, kept)
+
+    # --------------------------------------------------------------------------
+    # Packed version files
+    # --------------------------------------------------------------------------
+
+    def _packed_file(
+            self,
+            asset_code: str,
+            department: str,
+            layout: Layout | None = None
+    ) -> str:
+        return os.path.join(
+            self.asset_version_path,
+            department,
+            *self._shard(asset_code, layout or self.layout),
+            asset_code + '.jsonl'
+        )
+
+    def _packed_entries(self, path: str) -> list[tuple[dict, bytes, int]]:
+        """ The (record, line, offset) of every parsable line of a packed
+            file, keeping only the last line of each version.
+        """
+        with open(path, 'rb') as fp:
+            content = fp.read()
+        entries = {}
+        offset = 0
+        for line in content.split(b'\n'):
+            if line:
+                try:
+                    record = self.codec.loads(line)
+                    entries[record['version']] = (record, line, offset)
+                except (ValueError, KeyError):
+                    pass
+            offset += len(line) + 1
+        return list(entries.values())
+
+    def _read_packed_line(
+            self,
+            path: str,
+            offset: int
+    ) -> AssetVersion | None:
+        """ Read the single line of a packed file at an indexed offset, None
+            if it is not there any more (e.g. the file was compacted).
+        """
+        try:
+            with open(path, 'rb') as fp:
+                fp.seek(offset)
+                return AssetVersion.from_dict(self.codec.loads(fp.readline()))
+        except (FileNotFoundError, ValueError, KeyError):
+            return None
+
+    def _read_packed(self, path: str) -> list[AssetVersion]:
+        """ Read a packed file, ordered by version. A later line for the same
+            version supersedes earlier ones, and lines torn by a killed
+            append are ignored.
+        """
+        with open(path, 'rb') as fp:
+            lines = [line for line in fp.read().split(b'\n') if line]
+        try:
+            # One decode call for the whole file in the common case
+            records = self.codec.loads(b'[' + b','.join(lines) + b']')
+        except ValueError:
+            records = []
+            for line in lines:
+                try:
+                    records.append(self.codec.loads(line))
+                except ValueError:
+                    continue
+        by_version = {record['version']: record for record in records}
+        return [AssetVersion.from_dict(by_version[version])
+                for version in sorted(by_version)]
+
+    def _append_lines(self, path: str, records: list[dict]) -> None:
+        """ Append records to a packed file as JSON lines, in one write.
+        """
+        self._ensure_directory(os.path.dirname(path))
+        try:
+            with open(path, 'rb') as fp:
+                offset = fp.seek(0, os.SEEK_END)
+                # Terminate a line torn by a killed writer before appending
+                if offset > 0:
+                    fp.seek(-1, os.SEEK_END)
+                    torn = fp.read(1) != b'\n'
+                    offset += torn
+        except FileNotFoundError:
+            offset, torn = 0, False
+        lines = []
+        for record in records:
+            line = self.codec.dumps_line(record)
+            self._index_record(
+                (record['asset'], record['department'], record['version']),
+                path, line, offset)
+            lines.append(line + b'\n')
+            offset += len(lines[-1])
+        data = (b'\n' if torn else b'') + b''.join(lines)
+        self._queue(lambda: self._append_file(path, data))
+
+    def _append_file(self, path: str, data: bytes) -> None:
+        with open(path, 'ab') as fp:
+            fp.write(data)
+            if self.fsync is FsyncPolicy.FILE:
+                fp.flush()
+                os.fsync(fp.fileno())
+        self._note_written(path)
+
+    def _save_packed(self, asset_versions: list[AssetVersion]) -> None:
+        """ Save versions grouped per packed file. Versions that are not in
+            the file yet are appended, and if a stored version changed the
+            file is compacted by rewriting it atomically.
+        """
+        groups = {}
+        for asset_version in asset_versions:
+            groups.setdefault(
+                (asset_version.asset, asset_version.department), []
+            ).append(asset_version)
+        for (asset_code, department), group in groups.items():
+            path = self._packed_file(asset_code, department)
+            stored = {}
+            if os.path.exists(path):
+                stored = {av.version: av.to_dict()
+                          for av in self._read_packed(path)}
+            records = {av.version: av.to_dict() for av in group}
+            changed = [version for version, record in records.items()
+                       if version in stored and stored[version] != record]
+            if changed:
+                stored.update(records)
+                self._write_lines(
+                    path, [stored[version] for version in sorted(stored)])
+                continue
+            new = [records[version] for version in sorted(records)
+                   if version not in stored]
+            if new:
+                self._append_lines(path, new)
+
+    def _write_lines(self, path: str, records: list[dict]) -> int:
+        """ Atomically replace a packed file with the given records,
+            returning the size of the new file.
+        """
+        lines = []
+        offset = 0
+        for record in records:
+            line = self.codec.dumps_line(record)
+            self._index_record(
+                (record['asset'], record['department'], record['version']),
+                path, line, offset)
+            lines.append(line + b'\n')
+            offset += len(lines[-1])
+        data = b''.join(lines)
+        self._queue(lambda: self._write_file(path, data))
+        return len(data)
+
+    # --------------------------------------------------------------------------
+    # Directory layout
+    # --------------------------------------------------------------------------
+
+    @staticmethod
+    def _shard(asset_code: str, layout: Layout) -> tuple[str, ...]:
+        """ The hash prefix directories of an asset code in a layout.
+        """
+        if layout is Layout.FLAT:
+            return ()
+        digest = hashlib.md5(asset_code.encode()).hexdigest()
+        return (digest[:2], digest[2:4])
+
+    def _asset_file(
+            self,
+            asset_code: str,
+            layout: Layout | None = None
+    ) -> str:
+        return os.path.join(
+            self.asset_path,
+            *self._shard(asset_code, layout or self.layout),
+            asset_code + '.json'
+        )
+
+    def _asset_version_file(
+            self,
+            asset_code: str,
+            department: str,
+            version: int,
+            layout: Layout | None = None
+    ) -> str:
+        return os.path.join(
+            self.asset_version_path,
+            department,
+            *self._shard(asset_code, layout or self.layout),
+            f"{asset_code}.{version}.json"
+        )
+
+    def _find_file(self, path_for_layout) -> str | None:
+        """ Return the path of a record in the configured layout, falling
+            back to the other layouts, or None if it does not exist.
+        """
+        layouts = [self.layout] + [
+            layout for layout in Layout if layout is not self.layout]
+        for layout in layouts:
+            path = path_for_layout(layout)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def _walk_records(self, root: str, flat_depth: int):
+        """ Yield (path, in_configured_layout) for every record file under
+            root, in any layout. flat_depth is the directory depth of record
+            files in the flat layout (0 for assets, 1 for asset versions).
+        """
+        depth = flat_depth + len(self._shard('', self.layout))
+        pending = [(root, 0)]
+        while pending:
+            directory, current_depth = pending.pop()
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append((entry.path, current_depth + 1))
+                    elif entry.name.endswith(('.json', '.jsonl')) \
+                            and not entry.name.startswith('.'):
+                        yield entry.path, current_depth == depth
+
+    def _ensure_directory(self, directory: str) -> None:
+        if directory not in self._directories:
+            os.makedirs(directory, exist_ok=True)
+            self._directories.add(directory)
+
+    def migrate_layout(self, layout: str | Layout) -> int:
+        """
+        Move every record file to the given layout in place and make it the
+        configured layout. Safe to rerun after an interruption: files are
+        moved with atomic renames and both layouts stay readable meanwhile.
+
+        Args:
+            layout (str | Layout): the target layout, 'flat' or 'hashed'
+
+        Returns:
+            int: the number of files moved
+        """
+        layout = Layout(layout)
+        moves = []
+        for path, _ in self._walk_records(self.asset_path, 0):
+            asset_code = os.path.basename(path)[:-len('.json')]
+            moves.append((path, self._asset_file(asset_code, layout)))
+        for path, _ in self._walk_records(self.asset_version_path, 1):
+            relative = os.path.relpath(path, self.asset_version_path)
+            department = relative.split(os.sep)[0]
+            name = os.path.basename(path)
+            if name.endswith('.jsonl'):
+                moves.append((path, self._packed_file(
+                    name[:-len('.jsonl')], department, layout)))
+                continue
+            asset_code, version = name[:-len('.json')].rsplit('.', 1)
+            moves.append((path, self._asset_version_file(
+                asset_code, department, version, layout)))
+
+        moved = 0
+        with self._batch():
+            for source, target in moves:
+                if source == target:
+                    continue
+                if os.path.exists(target) and self.layout is layout:
+                    # The target was written in the configured layout after
+                    # the source, keep it.
+                    os.remove(source)
+                    continue
+                self._ensure_directory(os.path.dirname(target))
+                os.replace(source, target)
+                if self.fsync is FsyncPolicy.FILE:
+                    fsync_directory(os.path.dirname(target))
+                self._note_written(target)
+                moved += 1
+        self.layout = layout
+        self._remove_empty_directories(self.asset_path)
+        self._remove_empty_directories(self.asset_version_path)
+        if self.index is not None:
+            self.rebuild_index()
+        return moved
+
+    def _remove_empty_directories(self, root: str) -> None:
+        for directory, _, _ in os.walk(root, topdown=False):
+            if directory == root:
+                continue
+            try:
+                os.rmdir(directory)
+            except OSError:
+                continue
+            self._directories.discard(directory)
+
+    # --------------------------------------------------------------------------
+    # Encoding and atomic writes
+    # --------------------------------------------------------------------------
+
+    def _read_json(self, path: str) -> dict:
+        """ Read and decode a file in any of the supported encodings.
+        """
+        with open(path, 'rb') as fp:
+            return self.codec.decode(fp.read())
+
+    def _write_json(
+            self,
+            path: str,
+            data: dict,
+            key: str | tuple[str, str, int]
+    ) -> None:
+        """ Index and write the encoding of a record, key is its asset code or
+            asset version key.
+        """
+        encoded = self.codec.encode(data)
+        self._index_record(key, path, encoded)
+        self._queue(lambda: self._write_file(path, encoded))
+
+    def _write_file(self, path: str, data: bytes) -> None:
+        """ Atomically replace a file, flushing it according to the fsync
+            policy.
+        """
+        self._ensure_directory(os.path.dirname(path))
+        atomic_write(path, data, fsync=self.fsync is FsyncPolicy.FILE)
+        self._note_written(path)
+
+    def _note_written(self, path: str) -> None:
+        if self._batch_directories is not None:
+            self._batch_directories.add(os.path.dirname(path))
+
+    def _queue(self, write) -> None:
+        """ Run a record write after the index entries describing it are on
+            disk, so a killed writer never leaves a file the index misses.
+            Writes are deferred during a batch to append the entries at once.
+        """
+        if self._pending_writes is None:
+            self._flush_index()
+            write()
+            return
+        self._pending_writes.append(write)
+        if len(self._pending_writes) >= self.WRITE_QUEUE_SIZE:
+            self._flush_writes()
+
+    def _flush_writes(self) -> None:
+        writes, self._pending_writes = self._pending_writes, []
+        self._flush_index()
+        for write in writes:
+            write()
+
+    def _flush_index(self) -> None:
+        if self.index is not None and self.index.has_pending:
+            with self.lock:
+                self.index.flush(fsync=self.fsync is not FsyncPolicy.NONE)
+
+    def _flush_packed(self) -> None:
+        """ Append the queued packed lines while the lock is still held,
+            their index entries hold offsets computed from the file sizes.
+        """
+        if self._pending_writes is not None:
+            self._flush_writes()
+
+    # --------------------------------------------------------------------------
+    # Head versions
+    # --------------------------------------------------------------------------
+
+    def _head_file(self, asset_code: str, department: str) -> str:
+        # Always hashed, whatever the layout, to keep directories small
+        return os.path.join(
+            self.head_path, department,
+            *self._shard(asset_code, Layout.HASHED), asset_code)
+
+    def _write_head(
+            self,
+            asset_code: str,
+            department: str,
+            version: int
+    ) -> None:
+        path = self._head_file(asset_code, department)
+        self._ensure_directory(os.path.dirname(path))
+        atomic_write(path, str(version).encode(),
+                     fsync=self.fsync is FsyncPolicy.FILE)
+
+    @contextmanager
+    def _batch(self):
+        """ Group the writes of a batched save: the index entries are
+            appended in one write ahead of the files, and with the BATCH
+            fsync policy each touched directory is flushed once at the end.
+        """
+        if self._pending_writes is not None:
+            yield
+            return
+        self._pending_writes = []
+        self._batch_directories = set()
+        try:
+            yield
+        finally:
+            try:
+                self._flush_writes()
+            finally:
+                self._pending_writes = None
+                directories, self._batch_directories = \
+                    self._batch_directories, None
+        if self.fsync is FsyncPolicy.BATCH:
+            for directory in directories:
+                fsync_directory(directory)
+
+    def remove_stale_temp_files(self, max_age: float = 3600) -> int:
+        """
+        Remove temporary files left behind by killed writers.
+
+        Args:
+            max_age (float): only remove files older than this many seconds,
+                             so writes in progress are left alone.
+
+        Returns:
+            int: the number of removed files
+        """
+        removed = 0
+        cutoff = time.time() - max_age
+        for root, _, files in os.walk(self.file_path):
             for file_name in files:
-                if file_name.endswith('.json'):
-                    with open(os.path.join(root, file_name), 'r') as fp:
-                        data = json.load(fp)
-                        asset_version = AssetVersion.from_dict(data)
-                        asset_versions.append(asset_version)
-        return asset_versions
+                if not (file_name.startswith('.')
+                        and file_name.endswith('.tmp')):
+                    continue
+                path = os.path.join(root, file_name)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                        removed += 1
+                except FileNotFoundError:
+                    continue
+        return removed
+
+    # --------------------------------------------------------------------------
+    # Incremental changes
+    # --------------------------------------------------------------------------
+
+    def watch(self, baseline: bool = True, use_inotify: bool | None = None):
+        """
+        Create a watcher for the asset and asset version directories.
+
+        Args:
+            baseline (bool): if True, files existing now are not reported by
+                             the first poll
+            use_inotify (bool | None): use inotify where available, set to
+                                       False on network filesystems written
+                                       by other hosts. None uses the
+                                       storage's use_inotify option.
+
+        Returns:
+            InotifyWatcher | PollingWatcher: the watcher
+        """
+        return create_watcher(
+            [self.asset_path, self.asset_version_path],
+            suffixes=('.json', '.jsonl'),
+            baseline=baseline,
+            use_inotify=(self.use_inotify if use_inotify is None
+                         else use_inotify)
+        )
+
+    def load_changes(
+            self,
+            changes: ChangeSet
+    ) -> tuple[list[Asset], list[AssetVersion]]:
+        """
+        Read the changed files reported by a watcher. Files that cannot be
+        parsed yet (e.g. caught half written) are skipped and listed in
+        changes.unreadable.
+
+        Args:
+            changes (ChangeSet): the changes reported by the watcher
+
+        Returns:
+            tuple: the changed assets and asset versions
+        """
+        assets = []
+        asset_versions = []
+        asset_root = os.path.join(self.asset_path, '')
+        for path in changes.changed:
+            try:
+                if path.startswith(asset_root):
+                    assets.append(self.read_asset_file(path))
+                else:
+                    asset_versions.extend(self.read_asset_version_file(path))
+            except FileNotFoundError:
+                continue
+            except (ValueError, KeyError, AttributeError):
+                changes.unreadable.append(path)
+        return assets, asset_versions
+
+    def read_asset_file(self, path: str) -> Asset:
+        """
+        Read a single asset file.
+        """
+        return Asset.from_dict(self._read_json(path))
+
+    def read_asset_version_file(self, path: str) -> list[AssetVersion]:
+        """
+        Read the asset versions stored in a file, either a single version
+        file or a packed file.
+        """
+        if path.endswith('.jsonl'):
+            return self._read_packed(path)
+        return [AssetVersion.from_dict(self._read_json(path))]
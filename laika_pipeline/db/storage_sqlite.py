@@ -0,0 +1,327 @@
+import json
+import sqlite3
+import threading
+
+from laika_pipeline.db.storage_backend import (
+    StorageBackend, VersionConflictError
+)
+from laika_pipeline.pipeline.asset import Asset
+from laika_pipeline.pipeline.asset_version import AssetVersion
+
+
+class StorageSQLite(StorageBackend):
+    """
+    A storage backend keeping assets and asset versions in a single SQLite
+    database file, one row per record holding its JSON. Fast to open and
+    query on a local disk, e.g. as the local tier of a TieredStorage.
+    """
+
+    # Keys per query of the batched loads, below SQLite's variable limit
+    BATCH_SIZE = 300
+    # Rows fetched per query while streaming
+    PAGE_SIZE = 1000
+
+    def __init__(self, file_path: str = ':memory:'):
+        """
+        Initialize a storage SQLite handler
+
+        Args:
+            file_path (str): path of the database file, created if missing.
+                             Defaults to an in-memory database.
+        """
+        self.file_path = file_path
+        self._connection = sqlite3.connect(file_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            if file_path != ':memory:':
+                self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS assets ('
+                'code TEXT PRIMARY KEY, data TEXT NOT NULL)')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS asset_versions ('
+                'asset TEXT NOT NULL, department TEXT NOT NULL, '
+                'version INTEGER NOT NULL, data TEXT NOT NULL, '
+                'PRIMARY KEY (asset, department, version))')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS pruned_asset_versions ('
+                'asset TEXT NOT NULL, department TEXT NOT NULL, '
+                'version INTEGER NOT NULL, '
+                'PRIMARY KEY (asset, department, version))')
+
+    def save_asset(self, asset: Asset):
+        self.save_assets([asset])
+
+    def load_asset(self, asset_code: str):
+        row = self._fetch_one(
+            'SELECT data FROM assets WHERE code = ?', (asset_code,))
+        if row is None:
+            raise FileNotFoundError(f"Asset not found: {asset_code}")
+        return Asset.from_dict(json.loads(row[0]))
+
+    def save_assets(self, assets: list[Asset]):
+        self._execute_many(
+            'INSERT INTO assets (code, data) VALUES (?, ?) '
+            'ON CONFLICT (code) DO UPDATE SET data = excluded.data',
+            [(asset.code, json.dumps(asset.to_dict())) for asset in assets]
+        )
+
+    def load_assets(self):
+        return [Asset.from_dict(json.loads(data)) for data, in self._fetch_all(
+            'SELECT data FROM assets ORDER BY rowid')]
+
+    def save_asset_version(self, asset_version: AssetVersion):
+        self.save_asset_versions([asset_version])
+
+    def load_asset_version(self,
+                           asset_code: str,
+                           department: str,
+                           version: int):
+        row = self._fetch_one(
+            'SELECT data FROM asset_versions '
+            'WHERE asset = ? AND department = ? AND version = ?',
+            (asset_code, department, version))
+        if row is None:
+            raise FileNotFoundError(
+                f"Asset Version not found: "
+                f"{(asset_code, department, version)}")
+        return AssetVersion.from_dict(json.loads(row[0]))
+
+    def save_asset_versions(self, asset_versions: list[AssetVersion]):
+        self._execute_many(
+            'INSERT INTO asset_versions '
+            '(asset, department, version, data) VALUES (?, ?, ?, ?) '
+            'ON CONFLICT (asset, department, version) '
+            'DO UPDATE SET data = excluded.data',
+            [(av.asset, av.department, av.version, json.dumps(av.to_dict()))
+             for av in asset_versions]
+        )
+
+    def publish_asset_versions(
+            self,
+            asset_versions: list[AssetVersion],
+            skip_identical: bool = False
+    ):
+        """
+        Insert new asset versions in one transaction that fails if any of
+        them is already stored or, like StorageJSON, if the versions of an
+        asset and department do not directly follow its head, pruned
+        numbers included. With skip_identical, versions stored with the
+        same content are left out first. Other processes using the same
+        database file wait for the transaction to end.
+        """
+        with self._lock:
+            try:
+                with self._connection:
+                    # Take the database write lock before reading
+                    self._connection.execute('BEGIN IMMEDIATE')
+                    if skip_identical:
+                        stored = self._stored_records(
+                            [(av.asset, av.department, av.version)
+                             for av in asset_versions])
+                        asset_versions = [
+                            av for av in asset_versions
+                            if stored.get((av.asset, av.department,
+                                           av.version)) != av.to_dict()]
+                    groups = {}
+                    for asset_version in sorted(asset_versions,
+                                                key=lambda av: av.version):
+                        groups.setdefault(
+                            (asset_version.asset, asset_version.department),
+                            []).append(asset_version.version)
+                    for (asset_code, department), versions in groups.items():
+                        head = self._head(asset_code, department)
+                        if versions != list(
+                                range(head + 1, head + 1 + len(versions))):
+                            raise VersionConflictError(
+                                asset_code, department, versions, head)
+                    self._insert_new(asset_versions)
+            except sqlite3.IntegrityError:
+                raise self._conflict(asset_versions) from None
+
+    def publish_next_version(
+            self,
+            asset_code: str,
+            department: str,
+            status: str = 'active'
+    ) -> AssetVersion:
+        with self._lock, self._connection:
+            # Take the database write lock before reading the head
+            self._connection.execute('BEGIN IMMEDIATE')
+            asset_version = AssetVersion(
+                asset_code, department,
+                self._head(asset_code, department) + 1, status)
+            self._insert_new([asset_version])
+        return asset_version
+
+    def get_head(self, asset_code: str, department: str) -> int:
+        with self._lock:
+            return self._head(asset_code, department)
+
+    def delete_asset_versions(self, keys) -> int:
+        """
+        Delete stored asset versions and record their keys as pruned, in one
+        transaction. SQLite reuses the freed pages for later writes, the
+        database file only shrinks after a VACUUM.
+
+        Returns:
+            int: the number of bytes of record data deleted
+        """
+        keys = [tuple(key) for key in keys]
+        deleted = 0
+        with self._lock, self._connection:
+            for start in range(0, len(keys), self.BATCH_SIZE):
+                chunk = keys[start:start + self.BATCH_SIZE]
+                condition = (
+                    f'(asset, department, version) IN '
+                    f'(VALUES {", ".join(["(?, ?, ?)"] * len(chunk))})')
+                parameters = tuple(value for key in chunk for value in key)
+                deleted += self._connection.execute(
+                    f'SELECT TOTAL(LENGTH(data)) FROM asset_versions '
+                    f'WHERE {condition}', parameters).fetchone()[0]
+                self._connection.execute(
+                    f'DELETE FROM asset_versions WHERE {condition}',
+                    parameters)
+            self._connection.executemany(
+                'INSERT OR IGNORE INTO pruned_asset_versions '
+                '(asset, department, version) VALUES (?, ?, ?)', keys)
+        return int(deleted)
+
+    def list_pruned_asset_version_keys(self) -> list[tuple[str, str, int]]:
+        return self._fetch_all(
+            'SELECT asset, department, version FROM pruned_asset_versions '
+            'ORDER BY asset, department, version')
+
+    def load_asset_versions(self):
+        return [AssetVersion.from_dict(json.loads(data))
+                for data, in self._fetch_all(
+                    'SELECT data FROM asset_versions ORDER BY rowid')]
+
+    def load_assets_by_code(self, asset_codes):
+        asset_codes = list(asset_codes)
+        assets = {}
+        for start in range(0, len(asset_codes), self.BATCH_SIZE):
+            chunk = asset_codes[start:start + self.BATCH_SIZE]
+            rows = self._fetch_all(
+                f'SELECT data FROM assets WHERE code IN '
+                f'({", ".join("?" * len(chunk))})', tuple(chunk))
+            for data, in rows:
+                asset = Asset.from_dict(json.loads(data))
+                assets[asset.code] = asset
+        return assets
+
+    def load_asset_versions_by_keys(self, keys):
+        keys = [tuple(key) for key in keys]
+        asset_versions = {}
+        for start in range(0, len(keys), self.BATCH_SIZE):
+            chunk = keys[start:start + self.BATCH_SIZE]
+            rows = self._fetch_all(
+                f'SELECT data FROM asset_versions '
+                f'WHERE (asset, department, version) IN '
+                f'(VALUES {", ".join(["(?, ?, ?)"] * len(chunk))})',
+                tuple(value for key in chunk for value in key))
+            for data, in rows:
+                av = AssetVersion.from_dict(json.loads(data))
+                asset_versions[(av.asset, av.department, av.version)] = av
+        return asset_versions
+
+    def iter_assets(self):
+        for data in self._iter_rows('assets'):
+            yield Asset.from_dict(json.loads(data))
+
+    def iter_asset_versions(self):
+        for data in self._iter_rows('asset_versions'):
+            yield AssetVersion.from_dict(json.loads(data))
+
+    def _iter_rows(self, table: str):
+        """ Yield the data of every row of a table, one page per query so
+            the connection is not held while the caller consumes them.
+        """
+        last_rowid = 0
+        while True:
+            rows = self._fetch_all(
+                f'SELECT rowid, data FROM {table} WHERE rowid > ? '
+                f'ORDER BY rowid LIMIT ?', (last_rowid, self.PAGE_SIZE))
+            for last_rowid, data in rows:
+                yield data
+            if len(rows) < self.PAGE_SIZE:
+                return
+
+    def _head(self, asset_code: str, department: str) -> int:
+        # Pruned numbers stay taken
+        row = self._connection.execute(
+            'SELECT MAX(version) FROM ('
+            'SELECT version FROM asset_versions '
+            'WHERE asset = ? AND department = ? UNION ALL '
+            'SELECT version FROM pruned_asset_versions '
+            'WHERE asset = ? AND department = ?)',
+            (asset_code, department) * 2).fetchone()
+        return row[0] or 0
+
+    def _insert_new(self, asset_versions: list[AssetVersion]) -> None:
+        """ Insert asset versions, raising IntegrityError if one is stored.
+        """
+        self._connection.executemany(
+            'INSERT INTO asset_versions '
+            '(asset, department, version, data) VALUES (?, ?, ?, ?)',
+            [(av.asset, av.department, av.version, json.dumps(av.to_dict()))
+             for av in asset_versions]
+        )
+
+    def _conflict(
+            self,
+            asset_versions: list[AssetVersion]
+    ) -> VersionConflictError:
+        """ The error for the first of the versions that is stored, called
+            once the failed insert was rolled back.
+        """
+        keys = [(av.asset, av.department, av.version)
+                for av in asset_versions]
+        stored = list(self._stored_records(keys))
+        if not stored:
+            # Repeated in asset_versions
+            seen = set()
+            stored = [key for key in keys if key in seen or seen.add(key)]
+        asset_code, department, version = min(stored)
+        return VersionConflictError(asset_code, department, [version])
+
+    def _stored_records(
+            self,
+            keys: list[tuple[str, str, int]]
+    ) -> dict[tuple[str, str, int], dict]:
+        """ The stored records of the given keys, called with the lock
+            held.
+        """
+        records = {}
+        for start in range(0, len(keys), self.BATCH_SIZE):
+            chunk = keys[start:start + self.BATCH_SIZE]
+            rows = self._connection.execute(
+                f'SELECT data FROM asset_versions '
+                f'WHERE (asset, department, version) IN '
+                f'(VALUES {", ".join(["(?, ?, ?)"] * len(chunk))})',
+                tuple(value for key in chunk for value in key)).fetchall()
+            for data, in rows:
+                record = json.loads(data)
+                records[(record['asset'], record['department'],
+                         record['version'])] = record
+        return records
+
+    def close(self) -> None:
+        """
+        Close the database connection.
+        """
+        with self._lock:
+            self._connection.close()
+
+    def _fetch_one(self, query: str, parameters: tuple):
+        with self._lock:
+            return self._connection.execute(query, parameters).fetchone()
+
+    def _fetch_all(self, query: str, parameters: tuple = ()) -> list[tuple]:
+        with self._lock:
+            return self._connection.execute(query, parameters).fetchall()
+
+    def _execute_many(self, query: str, rows: list[tuple]) -> None:
+        # One transaction per batch, updates keep their row order
+        with self._lock, self._connection:
+            self._connection.executemany(query, rows)
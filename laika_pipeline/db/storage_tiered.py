@@ -0,0 +1,382 @@
+import threading
+from enum import Enum
+
+from laika_pipeline.db.storage_backend import StorageBackend
+from laika_pipeline.pipeline.asset import Asset
+from laika_pipeline.pipeline.asset_version import AssetVersion
+
+
+class WritePolicy(Enum):
+    """
+    When TieredStorage writes saved records to the shared tier.
+
+    THROUGH: during the save, before it returns.
+    BACK: later, from a background thread or on flush() / close(). Saves
+          only pay for the local tier, records not flushed yet are lost if
+          the process dies.
+    """
+
+    THROUGH = 'through'
+    BACK = 'back'
+
+
+class TieredStorage(StorageBackend):
+    """
+    A storage backend composing a fast local tier (e.g. StorageSQLite on the
+    workstation's disk) with a slow shared tier (e.g. StorageJSON on a
+    filer). Point loads are served from the local tier and fall back to the
+    shared tier on a miss, copying the record locally. Listings are served
+    locally once the local tier was warmed up with a full copy of the shared
+    tier, which runs in a background thread.
+    """
+
+    def __init__(
+            self,
+            local: StorageBackend,
+            shared: StorageBackend,
+            write_policy: str | WritePolicy = WritePolicy.THROUGH,
+            warm_up: bool = True,
+            flush_interval: float = 5.0
+    ):
+        """
+        Args:
+            local (StorageBackend): the fast local tier
+            shared (StorageBackend): the authoritative shared tier
+            write_policy (str | WritePolicy): 'through' or 'back'. Defaults
+                                              to 'through'.
+            warm_up (bool): start copying the shared tier to the local tier
+                            in a background thread. Defaults to True.
+            flush_interval (float): seconds between background flushes with
+                                    the 'back' write policy
+        """
+        self.local = local
+        self.shared = shared
+        self.write_policy = WritePolicy(write_policy)
+        self.flush_interval = flush_interval
+        self._lock = threading.RLock()
+        # Saved records not written to the shared tier yet, by key
+        self._pending_assets = {}
+        self._pending_asset_versions = {}
+        # Keys saved while warming up, the warm-up must not overwrite them
+        self._saved_during_warm_up = None
+        self._warm = threading.Event()
+        self._warm_up_thread = None
+        self._stop = threading.Event()
+        self._flush_thread = None
+        # Last exception raised by the background warm-up or write-back
+        self.last_error = None
+        if warm_up:
+            self.start_warm_up()
+
+    # --------------------------------------------------------------------------
+    # StorageBackend interface
+    # --------------------------------------------------------------------------
+
+    def save_asset(self, asset: Asset):
+        self.save_assets([asset])
+
+    def load_asset(self, asset_code: str):
+        try:
+            return self.local.load_asset(asset_code)
+        except FileNotFoundError:
+            pass
+        asset = self.shared.load_asset(asset_code)
+        self._fill_local([asset], [])
+        return asset
+
+    def save_assets(self, assets: list[Asset]):
+        with self._lock:
+            self.local.save_assets(assets)
+            self._note_saved([asset.code for asset in assets])
+            if self.write_policy is WritePolicy.THROUGH:
+                self.shared.save_assets(assets)
+                return
+            for asset in assets:
+                self._pending_assets[asset.code] = asset
+        self._start_flusher()
+
+    def load_assets(self):
+        if self._warm.is_set():
+            return self.local.load_assets()
+        assets = {asset.code: asset for asset in self.shared.load_assets()}
+        with self._lock:
+            assets.update(self._pending_assets)
+        return list(assets.values())
+
+    def save_asset_version(self, asset_version: AssetVersion):
+        self.save_asset_versions([asset_version])
+
+    def load_asset_version(self,
+                           asset_code: str,
+                           department: str,
+                           version: int):
+        try:
+            return self.local.load_asset_version(
+                asset_code, department, version)
+        except FileNotFoundError:
+            pass
+        asset_version = self.shared.load_asset_version(
+            asset_code, department, version)
+        self._fill_local([], [asset_version])
+        return asset_version
+
+    def save_asset_versions(self, asset_versions: list[AssetVersion]):
+        with self._lock:
+            self.local.save_asset_versions(asset_versions)
+            self._note_saved([self._version_key(av) for av in asset_versions])
+            if self.write_policy is WritePolicy.THROUGH:
+                self.shared.save_asset_versions(asset_versions)
+                return
+            for asset_version in asset_versions:
+                self._pending_asset_versions[
+                    self._version_key(asset_version)] = asset_version
+        self._start_flusher()
+
+    def publish_asset_versions(
+            self,
+            asset_versions: list[AssetVersion],
+            skip_identical: bool = False
+    ):
+        if self.write_policy is WritePolicy.BACK:
+            # Written back later, conflicts with other writers are only
+            # checked against what is stored now
+            super().publish_asset_versions(asset_versions, skip_identical)
+            return
+        with self._lock:
+            self.shared.publish_asset_versions(asset_versions, skip_identical)
+            self.local.save_asset_versions(asset_versions)
+            self._note_saved([self._version_key(av) for av in asset_versions])
+
+    def publish_next_version(
+            self,
+            asset_code: str,
+            department: str,
+            status: str = 'active'
+    ) -> AssetVersion:
+        if self.write_policy is WritePolicy.BACK:
+            return super().publish_next_version(
+                asset_code, department, status)
+        with self._lock:
+            asset_version = self.shared.publish_next_version(
+                asset_code, department, status)
+            self.local.save_asset_versions([asset_version])
+            self._note_saved([self._version_key(asset_version)])
+        return asset_version
+
+    def get_head(self, asset_code: str, department: str) -> int:
+        with self._lock:
+            pending = [key[2] for key in self._pending_asset_versions
+                       if key[:2] == (asset_code, department)]
+        return max([self.shared.get_head(asset_code, department)] + pending)
+
+    def delete_asset_versions(self, keys) -> int:
+        """
+        Delete asset versions from both tiers, and drop them if they are
+        still waiting to be written back.
+
+        Returns:
+            int: the number of bytes deleted from the shared tier
+        """
+        keys = [tuple(key) for key in keys]
+        with self._lock:
+            for key in keys:
+                self._pending_asset_versions.pop(key, None)
+            deleted = self.shared.delete_asset_versions(keys)
+            self.local.delete_asset_versions(keys)
+        return deleted
+
+    def list_pruned_asset_version_keys(self):
+        return self.shared.list_pruned_asset_version_keys()
+
+    def load_asset_versions(self):
+        if self._warm.is_set():
+            return self.local.load_asset_versions()
+        asset_versions = {self._version_key(av): av
+                          for av in self.shared.load_asset_versions()}
+        with self._lock:
+            asset_versions.update(self._pending_asset_versions)
+        return list(asset_versions.values())
+
+    def load_assets_by_code(self, asset_codes):
+        asset_codes = list(asset_codes)
+        assets = self.local.load_assets_by_code(asset_codes)
+        missing = [code for code in asset_codes if code not in assets]
+        if missing:
+            fetched = self.shared.load_assets_by_code(missing)
+            self._fill_local(list(fetched.values()), [])
+            assets.update(fetched)
+        return assets
+
+    def load_asset_versions_by_keys(self, keys):
+        keys = [tuple(key) for key in keys]
+        asset_versions = self.local.load_asset_versions_by_keys(keys)
+        missing = [key for key in keys if key not in asset_versions]
+        if missing:
+            fetched = self.shared.load_asset_versions_by_keys(missing)
+            self._fill_local([], list(fetched.values()))
+            asset_versions.update(fetched)
+        return asset_versions
+
+    def iter_assets(self):
+        if self._warm.is_set():
+            return self.local.iter_assets()
+        return iter(self.load_assets())
+
+    def iter_asset_versions(self):
+        if self._warm.is_set():
+            return self.local.iter_asset_versions()
+        return iter(self.load_asset_versions())
+
+    def watch(self, baseline: bool = True):
+        return self.shared.watch(baseline)
+
+    def load_changes(self, changes):
+        # Other processes write to the shared tier, keep the local copy
+        # current
+        assets, asset_versions = self.shared.load_changes(changes)
+        self._fill_local(assets, asset_versions)
+        return assets, asset_versions
+
+    # --------------------------------------------------------------------------
+    # Warm-up
+    # --------------------------------------------------------------------------
+
+    @property
+    def is_warm(self) -> bool:
+        """Whether the local tier holds a full copy of the shared tier."""
+        return self._warm.is_set()
+
+    def start_warm_up(self) -> None:
+        """
+        Copy the shared tier to the local tier in a background thread.
+        """
+        with self._lock:
+            if self._warm_up_thread is not None and \
+                    self._warm_up_thread.is_alive():
+                return
+            self._warm_up_thread = threading.Thread(
+                target=self.warm_up, daemon=True)
+            self._warm_up_thread.start()
+
+    def wait_warm_up(self, timeout: float | None = None) -> bool:
+        """
+        Wait for the background warm-up.
+
+        Returns:
+            bool: True if the local tier is warm
+        """
+        return self._warm.wait(timeout)
+
+    def warm_up(self) -> None:
+        """
+        Copy every record of the shared tier to the local tier. Records saved
+        meanwhile are newer than the copy and kept.
+        """
+        with self._lock:
+            self._saved_during_warm_up = set()
+        try:
+            assets = self.shared.load_assets()
+            asset_versions = self.shared.load_asset_versions()
+            self._fill_local(assets, asset_versions)
+        except Exception as error:
+            self.last_error = error
+            return
+        finally:
+            with self._lock:
+                self._saved_during_warm_up = None
+        self._warm.set()
+
+    def _fill_local(
+            self,
+            assets: list[Asset],
+            asset_versions: list[AssetVersion]
+    ) -> None:
+        """ Copy records read from the shared tier to the local tier, unless
+            a newer copy was saved locally meanwhile.
+        """
+        with self._lock:
+            saved = self._saved_during_warm_up or set()
+            assets = [asset for asset in assets
+                      if asset.code not in self._pending_assets
+                      and asset.code not in saved]
+            asset_versions = [
+                av for av in asset_versions
+                if self._version_key(av) not in self._pending_asset_versions
+                and self._version_key(av) not in saved
+            ]
+            if assets:
+                self.local.save_assets(assets)
+            if asset_versions:
+                self.local.save_asset_versions(asset_versions)
+
+    def _note_saved(self, keys: list) -> None:
+        if self._saved_during_warm_up is not None:
+            self._saved_during_warm_up.update(keys)
+
+    # --------------------------------------------------------------------------
+    # Write-back
+    # --------------------------------------------------------------------------
+
+    @property
+    def pending_count(self) -> int:
+        """Number of saved records not written to the shared tier yet."""
+        with self._lock:
+            return len(self._pending_assets) + len(
+                self._pending_asset_versions)
+
+    def flush(self) -> None:
+        """
+        Write the pending records to the shared tier, one batch per record
+        type. Records that fail to be written stay pending.
+        """
+        with self._lock:
+            assets = list(self._pending_assets.values())
+            asset_versions = list(self._pending_asset_versions.values())
+            self._pending_assets = {}
+            self._pending_asset_versions = {}
+        try:
+            if assets:
+                self.shared.save_assets(assets)
+            if asset_versions:
+                self.shared.save_asset_versions(asset_versions)
+        except Exception:
+            with self._lock:
+                # Keep records saved again meanwhile, they are newer
+                for asset in assets:
+                    self._pending_assets.setdefault(asset.code, asset)
+                for av in asset_versions:
+                    self._pending_asset_versions.setdefault(
+                        self._version_key(av), av)
+            raise
+
+    def close(self) -> None:
+        """
+        Stop the background threads and flush the pending records.
+        """
+        self._stop.set()
+        if self._flush_thread is not None:
+            self._flush_thread.join()
+            self._flush_thread = None
+        if self._warm_up_thread is not None:
+            self._warm_up_thread.join()
+        self.flush()
+
+    def _start_flusher(self) -> None:
+        with self._lock:
+            if self._flush_thread is not None or self._stop.is_set():
+                return
+            self._flush_thread = threading.Thread(
+                target=self._flush_loop, daemon=True)
+            self._flush_thread.start()
+
+    def _flush_loop(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as error:
+                self.last_error = error
+
+    @staticmethod
+    def _version_key(asset_version: AssetVersion) -> tuple[str, str, int]:
+        return (asset_version.asset, asset_version.department,
+                asset_version.version)
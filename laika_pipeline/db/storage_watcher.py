@@ -0,0 +1,267 @@
+import ctypes
+import ctypes.util
+import errno
+import os
+import struct
+from dataclasses import dataclass, field
+
+
+@dataclass
+class ChangeSet:
+    """
+    Files that appeared or changed under a watched storage directory since
+    the previous poll.
+
+    Attributes:
+        changed (list[str]): paths of new or modified files
+        removed (list[str]): paths of deleted files
+        unreadable (list[str]): changed paths the storage could not parse,
+                                filled in by StorageBackend.load_changes
+    """
+    changed: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    unreadable: list[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.changed or self.removed)
+
+
+class PollingWatcher:
+    """
+    Detect changed files by comparing a manifest of (mtime, size) per file.
+    Works on every platform and filesystem (including network filers), each
+    poll costs one stat per file but only changed files are reported.
+    """
+
+    def __init__(self, roots: list[str], suffixes: tuple[str, ...],
+                 baseline: bool = True):
+        """
+        Args:
+            roots (list[str]): directories to watch recursively
+            suffixes (tuple[str, ...]): only report files with these endings
+            baseline (bool): if True, files existing now are not reported by
+                             the first poll
+        """
+        self.roots = roots
+        self.suffixes = suffixes
+        self._manifest = self._scan() if baseline else {}
+
+    def _scan(self) -> dict[str, tuple[int, int]]:
+        manifest = {}
+        pending = [root for root in self.roots if os.path.isdir(root)]
+        while pending:
+            directory = pending.pop()
+            try:
+                entries = os.scandir(directory)
+            except FileNotFoundError:
+                continue
+            with entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    elif entry.name.endswith(self.suffixes):
+                        try:
+                            stat = entry.stat()
+                        except FileNotFoundError:
+                            continue
+                        manifest[entry.path] = (stat.st_mtime_ns,
+                                                stat.st_size)
+        return manifest
+
+    def poll(self) -> ChangeSet:
+        """
+        Return the files that changed since the previous poll.
+        """
+        manifest = self._scan()
+        previous = self._manifest
+        changes = ChangeSet(
+            changed=[path for path, stat in manifest.items()
+                     if previous.get(path) != stat],
+            removed=[path for path in previous if path not in manifest]
+        )
+        self._manifest = manifest
+        return changes
+
+    def retry(self, paths: list[str]) -> None:
+        """
+        Report these paths again on the next poll, e.g. because they were
+        caught half written.
+        """
+        for path in paths:
+            self._manifest.pop(path, None)
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher:
+    """
+    Detect changed files through Linux inotify, so a poll only reads the
+    queued kernel events and its cost scales with the number of changes.
+    Falls back to a full rescan if the kernel event queue overflowed.
+    """
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_Q_OVERFLOW = 0x00004000
+    IN_ISDIR = 0x40000000
+    WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE
+                  | IN_DELETE)
+    _EVENT = struct.Struct('iIII')
+
+    def __init__(self, roots: list[str], suffixes: tuple[str, ...],
+                 baseline: bool = True):
+        """
+        Args:
+            roots (list[str]): directories to watch recursively
+            suffixes (tuple[str, ...]): only report files with these endings
+            baseline (bool): if True, files existing now are not reported by
+                             the first poll
+
+        Raises:
+            OSError: if inotify is unavailable or the watch limit is reached
+        """
+        self.roots = roots
+        self.suffixes = suffixes
+        self._libc = _load_libc()
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._directories = {}
+        self._pending = ChangeSet()
+        try:
+            for root in roots:
+                if os.path.isdir(root):
+                    self._watch_tree(root, report=not baseline)
+        except OSError:
+            self.close()
+            raise
+
+    def _watch_tree(self, directory: str, report: bool) -> None:
+        """Watch a directory and its subdirectories, optionally reporting the
+        files already in them (for directories created after the baseline).
+        """
+        pending = [directory]
+        while pending:
+            current = pending.pop()
+            wd = self._libc.inotify_add_watch(
+                self._fd, os.fsencode(current), self.WATCH_MASK)
+            if wd < 0:
+                error = ctypes.get_errno()
+                if error == errno.ENOENT:
+                    continue
+                raise OSError(error, f"inotify_add_watch failed: {current}")
+            self._directories[wd] = current
+            try:
+                entries = os.scandir(current)
+            except FileNotFoundError:
+                continue
+            with entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    elif report and entry.name.endswith(self.suffixes):
+                        self._pending.changed.append(entry.path)
+
+    def poll(self) -> ChangeSet:
+        """
+        Return the files that changed since the previous poll.
+        """
+        changed = dict.fromkeys(self._pending.changed)
+        removed = dict.fromkeys(self._pending.removed)
+        self._pending = ChangeSet()
+        while True:
+            try:
+                buffer = os.read(self._fd, 1 << 16)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(buffer):
+                wd, mask, _, length = self._EVENT.unpack_from(buffer, offset)
+                offset += self._EVENT.size
+                name = os.fsdecode(
+                    buffer[offset:offset + length].rstrip(b'\0'))
+                offset += length
+                if mask & self.IN_Q_OVERFLOW:
+                    return self._rescan()
+                directory = self._directories.get(wd)
+                if directory is None:
+                    continue
+                path = os.path.join(directory, name)
+                if mask & self.IN_ISDIR:
+                    if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                        self._watch_tree(path, report=True)
+                        changed.update(
+                            dict.fromkeys(self._pending.changed))
+                        self._pending = ChangeSet()
+                    continue
+                if not name.endswith(self.suffixes):
+                    continue
+                if mask & (self.IN_DELETE | self.IN_MOVED_FROM):
+                    changed.pop(path, None)
+                    removed[path] = None
+                elif mask & (self.IN_CLOSE_WRITE | self.IN_MOVED_TO):
+                    removed.pop(path, None)
+                    changed[path] = None
+        return ChangeSet(changed=list(changed), removed=list(removed))
+
+    def retry(self, paths: list[str]) -> None:
+        """
+        Report these paths again on the next poll, e.g. because they were
+        caught half written.
+        """
+        self._pending.changed.extend(paths)
+
+    def _rescan(self) -> ChangeSet:
+        """Events were lost, report every file as changed."""
+        changes = PollingWatcher(self.roots, self.suffixes, baseline=False)
+        return changes.poll()
+
+    def close(self) -> None:
+        if self._fd is not None and self._fd >= 0:
+            os.close(self._fd)
+        self._fd = None
+
+    def __del__(self):
+        self.close()
+
+
+def _load_libc():
+    libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+    # Raises AttributeError on platforms without inotify
+    libc.inotify_init1
+    libc.inotify_add_watch.argtypes = [
+        ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    return libc
+
+
+def create_watcher(
+        roots: list[str],
+        suffixes: tuple[str, ...] = ('.json',),
+        baseline: bool = True,
+        use_inotify: bool = True
+) -> InotifyWatcher | PollingWatcher:
+    """
+    Create the best available watcher for the given directories: inotify on
+    Linux, otherwise a manifest based polling watcher.
+
+    Args:
+        roots (list[str]): directories to watch recursively
+        suffixes (tuple[str, ...]): only report files with these endings
+        baseline (bool): if True, files existing now are not reported by the
+                         first poll
+        use_inotify (bool): set to False to force polling, e.g. for network
+                            filesystems where inotify misses remote writes
+
+    Returns:
+        InotifyWatcher | PollingWatcher: the watcher
+    """
+    if use_inotify:
+        try:
+            return InotifyWatcher(roots, suffixes, baseline)
+        except (OSError, AttributeError, TypeError):
+            pass
+    return PollingWatcher(roots, suffixes, baseline)
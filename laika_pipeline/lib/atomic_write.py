@@ -0,0 +1,55 @@
+import os
+import threading
+
+
+def atomic_write(path: str, data: bytes, fsync: bool = False) -> None:
+    """
+    Write data to a file so readers only ever see the old or the new content:
+    the data is written to a temporary file in the same directory which is
+    then renamed over the target. A killed process leaves at most a stray
+    temporary file, never a truncated target.
+
+    Args:
+        path (str): The path of the file to write.
+        data (bytes): The complete new content of the file.
+        fsync (bool): If True, flush the data to disk before the rename and
+                      the directory entry after it.
+    """
+    directory, name = os.path.split(path)
+    temp_path = os.path.join(
+        directory, f".{name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(temp_path, 'wb') as fp:
+            fp.write(data)
+            if fsync:
+                fp.flush()
+                os.fsync(fp.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    if fsync:
+        fsync_directory(directory)
+
+
+def fsync_directory(directory: str) -> None:
+    """
+    Flush a directory entry to disk, making renames into it durable. This is
+    a no-op on platforms that cannot open directories (Windows).
+
+    Args:
+        directory (str): The directory to flush.
+    """
+    try:
+        fd = os.open(directory or '.', os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
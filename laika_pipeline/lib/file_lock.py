@@ -0,0 +1,159 @@
+import errno
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    """
+    Advisory exclusive lock on a file, shared by every process (and host,
+    on filesystems supporting POSIX record locks such as NFS) that locks the
+    same path. Within a process it is held by one thread at a time and is
+    reentrant, so a thread holding it can call code that locks it again.
+
+    Only cooperating writers are excluded, the locked file itself is never
+    read or written.
+
+    Example:
+        >>> lock = FileLock('/projects/show/storage.lock', timeout=30)
+        >>> with lock:
+        ...     # critical section
+    """
+
+    # Per path state shared by every FileLock of this process: POSIX locks
+    # belong to the process, and closing any descriptor of the file would
+    # release them, so the descriptor must be shared too.
+    _states = {}
+    _states_lock = threading.Lock()
+
+    def __init__(
+            self,
+            path: str,
+            timeout: float | None = None,
+            poll_interval: float = 0.01
+    ):
+        """
+        Args:
+            path (str): the lock file, created if it does not exist
+            timeout (float | None): seconds to wait for the lock before
+                                    raising TimeoutError, None waits forever
+            poll_interval (float): seconds between attempts while waiting
+                                   with a timeout
+        """
+        self.path = path
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        with FileLock._states_lock:
+            self._state = FileLock._states.setdefault(
+                os.path.realpath(path), _LockState())
+
+    def __enter__(self) -> 'FileLock':
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        self.release()
+        return False
+
+    @property
+    def is_held(self) -> bool:
+        """Whether the calling thread holds the lock."""
+        return self._state.owner == threading.get_ident()
+
+    def acquire(self) -> None:
+        """
+        Wait for the lock and take it.
+
+        Raises:
+            TimeoutError: if the lock was not obtained within the timeout
+        """
+        state = self._state
+        deadline = None if self.timeout is None \
+            else time.monotonic() + self.timeout
+        if not state.thread_lock.acquire(
+                timeout=-1 if self.timeout is None else self.timeout):
+            raise TimeoutError(f"Timed out waiting for the lock {self.path}")
+        try:
+            if state.depth == 0:
+                state.fd = self._lock_file(deadline)
+                state.owner = threading.get_ident()
+            state.depth += 1
+        except BaseException:
+            state.thread_lock.release()
+            raise
+
+    def release(self) -> None:
+        """
+        Release the lock once per acquire().
+
+        Raises:
+            RuntimeError: if the calling thread does not hold the lock
+        """
+        state = self._state
+        if not self.is_held:
+            raise RuntimeError(f"The lock {self.path} is not held")
+        state.depth -= 1
+        if state.depth == 0:
+            fd, state.fd, state.owner = state.fd, None, None
+            try:
+                _unlock(fd)
+            finally:
+                os.close(fd)
+        state.thread_lock.release()
+
+    def _lock_file(self, deadline: float | None) -> int:
+        """ Open the lock file and lock it for this process. """
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o666)
+        try:
+            if deadline is None and fcntl is not None:
+                fcntl.lockf(fd, fcntl.LOCK_EX)
+                return fd
+            while not _try_lock(fd):
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise TimeoutError(
+                        f"Timed out waiting for the lock {self.path}")
+                time.sleep(self.poll_interval)
+            return fd
+        except BaseException:
+            os.close(fd)
+            raise
+
+
+class _LockState:
+    """ The lock of one path within this process. """
+
+    def __init__(self):
+        self.thread_lock = threading.RLock()
+        self.fd = None
+        self.owner = None
+        self.depth = 0
+
+
+def _try_lock(fd: int) -> bool:
+    """ Lock a file without waiting, False if another process holds it. """
+    try:
+        if fcntl is not None:
+            fcntl.lockf(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+    except OSError as error:
+        if error.errno in (errno.EACCES, errno.EAGAIN, errno.EDEADLK):
+            return False
+        raise
+    return True
+
+
+def _unlock(fd: int) -> None:
+    if fcntl is not None:
+        fcntl.lockf(fd, fcntl.LOCK_UN)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
@@ -9,6 +9,11 @@ class AssetVersion():
     A class representing an asset version in the pipeline
     """
 
+    # Weak reference to the Project indexing this version, told about status
+    # changes made through the setter so they are saved and kept out of
+    # open snapshots, see Project._status_set
+    _owner = None
+
     def __init__(self,
                  asset: str,
                  department: str,
@@ -96,10 +101,14 @@ class AssetVersion():
     @status.setter
     def status(self, value: str | Status):
         if isinstance(value, str):
-            value = Status.from_string(value)
+            value, _ = Status.from_string(value)
         if not isinstance(value, Status):
             raise TypeError("Status must be a valid Status.")
-        self._status = value
+        owner = self._owner() if self._owner is not None else None
+        if owner is not None and self._status != value:
+            owner._status_set(self, value)
+        else:
+            self._status = value
 
     def _normalize_status(self, value: str | Status) -> Status | str:
         if isinstance(value, Status):
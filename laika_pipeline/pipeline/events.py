@@ -0,0 +1,391 @@
+from __future__ import annotations
+
+import json
+import os
+import queue
+import socket
+import stat
+import threading
+import time
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Iterable, Iterator
+
+
+class ChangeType(Enum):
+    """
+    The kinds of changes a Project reports to its subscribers.
+    """
+
+    ASSET_ADDED = 'asset_added'
+    VERSION_ADDED = 'version_added'
+    STATUS_CHANGED = 'status_changed'
+    LOADED = 'loaded'
+    SAVED = 'saved'
+    PRUNED = 'pruned'
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    """
+    A structured change notification emitted by a Project.
+
+    Attributes:
+        change_type (ChangeType): what happened
+        project (str): name of the project that emitted the event
+        sequence (int): monotonically increasing number per event bus
+        timestamp (float): time.time() when the event was emitted
+        data (dict): change specific payload, e.g. the asset version dict
+    """
+    change_type: ChangeType
+    project: str
+    sequence: int
+    timestamp: float
+    data: dict = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        """
+        Convert the ChangeEvent to a JSON serialisable dictionary.
+        """
+        return {
+            "change_type": self.change_type.value,
+            "project": self.project,
+            "sequence": self.sequence,
+            "timestamp": self.timestamp,
+            "data": self.data
+        }
+
+    @staticmethod
+    def from_dict(data: dict) -> ChangeEvent:
+        """
+        Create a ChangeEvent from a dictionary created by to_dict.
+        """
+        return ChangeEvent(
+            change_type=ChangeType(data["change_type"]),
+            project=data["project"],
+            sequence=data["sequence"],
+            timestamp=data["timestamp"],
+            data=data.get("data", {})
+        )
+
+
+class Subscription:
+    """
+    A subscriber's bounded queue of change events. When the queue is full the
+    oldest event is dropped so a slow consumer never blocks the publisher;
+    `dropped` counts the lost events.
+    """
+
+    def __init__(
+            self,
+            bus: EventBus,
+            maxsize: int = 1000,
+            change_types: Iterable[ChangeType] | None = None
+    ):
+        self._bus = bus
+        self._queue = queue.Queue(maxsize=maxsize)
+        self.change_types = (
+            frozenset(change_types) if change_types is not None else None
+        )
+        self.dropped = 0
+
+    def wants(self, change_type: ChangeType) -> bool:
+        return self.change_types is None or change_type in self.change_types
+
+    def put(self, event: ChangeEvent) -> None:
+        while True:
+            try:
+                self._queue.put_nowait(event)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout: float | None = None) -> ChangeEvent | None:
+        """
+        Wait for the next event.
+
+        Args:
+            timeout (float | None): seconds to wait, None waits forever
+
+        Returns:
+            ChangeEvent | None: the next event or None on timeout
+        """
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def drain(self) -> list[ChangeEvent]:
+        """
+        Return every queued event without waiting.
+        """
+        events = []
+        while True:
+            try:
+                events.append(self._queue.get_nowait())
+            except queue.Empty:
+                return events
+
+    def close(self) -> None:
+        """
+        Stop receiving events.
+        """
+        self._bus.unsubscribe(self)
+
+    def __enter__(self) -> Subscription:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class EventBus:
+    """
+    In-process publish/subscribe hub used by Project to report mutations.
+    Publishing is a no-op when nobody is subscribed, and publishers check
+    has_subscribers before building a payload, so bulk loads do not pay for
+    events nobody reads.
+    """
+
+    def __init__(self, project_name: str = ""):
+        self.project_name = project_name
+        self._subscriptions = ()
+        self._lock = threading.Lock()
+        self._sequence = 0
+
+    @property
+    def has_subscribers(self) -> bool:
+        return bool(self._subscriptions)
+
+    def subscribe(
+            self,
+            maxsize: int = 1000,
+            change_types: Iterable[ChangeType] | None = None
+    ) -> Subscription:
+        """
+        Register a new subscriber.
+
+        Args:
+            maxsize (int): bound of the subscriber's queue
+            change_types (Iterable[ChangeType] | None): only receive these
+                                                       kinds of events, None
+                                                       receives everything
+
+        Returns:
+            Subscription: the subscriber's queue
+        """
+        subscription = Subscription(self, maxsize, change_types)
+        with self._lock:
+            self._subscriptions = self._subscriptions + (subscription,)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscriptions = tuple(
+                s for s in self._subscriptions if s is not subscription)
+
+    def publish(
+            self,
+            change_type: ChangeType,
+            data: dict | None = None
+    ) -> ChangeEvent | None:
+        """
+        Send an event to every interested subscriber.
+
+        Returns:
+            ChangeEvent | None: the event, or None if nobody is subscribed
+        """
+        subscriptions = self._subscriptions
+        if not subscriptions:
+            return None
+        with self._lock:
+            self._sequence += 1
+            sequence = self._sequence
+        event = ChangeEvent(
+            change_type=change_type,
+            project=self.project_name,
+            sequence=sequence,
+            timestamp=time.time(),
+            data=data or {}
+        )
+        for subscription in subscriptions:
+            if subscription.wants(change_type):
+                subscription.put(event)
+        return event
+
+
+class EventSocketServer:
+    """
+    Optional fan-out of an EventBus to other processes over a local socket.
+    Every event is written to each connected client as one JSON line.
+
+    The address is either a filesystem path (Unix domain socket) or a
+    (host, port) tuple for TCP, use port 0 to pick a free port.
+    """
+
+    # Seconds a client may block a write before it is disconnected
+    CLIENT_TIMEOUT = 1.0
+
+    def __init__(
+            self,
+            bus: EventBus,
+            address: str | tuple[str, int],
+            maxsize: int = 10000
+    ):
+        self._bus = bus
+        self._requested_address = address
+        self._maxsize = maxsize
+        self._server = None
+        self._subscription = None
+        self._clients = []
+        self._clients_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+
+    @property
+    def address(self) -> str | tuple[str, int]:
+        """The bound address, with the real port when port 0 was requested."""
+        if self._server is None:
+            return self._requested_address
+        return self._server.getsockname()
+
+    @property
+    def client_count(self) -> int:
+        """Number of currently connected clients."""
+        return len(self._clients)
+
+    def start(self) -> EventSocketServer:
+        """
+        Bind the socket and start the accept and forwarding threads. A stale
+        Unix socket left at the address is replaced.
+
+        Raises:
+            FileExistsError: if a file other than a socket is at the address
+        """
+        address = self._requested_address
+        if isinstance(address, str):
+            if os.path.exists(address):
+                if not _is_socket(address):
+                    raise FileExistsError(
+                        f"Cannot serve events on {address}, a file that is "
+                        f"not a socket exists there")
+                os.remove(address)
+            self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._server.bind(address)
+            self._server.listen()
+        else:
+            self._server = socket.create_server(address)
+        self._server.settimeout(0.2)
+        self._subscription = self._bus.subscribe(maxsize=self._maxsize)
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._accept_loop, daemon=True),
+            threading.Thread(target=self._forward_loop, daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stop forwarding, disconnect the clients and close the socket.
+        """
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+        if self._subscription:
+            self._subscription.close()
+        with self._clients_lock:
+            for client in self._clients:
+                client.close()
+            self._clients = []
+        if self._server:
+            self._server.close()
+            if isinstance(self._requested_address, str) \
+                    and _is_socket(self._requested_address):
+                os.remove(self._requested_address)
+            self._server = None
+
+    def __enter__(self) -> EventSocketServer:
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _accept_loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                client, _ = self._server.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            client.settimeout(self.CLIENT_TIMEOUT)
+            with self._clients_lock:
+                self._clients.append(client)
+
+    def _forward_loop(self) -> None:
+        while not self._stop.is_set():
+            event = self._subscription.get(timeout=0.2)
+            if event is None:
+                continue
+            line = (json.dumps(event.to_dict()) + "\n").encode()
+            # Send outside the lock so a slow client does not block
+            # accepting new ones
+            with self._clients_lock:
+                clients = list(self._clients)
+            failed = []
+            for client in clients:
+                try:
+                    client.sendall(line)
+                except OSError:
+                    failed.append(client)
+            if failed:
+                with self._clients_lock:
+                    for client in failed:
+                        client.close()
+                        if client in self._clients:
+                            self._clients.remove(client)
+
+
+def _is_socket(path: str) -> bool:
+    try:
+        return stat.S_ISSOCK(os.stat(path).st_mode)
+    except FileNotFoundError:
+        return False
+
+
+def iter_socket_events(
+        address: str | tuple[str, int],
+        timeout: float | None = None
+) -> Iterator[ChangeEvent]:
+    """
+    Connect to an EventSocketServer and yield its events as they arrive.
+
+    Args:
+        address (str | tuple[str, int]): Unix socket path or (host, port)
+        timeout (float | None): stop after this many idle seconds, None waits
+                                forever
+
+    Yields:
+        ChangeEvent: the events published by the remote project
+    """
+    if isinstance(address, str):
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        client.connect(address)
+    else:
+        client = socket.create_connection(address)
+    client.settimeout(timeout)
+    with client, client.makefile('r') as stream:
+        while True:
+            try:
+                line = stream.readline()
+            except socket.timeout:
+                return
+            if not line:
+                return
+            yield ChangeEvent.from_dict(json.loads(line))
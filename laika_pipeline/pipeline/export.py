@@ -0,0 +1,106 @@
+import csv
+import json
+from typing import Callable, Iterable, Iterator, TextIO
+
+from laika_pipeline.pipeline.asset import Asset
+from laika_pipeline.pipeline.asset_version import AssetVersion
+from laika_pipeline.validation.operation_result import OperationResult
+from laika_pipeline.db.json_codec import JSONCodec
+
+# Fastest installed JSON library, manifests can hold millions of entries
+MANIFEST_CODEC = JSONCodec(compact=True, codec='auto')
+
+# Formats and columns of write_records()
+EXPORT_FORMATS = ('jsonl', 'csv')
+EXPORT_FIELDS = {
+    'assets': ['name', 'asset_type', 'code'],
+    'asset_versions': ['asset', 'department', 'version', 'status'],
+}
+
+
+def write_records(
+        stream: TextIO,
+        format: str,
+        record_type: str,
+        records: Callable[[str], Iterator]
+) -> OperationResult:
+    """
+    Write records to a text stream, one at a time, as JSON Lines or CSV.
+
+    Args:
+        stream (TextIO): where to write
+        format (str): 'jsonl' (one JSON object per line) or 'csv'
+        record_type (str): 'assets' or 'asset_versions'
+        records (Callable): returns the records of a record type
+
+    Returns:
+        OperationResult: success with the number of written records under
+                         "count", failure if the format or record type is
+                         unknown
+    """
+    if format not in EXPORT_FORMATS:
+        return OperationResult(
+            success=False,
+            error_message=(
+                f"Invalid export format '{format}'. Must be one of: "
+                f"{', '.join(EXPORT_FORMATS)}")
+        )
+    if record_type not in EXPORT_FIELDS:
+        return OperationResult(
+            success=False,
+            error_message=(
+                f"Invalid record type '{record_type}'. Must be one of: "
+                f"{', '.join(EXPORT_FIELDS)}")
+        )
+    count = 0
+    if format == 'csv':
+        writer = csv.DictWriter(
+            stream, fieldnames=EXPORT_FIELDS[record_type])
+        writer.writeheader()
+        for record in records(record_type):
+            writer.writerow(record.to_dict())
+            count += 1
+    else:
+        for record in records(record_type):
+            stream.write(json.dumps(record.to_dict()) + '\n')
+            count += 1
+    return OperationResult(success=True, data={"count": count})
+
+
+def write_manifest(
+        stream: TextIO,
+        assets: Iterable[Asset],
+        asset_versions: Iterable[AssetVersion]
+) -> OperationResult:
+    """
+    Write asset versions as a JSON array in the manifest format read by
+    Project.load_assets, one entry at a time.
+
+    Returns:
+        OperationResult: success with the number of written entries under
+                         "count", and under "orphans" the number of versions
+                         left out because their asset is unknown
+    """
+    assets = {
+        asset.code: {"name": asset.name, "type": asset.asset_type.value}
+        for asset in assets
+    }
+    count = orphans = 0
+    separator = '\n'
+    stream.write('[')
+    for asset_version in asset_versions:
+        asset = assets.get(asset_version.asset)
+        if asset is None:
+            orphans += 1
+            continue
+        stream.write(separator + MANIFEST_CODEC.dumps_line({
+            "asset": asset,
+            "department": asset_version.department,
+            "version": asset_version.version,
+            "status": asset_version.status.value
+        }).decode())
+        separator = ',\n'
+        count += 1
+    stream.write('\n]\n')
+    return OperationResult(
+        success=True, data={"count": count, "orphans": orphans})
@@ -1,33 +1,142 @@
+import threading
+import time
+import weakref
+from bisect import bisect_left, bisect_right
+from itertools import islice
+from typing import Callable, Iterable, Iterator, TextIO
+
 from laika_pipeline.lib.load_json import load_json
 
 from laika_pipeline.pipeline.asset import Asset
 from laika_pipeline.pipeline.asset_version import AssetVersion
+from laika_pipeline.pipeline.status import Status
+from laika_pipeline.pipeline.events import ChangeType, EventBus
+from laika_pipeline.pipeline.transaction import Transaction
+from laika_pipeline.pipeline.snapshot import ProjectSnapshot
+from laika_pipeline.pipeline.retention import (
+    RetentionPolicy, RetentionReport, write_archive)
 from laika_pipeline.validation.operation_result import OperationResult
-from laika_pipeline.validation.asset_validator import AssetValidator
-from laika_pipeline.validation.asset_version_validator import (
-    AssetVersionValidator)
+from laika_pipeline.validation.rules import RuleEngine
+from laika_pipeline.validation.consistency import check_integrity, sweep
 from laika_pipeline.db.storage_backend import StorageBackend
+from laika_pipeline.pipeline.export import (
+    EXPORT_FIELDS, EXPORT_FORMATS, MANIFEST_CODEC, write_manifest,
+    write_records)
+
+
+def _sort_manifest_entries(entries: list[dict]) -> list[dict]:
+    """ Order manifest entries by version within each asset and department,
+        keeping the departments in the order they first appear. A single
+        stable sort, O(N log N). Entries with a non integer version keep
+        their place after the valid ones of their department, for the
+        validators to reject.
+    """
+    groups = {}
+
+    def sort_key(entry: dict) -> tuple:
+        asset_entry = entry['asset']
+        group = groups.setdefault(
+            (asset_entry['name'], asset_entry['type'], entry['department']),
+            len(groups))
+        version = entry['version']
+        if isinstance(version, int) and not isinstance(version, bool):
+            return group, 0, version
+        return group, 1, 0
+
+    return sorted(entries, key=sort_key)
+
+
+def _to_status(status: str | Status) -> Status | None:
+    """ The Status of a string or Status, None if it is not valid. """
+    if isinstance(status, str):
+        status, _ = Status.from_string(status)
+    return status if isinstance(status, Status) else None
+
+
+def _invalid_status() -> OperationResult:
+    valid = ", ".join(Status.list_values())
+    return OperationResult(
+        success=False,
+        error_message=f"Invalid status. Must be one of: {valid}"
+    )
 
 
 class Project():
     """
     A class representing a project in the pipeline.
     """
+
+    # Formats and columns of export()
+    EXPORT_FORMATS = EXPORT_FORMATS
+    EXPORT_FIELDS = EXPORT_FIELDS
+
     def __init__(
             self,
             name: str,
             storage_backend: StorageBackend = None
             ):
         self._name = name
+        # Given to the indexed asset versions, see AssetVersion._owner
+        self._weak_self = weakref.ref(self)
         self._assets = []
         self._asset_versions = []
         self.validation_errors = []
+        # Validation rules run by add_asset / add_asset_version, rules can
+        # be disabled per project, see validation/rules.py
+        self.rules = RuleEngine()
         self.storage_backend = storage_backend
+        # Subscribers receive a ChangeEvent for every mutation, see events.py
+        self.events = EventBus(name)
+        # Reports storage changes since the last load, used by refresh()
+        self._watcher = None
+        # NOTE: the lists above keep insertion order for backwards
+        # compatibility, the dictionaries below index the same objects so
+        # lookups and validation do not need to scan every record.
+        self._assets_by_code = {}
+        self._assets_by_key = {}
+        self._versions_by_key = {}
+        self._versions_by_asset = {}
+        # Sorted asset codes used as stable ordering keys when paging, built
+        # lazily and invalidated whenever an asset is added.
+        self._sorted_codes = None
+        # Latest version per (asset code, department, status), updated
+        # incrementally on every add and status change.
+        self._latest_by_status = {}
+        # Records added since the last load or save, and saved asset
+        # versions whose status changed since, by key. save() only writes
+        # these so it never overwrites what other processes stored.
+        self._unsaved_assets = []
+        self._unsaved_versions = []
+        self._changed_versions = {}
+        # Keys of the asset versions deleted by prune(), here or in storage,
+        # so integrity checks do not report their numbers as missing
+        self._pruned_keys = set()
+        # Set when the storage backend is replaced, the next save writes
+        # every record since the new backend has none of them
+        self._full_save = False
+        # Open Transaction staging the changes, see transaction()
+        self._transaction = None
+        # Live snapshots, given a copy of every asset version before its
+        # status changes. The lock makes the copy and the change atomic for
+        # readers.
+        self._snapshots = weakref.WeakSet()
+        self._snapshot_lock = threading.Lock()
+        # Serializes publish_next_version between threads
+        self._publish_lock = threading.Lock()
 
     @property
     def name(self):
         return self._name
 
+    @property
+    def storage_backend(self) -> StorageBackend | None:
+        return self._storage_backend
+
+    @storage_backend.setter
+    def storage_backend(self, storage_backend: StorageBackend | None):
+        self._storage_backend = storage_backend
+        self._full_save = True
+
     @property
     def assets(self):
         return self._assets
@@ -38,17 +147,47 @@ class Project():
 
     def load_assets(
             self,
-            file_path: str
+            file_path: str,
+            trusted: bool = False,
+            sort: bool = False
     ) -> None:
         """
         Load Assets and Asset Versions from a given json file.
 
+        Trusted files, e.g. a backup of data validated when it was written,
+        skip the contextual rules entry by entry. A single consistency sweep
+        over the whole project runs after ingesting instead, and its
+        violations are added to validation_errors in one batch.
+
         Args:
             file_path (str): the path to the json file containing the asset and
                              asset version data
+            trusted (bool): defer the contextual checks. Defaults to False.
+            sort (bool): order the entries of each asset and department by
+                         version before validating them, so a complete
+                         manifest listing versions out of order is accepted.
+                         Defaults to False.
         """
         data = load_json(file_path)
-        for entry in data:
+        if sort:
+            data = _sort_manifest_entries(data)
+        if not trusted:
+            self._add_manifest_entries(data)
+            return
+        self._add_trusted_manifest_entries(data, validate=True)
+        result = self.check_consistency()
+        self.validation_errors.extend(
+            violation.message for violation in result.data["violations"])
+
+    def _add_manifest_entries(self, entries: Iterable[dict]) -> dict:
+        """ Validate and add the asset version and asset of each manifest
+            entry, collecting failures in validation_errors.
+
+        Returns:
+            dict: the number of added assets and asset versions
+        """
+        counts = {"assets": 0, "asset_versions": 0}
+        for entry in entries:
             asset_entry = entry['asset']
             asset = Asset(
                         name=asset_entry['name'],
@@ -64,9 +203,14 @@ class Project():
             validation_result = self.add_asset_version(asset_version)
             if not validation_result.success:
                 self.validation_errors.append(validation_result.error_message)
+            else:
+                counts["asset_versions"] += 1
             validation_result = self.add_asset(asset)
             if not validation_result.success:
                 self.validation_errors.append(validation_result.error_message)
+            else:
+                counts["assets"] += 1
+        return counts
 
     def add_asset(
         self,
@@ -88,19 +232,13 @@ class Project():
         """
         if not isinstance(asset, Asset):
             raise TypeError("Asset must be an instance of Asset.")
-        valid_asset = asset.validate()
-        if valid_asset.success is False:
-            return valid_asset
-
-        validator = AssetValidator()
-        result = validator.validate_asset_has_version(asset, self)
+        result = self.rules.compile('asset')(asset, self)
         if result.success is False:
-            return result
-        result = validator.validate_asset_is_unique(asset, self)
-        if result.success is False:
-            return result
+            return self._failed(result)
 
-        self.assets.append(asset)
+        self._index_asset(asset)
+        self._unsaved_assets.append(asset)
+        self._publish(ChangeType.ASSET_ADDED, asset.to_dict)
         return OperationResult(
             success=True,
             data={"asset_code": asset.code}
@@ -129,19 +267,13 @@ class Project():
         if not isinstance(asset_version, AssetVersion):
             raise TypeError(
                 "Asset version must be an instance of AssetVersion.")
-        valid_asset_version = asset_version.validate()
-        if valid_asset_version.success is False:
-            return valid_asset_version
-
-        validator = AssetVersionValidator()
-        result = validator.validate_linear_versioning(asset_version, self)
-        if result.success is False:
-            return result
-        result = validator.validate_version_is_unique(asset_version, self)
+        result = self.rules.compile('asset_version')(asset_version, self)
         if result.success is False:
-            return result
+            return self._failed(result)
 
-        self.asset_versions.append(asset_version)
+        self._index_asset_version(asset_version)
+        self._unsaved_versions.append(asset_version)
+        self._publish(ChangeType.VERSION_ADDED, asset_version.to_dict)
         return OperationResult(
             success=True,
             data={
@@ -178,10 +310,9 @@ class Project():
         Returns:
             Asset | None: The retrieved asset or None if not found
         """
-        for asset in self.assets:
-            if (asset.name == asset_name
-               and asset.asset_type.value == asset_type):
-                return asset
+        asset = self.find_asset(asset_name, asset_type)
+        if asset:
+            return asset
         validation_result = OperationResult(
             success=False,
             error_message=(
@@ -210,9 +341,10 @@ class Project():
         asset = self.get_asset(asset_name, asset_type)
         if not asset:
             return None
-        for asset_version in self.asset_versions:
-            if (asset_version.asset == asset.code
-               and asset_version.version == version_num):
+        for department in self._versions_by_asset.get(asset.code, {}):
+            asset_version = self._versions_by_key.get(
+                (asset.code, department, version_num))
+            if asset_version:
                 return asset_version
         validation_result = OperationResult(
             success=False,
@@ -224,22 +356,1284 @@ class Project():
         self.validation_errors.append(validation_result.error_message)
         return None
 
+    def get_assets_bulk(
+            self,
+            keys: Iterable[tuple[str, str]]
+    ) -> tuple[list[Asset | None], list[tuple[str, str]]]:
+        """
+        Retrieve many assets in a single indexed pass. Misses are returned
+        instead of being logged as validation errors.
+
+        Args:
+            keys (Iterable[tuple[str, str]]): (asset_name, asset_type) keys
+
+        Returns:
+            tuple: the assets aligned with the input keys (None on a miss),
+                   and the list of keys that were not found
+        """
+        index = self._assets_by_key
+        results = []
+        missing = []
+        for key in keys:
+            key = tuple(key)
+            asset = index.get(key)
+            results.append(asset)
+            if asset is None:
+                missing.append(key)
+        return results, missing
+
+    def get_asset_versions_bulk(
+            self,
+            keys: Iterable[tuple[str, str, int]]
+    ) -> tuple[list[AssetVersion | None], list[tuple[str, str, int]]]:
+        """
+        Retrieve many asset versions in a single indexed pass, with the same
+        matching rules as get_asset_version. Misses are returned instead of
+        being logged as validation errors.
+
+        Args:
+            keys (Iterable[tuple[str, str, int]]): (asset_name, asset_type,
+                                                   version_num) keys
+
+        Returns:
+            tuple: the asset versions aligned with the input keys (None on a
+                   miss), and the list of keys that were not found
+        """
+        assets = self._assets_by_key
+        versions = self._versions_by_key
+        results = []
+        missing = []
+        for key in keys:
+            asset_name, asset_type, version_num = key
+            asset_version = None
+            asset = assets.get((asset_name, asset_type))
+            if asset is not None:
+                for department in self._versions_by_asset.get(asset.code, {}):
+                    asset_version = versions.get(
+                        (asset.code, department, version_num))
+                    if asset_version is not None:
+                        break
+            results.append(asset_version)
+            if asset_version is None:
+                missing.append((asset_name, asset_type, version_num))
+        return results, missing
+
+    def find_asset(self, asset_name: str, asset_type: str) -> Asset | None:
+        """
+        Retrieve an asset by name and type. Unlike get_asset, a miss is not
+        logged as a validation error.
+
+        Args:
+            asset_name (str): name of the asset
+            asset_type (str): type of the asset
+
+        Returns:
+            Asset | None: The asset or None if not found
+        """
+        return self._assets_by_key.get((asset_name, asset_type))
+
+    def get_asset_by_code(self, asset_code: str) -> Asset | None:
+        """
+        Retrieve an asset by its code. Unlike get_asset, a miss is not logged
+        as a validation error.
+
+        Args:
+            asset_code (str): the code of the asset
+
+        Returns:
+            Asset | None: The asset or None if not found
+        """
+        return self._assets_by_code.get(asset_code)
+
+    def find_asset_version(
+            self,
+            asset_code: str,
+            department: str,
+            version_num: int
+    ) -> AssetVersion | None:
+        """
+        Retrieve an asset version by its unique (asset, department, version)
+        key. A miss is not logged as a validation error.
+
+        Args:
+            asset_code (str): the code of the asset
+            department (str): the department of the asset version
+            version_num (int): version number of the asset version
+
+        Returns:
+            AssetVersion | None: The asset version or None if not found
+        """
+        return self._versions_by_key.get((asset_code, department, version_num))
+
+    def get_department_versions(
+            self,
+            asset_code: str,
+            department: str
+    ) -> list[AssetVersion]:
+        """
+        Retrieve the versions of an asset in a department, ordered by version
+        number. The returned list must not be modified.
+
+        Args:
+            asset_code (str): the code of the asset
+            department (str): the department of the asset versions
+
+        Returns:
+            list[AssetVersion]: the versions, empty if there are none
+        """
+        return self._versions_by_asset.get(asset_code, {}).get(department, [])
+
+    def has_asset_versions(self, asset_code: str) -> bool:
+        """
+        Check whether an asset code has at least one version in the project.
+
+        Args:
+            asset_code (str): the code of the asset
+
+        Returns:
+            bool: True if at least one version references the asset code
+        """
+        return bool(self._versions_by_asset.get(asset_code))
+
+    def get_latest_version(
+            self,
+            asset_code: str,
+            department: str,
+            status: str | Status | None = None
+    ) -> AssetVersion | None:
+        """
+        Retrieve the highest version of an asset in a department, optionally
+        restricted to versions with the given status. This is a dictionary
+        lookup in the cached heads, no versions are scanned.
+
+        Args:
+            asset_code (str): the code of the asset
+            department (str): the department of the asset version
+            status (str | Status | None): only consider versions with this
+                                          status, None considers all versions
+
+        Returns:
+            AssetVersion | None: The latest version or None if there is none
+        """
+        if status is None:
+            versions = self.get_department_versions(asset_code, department)
+            return versions[-1] if versions else None
+        if isinstance(status, str):
+            status, _ = Status.from_string(status)
+        return self._latest_by_status.get((asset_code, department, status))
+
+    def set_version_status(
+            self,
+            asset_version: AssetVersion,
+            status: str | Status
+    ) -> OperationResult:
+        """
+        Change the status of an asset version in the project, keeping the
+        latest version caches up to date. Status changes should go through
+        this method rather than the AssetVersion.status setter.
+
+        Args:
+            asset_version (AssetVersion): the asset version to update
+            status (str | Status): the new status
+
+        Returns:
+            OperationResult: The result of the operation, indicating success or
+                             failure.
+        """
+        status = _to_status(status)
+        if status is None:
+            return self._failed(_invalid_status())
+        current = self.find_asset_version(
+            asset_version.asset, asset_version.department,
+            asset_version.version)
+        if current is None:
+            return self._failed(OperationResult(
+                success=False,
+                error_message=(
+                    f"Asset version '{asset_version.version}' for asset "
+                    f"'{asset_version.asset}' in department "
+                    f"'{asset_version.department}' not found in project."
+                )
+            ))
+        self._apply_status(current, status)
+        return OperationResult(
+            success=True,
+            data={
+                "asset_code": current.asset,
+                "version": current.version,
+                "status": status.value
+            }
+        )
+
+    def set_version_status_bulk(
+            self,
+            status: str | Status,
+            asset_codes: Iterable[str] | None = None,
+            department: str | None = None,
+            older_than: int | None = None,
+            current_status: str | Status | None = None
+    ) -> OperationResult:
+        """
+        Change the status of every asset version matching the filters, e.g.
+        deprecate the modeling versions below 10 of every asset. Versions
+        already in the status are left alone. The latest version caches are
+        rebuilt once per touched asset and department instead of once per
+        version, and the next save only writes the changed versions.
+
+        Args:
+            status (str | Status): the new status
+            asset_codes (Iterable[str] | None): only versions of these
+                                                assets, None for every asset
+            department (str | None): only versions of this department, None
+                                     for every department
+            older_than (int | None): only versions numbered below this
+            current_status (str | Status | None): only versions currently in
+                                                  this status
+
+        Returns:
+            OperationResult: success with the number of changed versions
+                             under "changed", failure if a status is invalid
+        """
+        status = _to_status(status)
+        if status is None:
+            return self._failed(_invalid_status())
+        if current_status is not None:
+            current_status = _to_status(current_status)
+            if current_status is None:
+                return self._failed(_invalid_status())
+        changed = 0
+        if asset_codes is None:
+            asset_codes = list(self._versions_by_asset)
+        for asset_code in asset_codes:
+            departments = self._versions_by_asset.get(asset_code, {})
+            if department is not None:
+                departments = {department: departments[department]} \
+                    if department in departments else {}
+            for name, versions in departments.items():
+                if older_than is not None:
+                    # Sorted by version, the matches are a prefix
+                    versions = versions[:bisect_left(
+                        versions, older_than, key=lambda av: av.version)]
+                touched = False
+                for asset_version in versions:
+                    if current_status is not None and \
+                            asset_version.status != current_status:
+                        continue
+                    if self._apply_status(
+                            asset_version, status, update_latest=False):
+                        changed += 1
+                        touched = True
+                if touched:
+                    self._recompute_latest(asset_code, name)
+        return OperationResult(success=True, data={"changed": changed})
+
+    # --------------------------------------------------------------------------
+    # Paginated listing
+    # --------------------------------------------------------------------------
+
+    def iter_assets(
+            self,
+            offset: int = 0,
+            limit: int | None = None,
+            after: str | None = None
+    ) -> Iterator[Asset]:
+        """
+        Iterate over the assets in the project ordered by asset code, which is
+        the stable ordering key used for paging.
+
+        Args:
+            offset (int): number of assets to skip. Defaults to 0.
+            limit (int | None): maximum number of assets to yield, None yields
+                                all remaining assets.
+            after (str | None): cursor, only assets with a code strictly
+                                greater than this one are yielded.
+
+        Yields:
+            Asset: the assets of the requested page
+        """
+        codes = self._get_sorted_codes()
+        start = bisect_right(codes, after) if after is not None else 0
+        stop = None if limit is None else start + offset + limit
+        for code in islice(codes, start + offset, stop):
+            yield self._assets_by_code[code]
+
+    def iter_asset_versions(
+            self,
+            asset_code: str | None = None,
+            offset: int = 0,
+            limit: int | None = None,
+            after: tuple[str, str, int] | None = None
+    ) -> Iterator[AssetVersion]:
+        """
+        Iterate over asset versions ordered by the stable ordering key
+        (asset code, department, version).
+
+        Args:
+            asset_code (str | None): restrict to the versions of this asset,
+                                     None iterates over all versions.
+            offset (int): number of versions to skip. Defaults to 0.
+            limit (int | None): maximum number of versions to yield, None
+                                yields all remaining versions.
+            after (tuple | None): cursor, only versions with an ordering key
+                                  strictly greater than this one are yielded.
+
+        Yields:
+            AssetVersion: the asset versions of the requested page
+        """
+        stop = None if limit is None else offset + limit
+        return islice(
+            self._iter_ordered_versions(asset_code, after), offset, stop)
+
+    def _iter_ordered_versions(
+            self,
+            asset_code: str | None,
+            after: tuple[str, str, int] | None
+    ) -> Iterator[AssetVersion]:
+        if asset_code is not None:
+            codes = [asset_code] if asset_code in self._versions_by_asset \
+                else []
+        else:
+            # Versions may reference codes with no asset yet, so order the
+            # version index keys rather than the asset codes.
+            codes = sorted(self._versions_by_asset)
+        if after is not None:
+            after = tuple(after)
+            codes = codes[bisect_left(codes, after[0]):]
+        for code in codes:
+            departments = self._versions_by_asset[code]
+            for department in sorted(departments):
+                versions = departments[department]
+                if after is not None and (code, department) <= after[:2]:
+                    if (code, department) < after[:2]:
+                        continue
+                    # Versions are sorted and linear, skip up to the cursor
+                    versions = [
+                        av for av in versions if av.version > after[2]]
+                yield from versions
+
+    def _get_sorted_codes(self) -> list[str]:
+        if self._sorted_codes is None:
+            self._sorted_codes = sorted(self._assets_by_code)
+        return self._sorted_codes
+
+    # --------------------------------------------------------------------------
+    # Index maintenance
+    # --------------------------------------------------------------------------
+
+    def _index_asset(self, asset: Asset) -> None:
+        self._assets.append(asset)
+        self._assets_by_code[asset.code] = asset
+        self._assets_by_key[(asset.name, asset.asset_type.value)] = asset
+        self._sorted_codes = None
+        if self._transaction is not None:
+            self._transaction.staged_asset(asset)
+
+    def _index_asset_version(self, asset_version: AssetVersion) -> None:
+        if self._transaction is not None:
+            self._transaction.staged_asset_version(asset_version)
+        asset_version._owner = self._weak_self
+        self._asset_versions.append(asset_version)
+        self._versions_by_key[(
+            asset_version.asset,
+            asset_version.department,
+            asset_version.version
+        )] = asset_version
+        departments = self._versions_by_asset.setdefault(
+            asset_version.asset, {})
+        departments.setdefault(
+            asset_version.department, []).append(asset_version)
+        self._cache_latest(asset_version)
+
+    def _cache_latest(self, asset_version: AssetVersion) -> None:
+        key = (asset_version.asset, asset_version.department,
+               asset_version.status)
+        latest = self._latest_by_status.get(key)
+        if latest is None or latest.version < asset_version.version:
+            self._latest_by_status[key] = asset_version
+
+    def _apply_status(
+            self,
+            asset_version: AssetVersion,
+            status: Status,
+            stored: bool = False,
+            update_latest: bool = True
+    ) -> bool:
+        """ Change the status of an indexed asset version, update the caches
+            and notify subscribers. Returns False if the status is unchanged.
+            stored is True when the status was read from storage, the
+            version is then not written back by the next save. Bulk changes
+            pass update_latest=False and call _recompute_latest once done.
+        """
+        old_status = asset_version.status
+        if old_status == status:
+            return False
+        key = (asset_version.asset, asset_version.department,
+               asset_version.version)
+        if self._transaction is not None:
+            self._transaction.staged_status(
+                asset_version, old_status, key in self._changed_versions)
+        if stored:
+            self._changed_versions.pop(key, None)
+        else:
+            self._changed_versions[key] = asset_version
+        self._assign_status(asset_version, status)
+        if update_latest:
+            self._update_latest_cache(asset_version, old_status)
+        self._publish(
+            ChangeType.STATUS_CHANGED,
+            lambda: {**asset_version.to_dict(),
+                     "old_status": old_status.value}
+        )
+        return True
+
+    def _status_set(
+            self,
+            asset_version: AssetVersion,
+            status: Status
+    ) -> None:
+        """ Called by the AssetVersion.status setter to change the status: a
+            status set directly on an indexed version is kept out of the
+            open snapshots, written by the next save and followed by the
+            latest version caches.
+        """
+        key = (asset_version.asset, asset_version.department,
+               asset_version.version)
+        if self._versions_by_key.get(key) is not asset_version:
+            asset_version._status = status
+            return
+        old_status = asset_version.status
+        self._assign_status(asset_version, status)
+        self._changed_versions[key] = asset_version
+        self._update_latest_cache(asset_version, old_status)
+
+    def _assign_status(
+            self,
+            asset_version: AssetVersion,
+            status: Status
+    ) -> None:
+        """ Set the status of an indexed version without the setter, which
+            would call _status_set, once the open snapshots kept a copy.
+        """
+        if self._snapshots:
+            with self._snapshot_lock:
+                for snapshot in self._snapshots:
+                    snapshot._preserve(asset_version)
+                asset_version._status = status
+        else:
+            asset_version._status = status
+
+    def _update_latest_cache(
+            self,
+            asset_version: AssetVersion,
+            old_status: Status
+    ) -> None:
+        """ Update the latest version cache after a status change. Only the
+            (asset, department) of the changed version is touched, and it is
+            only rescanned if the changed version was the cached head.
+        """
+        old_key = (asset_version.asset, asset_version.department, old_status)
+        if self._latest_by_status.get(old_key) is asset_version:
+            del self._latest_by_status[old_key]
+            versions = self.get_department_versions(
+                asset_version.asset, asset_version.department)
+            for candidate in reversed(versions):
+                if candidate.status == old_status:
+                    self._latest_by_status[old_key] = candidate
+                    break
+        self._cache_latest(asset_version)
+
+    def _recompute_latest(self, asset_code: str, department: str) -> None:
+        """ Rebuild the latest version cache of one (asset, department) from
+            its sorted versions.
+        """
+        for status in Status:
+            self._latest_by_status.pop((asset_code, department, status), None)
+        for asset_version in self.get_department_versions(
+                asset_code, department):
+            self._cache_latest(asset_version)
+
+    def _rebuild_indexes(self) -> None:
+        """ Rebuild every index from the asset and asset version lists, used
+            when the lists are replaced wholesale (e.g. loading from storage).
+        """
+        assets, asset_versions = self._assets, self._asset_versions
+        self._assets = []
+        self._asset_versions = []
+        self._assets_by_code = {}
+        self._assets_by_key = {}
+        self._versions_by_key = {}
+        self._versions_by_asset = {}
+        self._sorted_codes = None
+        self._latest_by_status = {}
+        for asset in assets:
+            self._index_asset(asset)
+        for asset_version in asset_versions:
+            self._index_asset_version(asset_version)
+        # Storage does not guarantee any order, keep departments sorted by
+        # version so the last entry is always the head.
+        for departments in self._versions_by_asset.values():
+            for versions in departments.values():
+                versions.sort(key=lambda av: av.version)
+
     # --------------------------------------------------------------------------
     # Backend storage methods
     # --------------------------------------------------------------------------
 
-    def save(self):
-        """ Save the project data to the storage backend if it exists,
-            otherwise do nothing.
+    def save(self, full: bool = False):
+        """ Save the records added or changed since the last load or save to
+            the storage backend if it exists, otherwise do nothing. New
+            asset versions are published (see
+            StorageBackend.publish_asset_versions), so versions another
+            process stored meanwhile are never overwritten, while versions
+            already stored with the same content (e.g. saved again from a
+            reloaded manifest) are skipped.
+
+        Args:
+            full (bool): write every record, overwriting the stored ones,
+                         e.g. to copy the project to a new backend. Done
+                         automatically by the first save after the
+                         storage_backend attribute is replaced.
+
+        Raises:
+            VersionConflictError: if another process already stored one of
+                                  the new version numbers. Nothing is
+                                  written or marked saved, fetch the other
+                                  versions and publish under the next free
+                                  numbers.
         """
+        self._check_no_transaction('save')
         if self.storage_backend:
-            self.storage_backend.save_assets(self.assets)
-            self.storage_backend.save_asset_versions(self.asset_versions)
+            if full or self._full_save:
+                if self._assets:
+                    self.storage_backend.save_assets(self._assets)
+                if self._asset_versions:
+                    self.storage_backend.save_asset_versions(
+                        self._asset_versions)
+                self._mark_saved()
+                self.events.publish(ChangeType.SAVED, self._event_counts())
+                return
+            new = {(av.asset, av.department, av.version)
+                   for av in self._unsaved_versions}
+            changed = [asset_version for key, asset_version
+                       in self._changed_versions.items() if key not in new]
+            # Versions first, a conflict must leave nothing written
+            if self._unsaved_versions:
+                self.storage_backend.publish_asset_versions(
+                    self._unsaved_versions, skip_identical=True)
+            if self._unsaved_assets:
+                self.storage_backend.save_assets(self._unsaved_assets)
+            if changed:
+                self.storage_backend.save_asset_versions(changed)
+            self._mark_saved()
+            self.events.publish(ChangeType.SAVED, self._event_counts())
+
+    def _mark_saved(self) -> None:
+        self._unsaved_assets = []
+        self._unsaved_versions = []
+        self._changed_versions = {}
+        self._full_save = False
 
     def load(self):
         """ Load the project data from the storage backend if it exists,
             otherwise do nothing.
         """
+        self._check_no_transaction('load')
         if self.storage_backend:
-            self._assets = self.storage_backend.load_assets()
-            self._asset_versions = self.storage_backend.load_asset_versions()
+            self._close_watcher()
+            # Start watching before reading so nothing saved by another
+            # process during the load is missed by the next refresh.
+            self._watcher = self.storage_backend.watch()
+            self._assets = list(self.storage_backend.iter_assets())
+            self._asset_versions = list(
+                self.storage_backend.iter_asset_versions())
+            self._pruned_keys = set(
+                self.storage_backend.list_pruned_asset_version_keys())
+            self._rebuild_indexes()
+            self._mark_saved()
+            self.events.publish(ChangeType.LOADED, self._event_counts())
+
+    def refresh(self) -> OperationResult:
+        """ Merge the records other processes saved to the storage backend
+            since the last load or refresh into the project. Only new or
+            changed files are read when the backend supports watching,
+            otherwise every record is reloaded and merged. Records already
+            in the project are kept, changed statuses are updated.
+
+        Returns:
+            OperationResult: success with the number of merged assets,
+                             asset versions and status changes
+        """
+        self._check_no_transaction('refresh')
+        counts = {"assets": 0, "asset_versions": 0, "status_changes": 0}
+        if not self.storage_backend:
+            return OperationResult(success=True, data=counts)
+        if self._watcher is None:
+            self._watcher = self.storage_backend.watch(baseline=False)
+        if self._watcher is None:
+            assets = self.storage_backend.iter_assets()
+            asset_versions = self.storage_backend.iter_asset_versions()
+        else:
+            changes = self._watcher.poll()
+            if not changes:
+                return OperationResult(success=True, data=counts)
+            assets, asset_versions = self.storage_backend.load_changes(
+                changes)
+            self._watcher.retry(changes.unreadable)
+        self._merge(assets, asset_versions, counts)
+        return OperationResult(success=True, data=counts)
+
+    def fetch(
+            self,
+            asset_codes: Iterable[str] = (),
+            asset_version_keys: Iterable[tuple[str, str, int]] = ()
+    ) -> OperationResult:
+        """ Load specific records from the storage backend into the project,
+            with one batched read per record type, e.g. versions another
+            process published. Records already in the project are kept,
+            changed statuses are updated.
+
+        Args:
+            asset_codes (Iterable[str]): codes of the assets to load
+            asset_version_keys (Iterable[tuple[str, str, int]]):
+                (asset code, department, version) of the versions to load
+
+        Returns:
+            OperationResult: success with the number of merged assets,
+                             asset versions and status changes, and the
+                             keys not found in storage under "missing"
+
+        Raises:
+            RuntimeError: if a transaction is open, which would stage the
+                          fetched records and publish them again on commit
+        """
+        self._check_no_transaction('fetch')
+        counts = {"assets": 0, "asset_versions": 0, "status_changes": 0,
+                  "missing": []}
+        if not self.storage_backend:
+            return OperationResult(success=True, data=counts)
+        asset_codes = [code for code in asset_codes
+                       if code not in self._assets_by_code]
+        asset_version_keys = [tuple(key) for key in asset_version_keys]
+        assets = self.storage_backend.load_assets_by_code(
+            asset_codes) if asset_codes else {}
+        asset_versions = self.storage_backend.load_asset_versions_by_keys(
+            asset_version_keys) if asset_version_keys else {}
+        counts["missing"] = (
+            [code for code in asset_codes if code not in assets]
+            + [key for key in asset_version_keys if key not in asset_versions]
+        )
+        self._merge(assets.values(), asset_versions.values(), counts)
+        return OperationResult(success=True, data=counts)
+
+    def publish_next_version(
+            self,
+            asset_name: str,
+            asset_type: str,
+            department: str,
+            status: str | Status = Status.ACTIVE
+    ) -> OperationResult:
+        """ Add the next version of an asset in a department, allocating its
+            number atomically. With a storage backend the number comes from
+            the head stored by the backend, shared by every thread and
+            process publishing to it, and the version is stored right away.
+            Versions other publishers stored since the project was loaded
+            are fetched first, so the project keeps linear versions.
+            Without a backend the number follows the project's head. An
+            asset found neither in the project nor in storage is added
+            with its first version.
+
+        Args:
+            asset_name (str): the name of the asset
+            asset_type (str): the type of the asset
+            department (str): the department of the new version
+            status (str | Status): the status of the new version. Defaults to
+                                   'active'.
+
+        Raises:
+            RuntimeError: if a transaction is open, a stored version could
+                          not be rolled back
+
+        Returns:
+            OperationResult: success with the asset code, the allocated
+                             version and the number of versions fetched from
+                             other publishers under "fetched", or the failure
+        """
+        self._check_no_transaction('publish')
+        asset = self.find_asset(asset_name, asset_type)
+        new_asset = None
+        if asset is None:
+            new_asset = Asset(asset_name, asset_type)
+            if self.storage_backend:
+                self.fetch(asset_codes=[new_asset.code])
+                asset = self._assets_by_code.get(new_asset.code)
+        # Check the fields before taking a number, a refused version would
+        # leave a hole in storage
+        if asset is None:
+            asset = new_asset
+            result = self.rules.compile('asset', contextual=False)(
+                asset, self)
+            if not result.success:
+                return result
+        else:
+            new_asset = None
+        candidate = AssetVersion(asset.code, department, 1, status)
+        result = self.rules.compile('asset_version', contextual=False)(
+            candidate, self)
+        if not result.success:
+            return result
+
+        with self._publish_lock:
+            head = self.get_latest_version(asset.code, department)
+            if not self.storage_backend:
+                candidate.version = head.version + 1 if head else 1
+                result = self.add_asset_version(candidate)
+                if result.success:
+                    if new_asset is not None:
+                        self.add_asset(new_asset)
+                    result.data["fetched"] = 0
+                return result
+            if any(av.asset == asset.code and av.department == department
+                   for av in self._unsaved_versions):
+                return OperationResult(
+                    success=False,
+                    error_message=(
+                        f"Asset '{asset.code}' has unsaved versions in "
+                        f"department '{department}', save them first.")
+                )
+            if new_asset is not None or asset in self._unsaved_assets:
+                self.storage_backend.save_assets([asset])
+            asset_version = self.storage_backend.publish_next_version(
+                asset.code, department, candidate.status.value)
+            others = [
+                (asset.code, department, version) for version in range(
+                    head.version + 1 if head else 1, asset_version.version)]
+            fetched = self.fetch(asset_version_keys=others).data[
+                "asset_versions"] if others else 0
+            # Stored already, merged like records read from storage
+            self._merge([new_asset] if new_asset else [], [asset_version], {
+                "assets": 0, "asset_versions": 0, "status_changes": 0})
+        return OperationResult(
+            success=True,
+            data={
+                "asset_code": asset.code,
+                "version": asset_version.version,
+                "fetched": fetched
+            }
+        )
+
+    def _merge(
+            self,
+            assets: Iterable[Asset],
+            asset_versions: Iterable[AssetVersion],
+            counts: dict
+    ) -> None:
+        """ Merge records read from storage into the project, counting the
+            added records and status changes.
+        """
+        for asset in assets:
+            if asset.code not in self._assets_by_code:
+                self._index_asset(asset)
+                self.events.publish(ChangeType.ASSET_ADDED, asset.to_dict())
+                counts["assets"] += 1
+        for asset_version in sorted(asset_versions, key=lambda av: av.version):
+            current = self.find_asset_version(
+                asset_version.asset, asset_version.department,
+                asset_version.version)
+            if current is None:
+                self._merge_asset_version(asset_version)
+                counts["asset_versions"] += 1
+            elif isinstance(asset_version.status, Status):
+                if self._apply_status(
+                        current, asset_version.status, stored=True):
+                    counts["status_changes"] += 1
+
+    def _merge_asset_version(self, asset_version: AssetVersion) -> None:
+        """ Index an asset version coming from storage, which may arrive out
+            of order (e.g. v3 was written before v2 was seen).
+        """
+        versions = self.get_department_versions(
+            asset_version.asset, asset_version.department)
+        out_of_order = bool(versions) and \
+            versions[-1].version > asset_version.version
+        self._index_asset_version(asset_version)
+        if out_of_order:
+            self.get_department_versions(
+                asset_version.asset, asset_version.department
+            ).sort(key=lambda av: av.version)
+        self.events.publish(ChangeType.VERSION_ADDED, asset_version.to_dict())
+
+    # --------------------------------------------------------------------------
+    # Export
+    # --------------------------------------------------------------------------
+
+    def export(
+            self,
+            stream: TextIO,
+            format: str = 'jsonl',
+            record_type: str = 'asset_versions'
+    ) -> OperationResult:
+        """ Write every asset or asset version to a text stream, one record
+            at a time. With a storage backend the records are streamed
+            straight from storage (save first to include unsaved changes),
+            so memory stays flat whatever the project size. Without one the
+            project's records are written.
+
+        Args:
+            stream (TextIO): where to write, e.g. an open file or sys.stdout.
+                             Open files with newline='' for CSV.
+            format (str): 'jsonl' (one JSON object per line) or 'csv'
+            record_type (str): 'assets' or 'asset_versions'
+
+        Returns:
+            OperationResult: success with the number of written records
+                             under "count"
+        """
+        return write_records(
+            stream, format, record_type, self._export_records)
+
+    def export_manifest(self, stream: TextIO) -> OperationResult:
+        """ Write every asset version as a JSON array in the manifest format
+            read by load_assets and import_manifest:
+            [{"asset": {"name", "type"}, "department", "version", "status"}]
+            Entries are streamed one at a time, from the storage backend when
+            there is one (save first to include unsaved changes), otherwise
+            from the project.
+
+        Args:
+            stream (TextIO): where to write, e.g. an open file
+
+        Returns:
+            OperationResult: success with the number of written entries under
+                             "count", and under "orphans" the number of
+                             versions left out because their asset is unknown
+        """
+        return write_manifest(
+            stream,
+            self._export_records('assets'),
+            self._export_records('asset_versions')
+        )
+
+    def import_manifest(
+            self,
+            source: str | TextIO,
+            trusted: bool = False
+    ) -> OperationResult:
+        """ Add the entries of a manifest (see export_manifest) to the
+            project. Untrusted manifests are validated entry by entry like
+            load_assets, failures are collected in validation_errors.
+            Trusted manifests, e.g. exported from another backend, skip the
+            contextual rules: the records are created and indexed in one
+            pass and only entries already in the project or failing the
+            checks of the record itself (type, status, version) are
+            skipped, the latter collected in validation_errors.
+
+        Args:
+            source (str | TextIO): path of the manifest or an open stream
+            trusted (bool): skip the contextual rules. Defaults to False.
+
+        Returns:
+            OperationResult: success with the number of added assets and
+                             asset versions
+        """
+        if isinstance(source, str):
+            with open(source, 'rb') as fp:
+                entries = MANIFEST_CODEC.loads(fp.read())
+        else:
+            entries = MANIFEST_CODEC.loads(source.read())
+        if not trusted:
+            return OperationResult(
+                success=True, data=self._add_manifest_entries(entries))
+        return OperationResult(
+            success=True,
+            data=self._add_trusted_manifest_entries(entries, validate=False)
+        )
+
+    def _add_trusted_manifest_entries(
+            self,
+            entries: Iterable[dict],
+            validate: bool
+    ) -> dict:
+        """ Add the records of manifest entries without the contextual
+            rules: they are created and indexed in one pass, entries already
+            in the project are skipped. Records are always checked on their
+            own before anything is indexed, failures are collected in
+            validation_errors.
+
+        Args:
+            entries (Iterable[dict]): the manifest entries
+            validate (bool): run the enabled rules looking only at the
+                             record itself instead of its built-in checks,
+                             and report skipped duplicates
+
+        Returns:
+            dict: the number of added assets and asset versions
+        """
+        if validate:
+            check_asset = self.rules.compile('asset', contextual=False)
+            check_asset_version = self.rules.compile(
+                'asset_version', contextual=False)
+        else:
+            # Even trusted records must be indexable and saveable
+            def check_asset(asset, project):
+                return asset.validate()
+
+            def check_asset_version(asset_version, project):
+                return asset_version.validate()
+        assets = {}
+        statuses = {}
+        new_assets = []
+        new_versions = []
+        seen = set()
+        for entry in entries:
+            asset_entry = entry['asset']
+            asset_key = (asset_entry['name'], asset_entry['type'])
+            asset = assets.get(asset_key)
+            if asset is None:
+                asset = Asset(name=asset_entry['name'],
+                              asset_type=asset_entry['type'])
+                assets[asset_key] = asset
+                if asset.code not in self._assets_by_code and \
+                        asset.code not in seen:
+                    seen.add(asset.code)
+                    result = check_asset(asset, self)
+                    if result.success:
+                        new_assets.append(asset)
+                    else:
+                        self.validation_errors.append(result.error_message)
+            key = (asset.code, entry['department'], entry['version'])
+            if key in self._versions_by_key or key in seen:
+                if validate:
+                    self.validation_errors.append(
+                        f"Asset version for asset '{key[0]}' version "
+                        f"'{key[2]}' already exists in the project.")
+                continue
+            seen.add(key)
+            # Parse each distinct status string once
+            status = statuses.get(entry['status'])
+            if status is None:
+                enum_value, raw = Status.from_string(entry['status'])
+                status = statuses[raw] = enum_value or raw
+            asset_version = AssetVersion(
+                asset=asset.code,
+                department=entry['department'],
+                version=entry['version'],
+                status=status
+            )
+            result = check_asset_version(asset_version, self)
+            if not result.success:
+                self.validation_errors.append(result.error_message)
+                continue
+            new_versions.append(asset_version)
+        for asset in new_assets:
+            self._index_asset(asset)
+        touched = set()
+        for asset_version in new_versions:
+            self._index_asset_version(asset_version)
+            touched.add((asset_version.asset, asset_version.department))
+        self._unsaved_assets.extend(new_assets)
+        self._unsaved_versions.extend(new_versions)
+        # Manifest entries may come in any order, keep the heads last
+        for asset_code, department in touched:
+            self._versions_by_asset[asset_code][department].sort(
+                key=lambda av: av.version)
+        self._publish(ChangeType.LOADED, self._event_counts)
+        return {"assets": len(new_assets),
+                "asset_versions": len(new_versions)}
+
+    def check_consistency(self) -> OperationResult:
+        """ Check the enabled contextual rules over the whole project in one
+            O(N) sweep, e.g. after a trusted load skipped them record by
+            record.
+
+        Returns:
+            OperationResult: success if the project is consistent, otherwise
+                             failure. data["violations"] holds the
+                             Violation of every offending record.
+        """
+        violations = [
+            violation for violation in sweep(
+                self._assets, self._asset_versions, self._pruned_keys)
+            if self.rules.is_enabled(violation.rule)
+        ]
+        if not violations:
+            return OperationResult(success=True, data={"violations": []})
+        return OperationResult(
+            success=False,
+            error_message=(
+                f"Found {len(violations)} consistency violations in project "
+                f"'{self._name}'"),
+            data={"violations": violations}
+        )
+
+    def check_integrity(self, from_storage: bool = False) -> OperationResult:
+        """ Check the project, or its storage backend, for gaps in version
+            sequences, duplicate keys, versions whose asset is missing and
+            assets without versions, in a single pass over the records.
+            Version numbers deleted by prune() are not gaps.
+
+        Args:
+            from_storage (bool): stream the records from the storage backend
+                                 instead of checking the loaded project, so
+                                 a storage can be checked without loading it
+
+        Returns:
+            OperationResult: success if no violation was found, otherwise
+                             failure. data["report"] holds the
+                             IntegrityReport either way.
+        """
+        if from_storage:
+            if not self.storage_backend:
+                return OperationResult(
+                    success=False,
+                    error_message="No storage backend to check"
+                )
+            report = check_integrity(
+                self.storage_backend.iter_assets(),
+                self.storage_backend.iter_asset_versions(),
+                self.storage_backend.list_pruned_asset_version_keys()
+            )
+        else:
+            report = check_integrity(
+                self._assets, self._asset_versions, self._pruned_keys)
+        if report.ok:
+            return OperationResult(success=True, data={"report": report})
+        return OperationResult(
+            success=False,
+            error_message=(
+                f"Found {len(report.violations)} integrity violations"),
+            data={"report": report}
+        )
+
+    def _export_records(self, record_type: str) -> Iterator:
+        if record_type == 'assets':
+            if self.storage_backend:
+                return self.storage_backend.iter_assets()
+            return iter(self._assets)
+        if self.storage_backend:
+            return self.storage_backend.iter_asset_versions()
+        return iter(self._asset_versions)
+
+    # --------------------------------------------------------------------------
+    # Retention
+    # --------------------------------------------------------------------------
+
+    def prune(
+            self,
+            policy: RetentionPolicy | None = None,
+            asset_codes: Iterable[str] | None = None,
+            archive_path: str | None = None,
+            dry_run: bool = False
+    ) -> OperationResult:
+        """ Delete the asset versions a retention policy does not keep from
+            the project and its storage backend, e.g. the deprecated
+            versions older than the last 10 of each asset and department,
+            so loads stop reading them. The latest active version of each
+            asset and department is always kept. With an archive path the
+            pruned records are appended to it first (see
+            retention.read_archive), moving them out of the storage rather
+            than deleting them.
+
+            The versions are selected from the project then read back from
+            storage, and a version whose stored status is no longer pruned
+            (e.g. reactivated by another process) is kept.
+
+        Args:
+            policy (RetentionPolicy | None): what to keep, defaults to
+                                             RetentionPolicy()
+            asset_codes (Iterable[str] | None): only prune versions of these
+                                                assets, None for every asset
+            archive_path (str | None): JSON Lines file the pruned versions
+                                       are appended to before deletion
+            dry_run (bool): only report what would be pruned
+
+        Raises:
+            RuntimeError: if a transaction is open
+
+        Returns:
+            OperationResult: success with the RetentionReport under
+                             "report", failure if the project has unsaved
+                             changes
+        """
+        self._check_no_transaction('prune')
+        if self.storage_backend and (
+                self._unsaved_assets or self._unsaved_versions
+                or self._changed_versions or self._full_save):
+            return self._failed(OperationResult(
+                success=False,
+                error_message=(
+                    "The project has unsaved changes, save it before "
+                    "pruning")
+            ))
+        policy = policy or RetentionPolicy()
+        report = RetentionReport(dry_run=dry_run)
+        selected = []
+        if asset_codes is None:
+            asset_codes = list(self._versions_by_asset)
+        for asset_code in asset_codes:
+            for versions in self._versions_by_asset.get(
+                    asset_code, {}).values():
+                report.checked += len(versions)
+                selected += policy.select(versions)
+        if self.storage_backend and selected:
+            start = time.perf_counter()
+            stored = self.storage_backend.load_asset_versions_by_keys(
+                [(av.asset, av.department, av.version) for av in selected])
+            report.estimated_load_seconds = time.perf_counter() - start
+            selected = [stored[key] for key in (
+                (av.asset, av.department, av.version) for av in selected)
+                if key in stored and stored[key].status in policy.statuses]
+        report.keys = [(av.asset, av.department, av.version)
+                       for av in selected]
+        report.pruned = len(report.keys)
+        if dry_run or not selected:
+            return OperationResult(success=True, data={"report": report})
+
+        if archive_path is not None:
+            report.archived = write_archive(archive_path, selected)
+        if self.storage_backend:
+            report.bytes_reclaimed = \
+                self.storage_backend.delete_asset_versions(report.keys)
+        self._unindex_asset_versions(set(report.keys))
+        self._pruned_keys.update(report.keys)
+        self.events.publish(ChangeType.PRUNED, {
+            "pruned": report.pruned,
+            "keys": [list(key) for key in report.keys],
+            "archive": archive_path
+        })
+        return OperationResult(success=True, data={"report": report})
+
+    def _unindex_asset_versions(
+            self,
+            keys: set[tuple[str, str, int]]
+    ) -> None:
+        """ Remove asset versions from the project. The version list is
+            replaced rather than shrunk, live snapshots keep the old one.
+        """
+        with self._snapshot_lock:
+            self._asset_versions = [
+                av for av in self._asset_versions
+                if (av.asset, av.department, av.version) not in keys]
+        touched = set()
+        for key in keys:
+            self._versions_by_key.pop(key, None)
+            touched.add(key[:2])
+        for asset_code, department in touched:
+            departments = self._versions_by_asset.get(asset_code, {})
+            versions = [av for av in departments.get(department, [])
+                        if (av.asset, av.department, av.version) not in keys]
+            if versions:
+                departments[department] = versions
+            else:
+                departments.pop(department, None)
+                if not departments:
+                    self._versions_by_asset.pop(asset_code, None)
+            self._recompute_latest(asset_code, department)
+
+    # --------------------------------------------------------------------------
+    # Transactions
+    # --------------------------------------------------------------------------
+
+    def transaction(self) -> Transaction:
+        """ Open a transaction, to use as a context manager. Assets, asset
+            versions and status changes made inside it are kept, written to
+            the storage backend and published together when the block exits,
+            or undone together if any of them failed or an exception was
+            raised. The outcome is in the transaction's result.
+
+        Raises:
+            RuntimeError: if a transaction is already open
+
+        Returns:
+            Transaction: the open transaction
+        """
+        self._check_no_transaction('transaction')
+        self._transaction = Transaction(self)
+        return self._transaction
+
+    # --------------------------------------------------------------------------
+    # Snapshots
+    # --------------------------------------------------------------------------
+
+    def snapshot(self) -> ProjectSnapshot:
+        """ Take a read-only, point-in-time view of the project for long
+            running queries and exports, e.g. from another thread while this
+            one keeps adding records. Taking it copies nothing, see
+            ProjectSnapshot. Changes staged by an open transaction are not
+            part of it.
+
+        Returns:
+            ProjectSnapshot: the snapshot, close it (or use it as a context
+                             manager) once done
+        """
+        with self._snapshot_lock:
+            asset_count = len(self._assets)
+            asset_version_count = len(self._asset_versions)
+            preserved = {}
+            if self._transaction is not None:
+                asset_count, asset_version_count, status_changes = \
+                    self._transaction.committed_state()
+                for asset_version, old_status in status_changes:
+                    preserved.setdefault(
+                        (asset_version.asset, asset_version.department,
+                         asset_version.version),
+                        AssetVersion(
+                            asset=asset_version.asset,
+                            department=asset_version.department,
+                            version=asset_version.version,
+                            status=old_status
+                        ))
+            snapshot = ProjectSnapshot(
+                name=self._name,
+                assets=self._assets,
+                asset_versions=self._asset_versions,
+                asset_count=asset_count,
+                asset_version_count=asset_version_count,
+                preserved=preserved,
+                lock=self._snapshot_lock,
+                release=self._release_snapshot
+            )
+            self._snapshots.add(snapshot)
+        return snapshot
+
+    def _release_snapshot(self, snapshot: ProjectSnapshot) -> None:
+        with self._snapshot_lock:
+            self._snapshots.discard(snapshot)
+
+    def _end_transaction(self, transaction: Transaction) -> None:
+        if self._transaction is transaction:
+            self._transaction = None
+
+    def _check_no_transaction(self, operation: str) -> None:
+        if self._transaction is not None:
+            raise RuntimeError(
+                f"Cannot {operation} while a transaction is open")
+
+    def _publish(
+            self,
+            change_type: ChangeType,
+            payload: Callable[[], dict]
+    ) -> None:
+        """ Publish a change event, or hold it until the open transaction
+            is committed. The payload is only built if someone may read it.
+        """
+        if self._transaction is not None:
+            self._transaction.staged_event(change_type, payload())
+        elif self.events.has_subscribers:
+            self.events.publish(change_type, payload())
+
+    def _failed(self, result: OperationResult) -> OperationResult:
+        """ Record a failed operation in the open transaction. """
+        if self._transaction is not None:
+            self._transaction.failed(result)
+        return result
+
+    def _close_watcher(self) -> None:
+        if self._watcher is not None:
+            self._watcher.close()
+            self._watcher = None
+
+    def _event_counts(self) -> dict:
+        return {
+            "assets": len(self._assets),
+            "asset_versions": len(self._asset_versions)
+        }
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator
+
+from laika_pipeline.pipeline.asset_version import AssetVersion
+from laika_pipeline.pipeline.export import MANIFEST_CODEC
+from laika_pipeline.pipeline.status import Status
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """
+    Which asset versions Project.prune() deletes.
+
+    The last keep_last versions of each asset and department are always
+    kept, and so is its latest active version however old it is. Older
+    versions are pruned if their status is one of statuses.
+
+    Attributes:
+        keep_last (int): versions kept per asset and department, at least 1
+                         so the head version is never pruned
+        statuses (tuple[Status, ...]): statuses of the versions that may be
+                                       pruned, strings are converted.
+                                       Defaults to deprecated only.
+
+    Raises:
+        ValueError: if keep_last is below 1 or a status is invalid
+
+    Example:
+        >>> policy = RetentionPolicy(keep_last=5,
+        ...                          statuses=('deprecated', 'inactive'))
+        >>> project.prune(policy, archive_path='/archive/show.jsonl')
+    """
+    keep_last: int = 10
+    statuses: tuple[Status, ...] = (Status.DEPRECATED,)
+
+    def __post_init__(self):
+        if isinstance(self.keep_last, bool) or \
+                not isinstance(self.keep_last, int) or self.keep_last < 1:
+            raise ValueError(
+                f"keep_last must be an integer of at least 1, not "
+                f"{self.keep_last!r}")
+        statuses = []
+        for status in self.statuses:
+            if isinstance(status, str):
+                status, _ = Status.from_string(status)
+            if not isinstance(status, Status):
+                raise ValueError(
+                    f"Invalid status. Must be one of: "
+                    f"{', '.join(Status.list_values())}")
+            statuses.append(status)
+        # Frozen, see the dataclasses documentation on __post_init__
+        object.__setattr__(self, 'statuses', tuple(statuses))
+
+    def select(self, versions: list[AssetVersion]) -> list[AssetVersion]:
+        """
+        Return the versions of one asset and department to prune.
+
+        Args:
+            versions (list[AssetVersion]): the versions, sorted by version
+
+        Returns:
+            list[AssetVersion]: the versions to prune, sorted by version
+        """
+        latest_active = next(
+            (asset_version for asset_version in reversed(versions)
+             if asset_version.status is Status.ACTIVE), None)
+        return [asset_version for asset_version in versions[:-self.keep_last]
+                if asset_version.status in self.statuses
+                and asset_version is not latest_active]
+
+
+@dataclass
+class RetentionReport:
+    """
+    The result of Project.prune().
+
+    Attributes:
+        checked (int): asset versions the policy was applied to
+        pruned (int): asset versions deleted, or that would be on a dry run
+        archived (int): pruned asset versions appended to the archive
+        bytes_reclaimed (int): bytes the storage backend deleted, 0 on a dry
+                               run
+        estimated_load_seconds (float): seconds the storage backend took to
+                                        read the pruned asset versions in
+                                        one batch, an estimate of what a
+                                        full load spent on them, not a
+                                        measured full load
+        dry_run (bool): whether nothing was deleted
+        keys (list[tuple]): (asset code, department, version) of the pruned
+                            asset versions
+    """
+    checked: int = 0
+    pruned: int = 0
+    archived: int = 0
+    bytes_reclaimed: int = 0
+    estimated_load_seconds: float = 0.0
+    dry_run: bool = False
+    keys: list[tuple[str, str, int]] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        return {
+            "checked": self.checked,
+            "pruned": self.pruned,
+            "archived": self.archived,
+            "bytes_reclaimed": self.bytes_reclaimed,
+            "estimated_load_seconds": self.estimated_load_seconds,
+            "dry_run": self.dry_run,
+            "keys": [list(key) for key in self.keys]
+        }
+
+
+def write_archive(path: str, asset_versions: Iterable[AssetVersion]) -> int:
+    """
+    Append asset versions to an archive file, one JSON line per version, and
+    flush it to disk: the archive is the only copy left once they are
+    deleted from storage.
+
+    Args:
+        path (str): the archive file, created if it does not exist
+        asset_versions (Iterable[AssetVersion]): the versions to archive
+
+    Returns:
+        int: the number of archived versions
+    """
+    lines = [MANIFEST_CODEC.dumps_line(asset_version.to_dict()) + b'\n'
+             for asset_version in asset_versions]
+    with open(path, 'ab') as fp:
+        fp.write(b''.join(lines))
+        fp.flush()
+        os.fsync(fp.fileno())
+    return len(lines)
+
+
+def read_archive(path: str) -> Iterator[AssetVersion]:
+    """
+    Yield the asset versions of an archive file written by write_archive,
+    e.g. to restore some with StorageBackend.save_asset_versions.
+    """
+    with open(path, 'rb') as fp:
+        for line in fp:
+            if line.strip():
+                yield AssetVersion.from_dict(MANIFEST_CODEC.loads(line))
@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import threading
+from typing import Callable, Iterator, TextIO
+
+from laika_pipeline.pipeline.asset import Asset
+from laika_pipeline.pipeline.asset_version import AssetVersion
+from laika_pipeline.pipeline.status import Status
+from laika_pipeline.pipeline.export import write_manifest, write_records
+from laika_pipeline.validation.operation_result import OperationResult
+
+
+class ProjectSnapshot:
+    """
+    A frozen, read-only view of a project at the time Project.snapshot() was
+    called. Writers keep adding records and changing statuses while readers
+    query or export the snapshot from other threads.
+
+    Taking a snapshot copies nothing: the project's record lists only ever
+    grow (pruning and loading replace them), so the snapshot keeps
+    references to them and their lengths. When
+    a status changes while snapshots are alive, the project first hands each
+    of them a copy of the record as it was. Asset versions read from a
+    snapshot are copies, mutating them changes neither the snapshot nor the
+    project. The lookup indexes are built on the first lookup, so a
+    snapshot used only to iterate or export never builds them.
+    """
+
+    # Asset versions copied per lock acquisition while iterating
+    CHUNK_SIZE = 1000
+
+    def __init__(
+            self,
+            name: str,
+            assets: list[Asset],
+            asset_versions: list[AssetVersion],
+            asset_count: int,
+            asset_version_count: int,
+            preserved: dict,
+            lock: threading.Lock,
+            release: Callable[[ProjectSnapshot], None] | None = None
+    ):
+        """
+        Use Project.snapshot() rather than creating snapshots directly.
+
+        Args:
+            name (str): the project name
+            assets (list[Asset]): the project's asset list
+            asset_versions (list[AssetVersion]): the project's version list
+            asset_count (int): number of assets in the snapshot
+            asset_version_count (int): number of versions in the snapshot
+            preserved (dict): copies of versions whose status differs from
+                              the snapshot's, by key
+            lock (threading.Lock): the project's lock for status changes
+            release (Callable): called by close() to stop receiving copies
+        """
+        self.name = name
+        self._assets = assets
+        self._asset_versions = asset_versions
+        self._asset_count = asset_count
+        self._asset_version_count = asset_version_count
+        self._preserved = preserved
+        self._lock = lock
+        self._assets_by_code = None
+        self._assets_by_key = None
+        self._versions_by_key = None
+        self._versions_by_asset = None
+        self._release = release
+
+    def __enter__(self) -> ProjectSnapshot:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        self.close()
+        return False
+
+    def close(self) -> None:
+        """
+        Release the snapshot, status changes stop being copied to it. Also
+        done when the snapshot is garbage collected.
+        """
+        if self._release is not None:
+            self._release(self)
+            self._release = None
+
+    @property
+    def asset_count(self) -> int:
+        return self._asset_count
+
+    @property
+    def asset_version_count(self) -> int:
+        return self._asset_version_count
+
+    # --------------------------------------------------------------------------
+    # Iteration and export
+    # --------------------------------------------------------------------------
+
+    def iter_assets(self) -> Iterator[Asset]:
+        for index in range(self._asset_count):
+            yield self._assets[index]
+
+    def iter_asset_versions(self) -> Iterator[AssetVersion]:
+        for start in range(0, self._asset_version_count, self.CHUNK_SIZE):
+            end = min(start + self.CHUNK_SIZE, self._asset_version_count)
+            with self._lock:
+                chunk = [self._resolve(asset_version)
+                         for asset_version in self._asset_versions[start:end]]
+            yield from chunk
+
+    def list_assets(self) -> list[Asset]:
+        return list(self.iter_assets())
+
+    def list_asset_versions(self) -> list[AssetVersion]:
+        return list(self.iter_asset_versions())
+
+    def export(
+            self,
+            stream: TextIO,
+            format: str = 'jsonl',
+            record_type: str = 'asset_versions'
+    ) -> OperationResult:
+        """
+        Write the snapshot's assets or asset versions to a text stream, see
+        Project.export.
+        """
+        return write_records(stream, format, record_type, self._records)
+
+    def export_manifest(self, stream: TextIO) -> OperationResult:
+        """
+        Write the snapshot's asset versions in the manifest format, see
+        Project.export_manifest.
+        """
+        return write_manifest(
+            stream, self.iter_assets(), self.iter_asset_versions())
+
+    # --------------------------------------------------------------------------
+    # Lookups
+    # --------------------------------------------------------------------------
+
+    def get_asset_by_code(self, asset_code: str) -> Asset | None:
+        self._index_assets()
+        return self._assets_by_code.get(asset_code)
+
+    def find_asset(self, asset_name: str, asset_type: str) -> Asset | None:
+        self._index_assets()
+        return self._assets_by_key.get((asset_name, asset_type))
+
+    def find_asset_version(
+            self,
+            asset_code: str,
+            department: str,
+            version_num: int
+    ) -> AssetVersion | None:
+        self._index_asset_versions()
+        asset_version = self._versions_by_key.get(
+            (asset_code, department, version_num))
+        if asset_version is None:
+            return None
+        with self._lock:
+            return self._resolve(asset_version)
+
+    def get_department_versions(
+            self,
+            asset_code: str,
+            department: str
+    ) -> list[AssetVersion]:
+        """
+        Return the versions of an asset in a department, ordered by version.
+        """
+        self._index_asset_versions()
+        versions = self._versions_by_asset.get(
+            asset_code, {}).get(department, [])
+        with self._lock:
+            return [self._resolve(asset_version) for asset_version in versions]
+
+    def get_latest_version(
+            self,
+            asset_code: str,
+            department: str,
+            status: str | Status | None = None
+    ) -> AssetVersion | None:
+        """
+        Return the highest version of an asset in a department, optionally
+        restricted to versions with the given status.
+        """
+        if isinstance(status, str):
+            status, _ = Status.from_string(status)
+        for asset_version in reversed(
+                self.get_department_versions(asset_code, department)):
+            if status is None or asset_version.status == status:
+                return asset_version
+        return None
+
+    # --------------------------------------------------------------------------
+    # Internals
+    # --------------------------------------------------------------------------
+
+    def _preserve(self, asset_version: AssetVersion) -> None:
+        """ Keep a copy of an asset version before the project changes its
+            status. Called by the project with the lock held.
+        """
+        key = (asset_version.asset, asset_version.department,
+               asset_version.version)
+        if key not in self._preserved:
+            self._preserved[key] = _copy(asset_version)
+
+    def _resolve(self, asset_version: AssetVersion) -> AssetVersion:
+        """ Return the snapshot's copy of an asset version, the lock must be
+            held so its status cannot change while it is copied.
+        """
+        preserved = self._preserved.get((
+            asset_version.asset, asset_version.department,
+            asset_version.version))
+        return _copy(preserved or asset_version)
+
+    def _records(self, record_type: str) -> Iterator:
+        if record_type == 'assets':
+            return self.iter_assets()
+        return self.iter_asset_versions()
+
+    def _index_assets(self) -> None:
+        if self._assets_by_code is not None:
+            return
+        assets_by_key = {}
+        assets_by_code = {}
+        for asset in self.iter_assets():
+            assets_by_code[asset.code] = asset
+            assets_by_key[(asset.name, asset.asset_type.value)] = asset
+        self._assets_by_key = assets_by_key
+        self._assets_by_code = assets_by_code
+
+    def _index_asset_versions(self) -> None:
+        if self._versions_by_key is not None:
+            return
+        # Keys never change, the indexes hold the project's objects and
+        # lookups resolve them
+        versions_by_key = {}
+        versions_by_asset = {}
+        for index in range(self._asset_version_count):
+            asset_version = self._asset_versions[index]
+            versions_by_key[(asset_version.asset, asset_version.department,
+                             asset_version.version)] = asset_version
+            versions_by_asset.setdefault(asset_version.asset, {}).setdefault(
+                asset_version.department, []).append(asset_version)
+        for departments in versions_by_asset.values():
+            for versions in departments.values():
+                versions.sort(key=lambda av: av.version)
+        self._versions_by_asset = versions_by_asset
+        self._versions_by_key = versions_by_key
+
+
+def _copy(asset_version: AssetVersion) -> AssetVersion:
+    return AssetVersion(
+        asset=asset_version.asset,
+        department=asset_version.department,
+        version=asset_version.version,
+        status=asset_version.status
+    )
@@ -26,10 +26,7 @@ class Status(Enum):
         original string, we validate the value in the AssetVersion class.
         """
         normalized = value.strip().lower()
-        for item in cls:
-            if item.value == normalized:
-                return item, value
-        return None, value
+        return cls._value2member_map_.get(normalized), value
 
     @classmethod
     def is_valid(cls, value: str) -> bool:
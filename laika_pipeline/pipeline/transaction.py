@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from laika_pipeline.pipeline.asset import Asset
+from laika_pipeline.pipeline.asset_version import AssetVersion
+from laika_pipeline.pipeline.events import ChangeType
+from laika_pipeline.pipeline.status import Status
+from laika_pipeline.validation.operation_result import OperationResult
+
+if TYPE_CHECKING:
+    # Avoid circular imports for type hints
+    from laika_pipeline.pipeline.project import Project
+
+
+class Transaction:
+    """
+    A batch of project changes applied all together or not at all, opened
+    with Project.transaction().
+
+    Records added inside the transaction are indexed right away, so the
+    validation rules see them next to the committed records, and logged so
+    they can be removed again. Rolling back costs the number of staged
+    changes, never a copy of the project. Change events are held back until
+    the commit.
+
+    Example:
+        >>> with project.transaction() as transaction:
+        ...     for asset_version in asset_versions:
+        ...         project.add_asset_version(asset_version)
+        >>> transaction.result.success
+    """
+
+    def __init__(self, project: 'Project'):
+        self.project = project
+        # Result of the commit or rollback, None while the transaction is open
+        self.result = None
+        self._assets = []
+        self._asset_versions = []
+        # (asset version, status before the transaction changed it)
+        self._status_changes = []
+        self._events = []
+        self._errors = []
+        self._asset_count = len(project._assets)
+        self._asset_version_count = len(project._asset_versions)
+        # Keys of changed versions the project had to save before the
+        # transaction changed them again
+        self._changed_before = set()
+        self._unsaved_asset_count = len(project._unsaved_assets)
+        self._unsaved_version_count = len(project._unsaved_versions)
+
+    @property
+    def is_open(self) -> bool:
+        return self.result is None
+
+    def __enter__(self) -> Transaction:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        if not self.is_open:
+            return False
+        if exc_type is not None:
+            self.rollback(
+                f"Rolled back after {exc_type.__name__}: {exc_value}")
+            return False
+        self.commit()
+        return False
+
+    # --------------------------------------------------------------------------
+    # Recorded by the project while the transaction is open
+    # --------------------------------------------------------------------------
+
+    def staged_asset(self, asset: Asset) -> None:
+        self._assets.append(asset)
+
+    def staged_asset_version(self, asset_version: AssetVersion) -> None:
+        self._asset_versions.append(asset_version)
+
+    def staged_status(
+            self,
+            asset_version: AssetVersion,
+            old_status: Status,
+            unsaved: bool = False
+    ) -> None:
+        self._status_changes.append((asset_version, old_status))
+        if unsaved:
+            self._changed_before.add((asset_version.asset,
+                                      asset_version.department,
+                                      asset_version.version))
+
+    def staged_event(self, change_type: ChangeType, payload: dict) -> None:
+        self._events.append((change_type, payload))
+
+    def failed(self, result: OperationResult) -> None:
+        self._errors.append(result.error_message)
+
+    def committed_state(self) -> tuple[int, int, list]:
+        """ Return the number of assets and asset versions the project had
+            when the transaction opened, and the (asset version, original
+            status) of the status changes staged since, oldest first.
+        """
+        return (self._asset_count, self._asset_version_count,
+                list(self._status_changes))
+
+    # --------------------------------------------------------------------------
+    # Commit and rollback
+    # --------------------------------------------------------------------------
+
+    def commit(self) -> OperationResult:
+        """
+        Keep the staged changes, write them to the storage backend in one
+        batch per record type and publish their events. If any operation of
+        the transaction failed, or writing to storage raises, everything is
+        rolled back instead.
+
+        Returns:
+            OperationResult: success with the number of staged assets, asset
+                             versions and status changes, or the failure
+        """
+        self._check_open()
+        if self._errors:
+            return self.rollback(
+                f"Rolled back, {len(self._errors)} operations failed: "
+                f"{self._errors[0]}")
+        project = self.project
+        storage = project.storage_backend
+        if storage:
+            new = {(av.asset, av.department, av.version)
+                   for av in self._asset_versions}
+            changed = _unique([
+                asset_version for asset_version, _ in self._status_changes
+                if (asset_version.asset, asset_version.department,
+                    asset_version.version) not in new])
+            try:
+                # Publishing can conflict, nothing else is written until it
+                # succeeded
+                if self._asset_versions:
+                    storage.publish_asset_versions(
+                        self._asset_versions, skip_identical=True)
+                if self._assets:
+                    storage.save_assets(self._assets)
+                if changed:
+                    storage.save_asset_versions(changed)
+            except Exception as error:
+                self.rollback(f"Rolled back, saving failed: {error}")
+                raise
+            # Written, the next save has nothing left to do for them
+            del project._unsaved_assets[self._unsaved_asset_count:]
+            del project._unsaved_versions[self._unsaved_version_count:]
+            for asset_version in changed:
+                project._changed_versions.pop(
+                    (asset_version.asset, asset_version.department,
+                     asset_version.version), None)
+        project._end_transaction(self)
+        for change_type, payload in self._events:
+            self.project.events.publish(change_type, payload)
+        self.result = OperationResult(
+            success=True,
+            data={
+                "assets": len(self._assets),
+                "asset_versions": len(self._asset_versions),
+                "status_changes": len(self._status_changes)
+            }
+        )
+        return self.result
+
+    def rollback(self, reason: str = "Rolled back") -> OperationResult:
+        """
+        Undo the staged changes and drop their events.
+
+        Returns:
+            OperationResult: failure with the reason and the errors of the
+                             failed operations
+        """
+        self._check_open()
+        project = self.project
+        touched = set()
+        for asset_version, old_status in reversed(self._status_changes):
+            asset_version.status = old_status
+            touched.add((asset_version.asset, asset_version.department))
+            key = (asset_version.asset, asset_version.department,
+                   asset_version.version)
+            if key not in self._changed_before:
+                project._changed_versions.pop(key, None)
+
+        staged = {(av.asset, av.department, av.version)
+                  for av in self._asset_versions}
+        for asset_version in self._asset_versions:
+            key = (asset_version.asset, asset_version.department,
+                   asset_version.version)
+            project._versions_by_key.pop(key, None)
+            touched.add(key[:2])
+        for asset_code, department in touched:
+            departments = project._versions_by_asset.get(asset_code, {})
+            versions = [av for av in departments.get(department, [])
+                        if (av.asset, av.department, av.version)
+                        not in staged]
+            if versions:
+                departments[department] = versions
+            else:
+                departments.pop(department, None)
+                if not departments:
+                    project._versions_by_asset.pop(asset_code, None)
+            project._recompute_latest(asset_code, department)
+        del project._asset_versions[self._asset_version_count:]
+
+        for asset in self._assets:
+            project._assets_by_code.pop(asset.code, None)
+            project._assets_by_key.pop(
+                (asset.name, asset.asset_type.value), None)
+        del project._assets[self._asset_count:]
+        project._sorted_codes = None
+        del project._unsaved_assets[self._unsaved_asset_count:]
+        del project._unsaved_versions[self._unsaved_version_count:]
+
+        project._end_transaction(self)
+        self.result = OperationResult(
+            success=False,
+            error_message=reason,
+            data={"errors": list(self._errors)}
+        )
+        return self.result
+
+    def _check_open(self) -> None:
+        if not self.is_open:
+            raise RuntimeError("The transaction is already closed")
+
+
+def _unique(asset_versions: list[AssetVersion]) -> list[AssetVersion]:
+    """ Drop repeated asset versions, keeping the first of each key. """
+    unique = {}
+    for asset_version in asset_versions:
+        unique.setdefault((asset_version.asset, asset_version.department,
+                           asset_version.version), asset_version)
+    return list(unique.values())
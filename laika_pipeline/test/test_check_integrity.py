@@ -0,0 +1,97 @@
+import unittest
+import tempfile
+
+from laika_pipeline import api
+from laika_pipeline.pipeline.asset import Asset
+from laika_pipeline.pipeline.asset_version import AssetVersion
+from laika_pipeline.db.storage_json import StorageJSON
+
+
+class TestCheckIntegrity(unittest.TestCase):
+    """Tests for the check_integrity() function."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.storage = StorageJSON(self.temp_dir.name)
+        api.initialize("Test Project", self.storage)
+
+    def tearDown(self):
+        """Clean up after each test."""
+        api.clear()
+        self.temp_dir.cleanup()
+
+    def _add(self, name, department, versions):
+        asset = Asset(name, "character")
+        for version in versions:
+            api.add_asset_version(AssetVersion(asset.code, department, version))
+        api.add_asset(asset)
+
+    def test_consistent_project(self):
+        """Test checking a consistent project reports no violations."""
+        self._add("hero", "modeling", [1, 2, 3])
+        self._add("villain", "rigging", [1])
+
+        result = api.check_integrity()
+
+        self.assertTrue(result['success'])
+        self.assertIsNone(result['error'])
+        self.assertEqual(result['report'], {
+            "ok": True, "assets": 2, "asset_versions": 4, "violations": {}})
+
+    def test_storage_with_problems(self):
+        """Test streaming a damaged storage reports every problem."""
+        self.storage.save_assets([Asset("hero", "character"),
+                                  Asset("prop", "prop")])
+        self.storage.save_asset_versions([
+            AssetVersion("hero_character", "modeling", 1),
+            AssetVersion("hero_character", "modeling", 4),
+            AssetVersion("ghost_character", "modeling", 1),
+        ])
+
+        result = api.check_integrity(from_storage=True)
+
+        self.assertFalse(result['success'])
+        violations = result['report']['violations']
+        self.assertEqual(result['report']['asset_versions'], 3)
+        self.assertEqual(
+            violations['asset_version.linear_versioning'],
+            [{"key": ["hero_character", "modeling"],
+              "message": "Asset 'hero_character' in department 'modeling' "
+                         "is missing versions 2-3."}])
+        self.assertEqual(violations['asset_version.orphan'][0]['key'],
+                         ["ghost_character"])
+        self.assertEqual(violations['asset.has_version'][0]['key'],
+                         ["prop_prop"])
+        # Nothing was loaded into the project
+        self.assertEqual(api.list_assets(), [])
+
+    def test_duplicates(self):
+        """Test duplicate records are reported."""
+        project = api.get_project()
+        self._add("hero", "modeling", [1])
+        project.assets.append(Asset("hero", "character"))
+        project.asset_versions.append(
+            AssetVersion("hero_character", "modeling", 1))
+
+        result = api.check_integrity()
+
+        violations = result['report']['violations']
+        self.assertEqual(violations['asset.unique'][0]['key'],
+                         ["hero_character"])
+        self.assertEqual(violations['asset_version.unique'][0]['key'],
+                         ["hero_character", "modeling", 1])
+
+    def test_from_storage_without_backend(self):
+        """Test checking the storage of a memory only project fails."""
+        api.initialize("Memory Project")
+
+        result = api.check_integrity(from_storage=True)
+
+        self.assertFalse(result['success'])
+        self.assertIsNone(result['report'])
+        self.assertIn("No storage backend", result['error'])
+
+
+if __name__ == '__main__':
+    unittest.main()
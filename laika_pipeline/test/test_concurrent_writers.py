@@ -0,0 +1,196 @@
+import multiprocessing
+import os
+import tempfile
+import unittest
+
+from laika_pipeline.pipeline.asset import Asset
+from laika_pipeline.pipeline.asset_version import AssetVersion
+from laika_pipeline.pipeline.project import Project
+from laika_pipeline.pipeline.status import Status
+from laika_pipeline.db.storage_backend import VersionConflictError
+from laika_pipeline.db.storage_json import StorageJSON
+from laika_pipeline.db.storage_sqlite import StorageSQLite
+from laika_pipeline.db.storage_tiered import TieredStorage
+from laika_pipeline.lib.file_lock import FileLock
+
+
+def _publish_versions(root, version_storage, count):
+    """Publish count versions of the same asset, retrying on conflicts."""
+    storage = StorageJSON(root, version_storage=version_storage)
+    published = 0
+    while published < count:
+        version = storage.get_head("hero_character", "modeling") + 1
+        try:
+            storage.publish_asset_versions(
+                [AssetVersion("hero_character", "modeling", version)])
+        except VersionConflictError:
+            continue
+        published += 1
+
+
+def _hold_lock(path, locked, release):
+    with FileLock(path):
+        locked.set()
+        release.wait(10)
+
+
+class TestConcurrentWriters(unittest.TestCase):
+    """Tests for several writers sharing a storage."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.storage = StorageJSON(self.temp_dir.name)
+        publisher = Project("Test Project", self.storage)
+        publisher.add_asset_version(
+            AssetVersion("hero_character", "modeling", 1))
+        publisher.add_asset(Asset("hero", "character"))
+        publisher.save()
+
+    def tearDown(self):
+        """Clean up after each test."""
+        self.temp_dir.cleanup()
+
+    def _loaded_project(self):
+        project = Project("Test Project", StorageJSON(self.temp_dir.name))
+        project.load()
+        return project
+
+    def test_processes_publish_distinct_versions(self):
+        """Test processes publishing at the same time never store the same
+        version twice or leave a gap."""
+        for version_storage in ("file", "packed"):
+            with self.subTest(version_storage=version_storage):
+                root = os.path.join(self.temp_dir.name, version_storage)
+                workers = [
+                    multiprocessing.Process(
+                        target=_publish_versions,
+                        args=(root, version_storage, 20))
+                    for _ in range(4)
+                ]
+                for worker in workers:
+                    worker.start()
+                for worker in workers:
+                    worker.join(60)
+                    self.assertEqual(worker.exitcode, 0)
+
+                storage = StorageJSON(root)
+                self.assertEqual(
+                    sorted(av.version for av in storage.load_asset_versions()),
+                    list(range(1, 81)))
+                self.assertEqual(
+                    storage.get_head("hero_character", "modeling"), 80)
+                # The index matches the files
+                self.assertEqual(storage.rebuild_index(), 80)
+
+    def test_conflicting_save(self):
+        """Test the second project saving the same version number is refused
+        and the first one's record is kept."""
+        first = self._loaded_project()
+        second = self._loaded_project()
+        first.add_asset_version(
+            AssetVersion("hero_character", "modeling", 2))
+        second.add_asset_version(
+            AssetVersion("hero_character", "modeling", 2, "inactive"))
+
+        first.save()
+        with self.assertRaises(VersionConflictError) as context:
+            second.save()
+
+        self.assertEqual(context.exception.head, 2)
+        self.assertEqual(context.exception.versions, [2])
+        self.assertEqual(
+            self.storage.load_asset_version(
+                "hero_character", "modeling", 2).status, Status.ACTIVE)
+
+    def test_save_writes_only_changes(self):
+        """Test saving does not overwrite statuses another project changed
+        since both loaded."""
+        first = self._loaded_project()
+        second = self._loaded_project()
+        second.set_version_status(
+            AssetVersion("hero_character", "modeling", 1), Status.DEPRECATED)
+        second.save()
+
+        first.add_asset_version(
+            AssetVersion("hero_character", "modeling", 2))
+        first.save()
+
+        self.assertEqual(
+            self.storage.load_asset_version(
+                "hero_character", "modeling", 1).status, Status.DEPRECATED)
+        self.assertEqual(
+            self.storage.get_head("hero_character", "modeling"), 2)
+
+    def test_head_of_storage_without_heads(self):
+        """Test the head is read from the stored versions when no head file
+        was written yet."""
+        self.storage.save_asset_versions([
+            AssetVersion("villain_character", "rigging", version)
+            for version in (1, 2, 3)])
+
+        self.assertEqual(
+            self.storage.get_head("villain_character", "rigging"), 3)
+        with self.assertRaises(VersionConflictError):
+            self.storage.publish_asset_versions(
+                [AssetVersion("villain_character", "rigging", 3)])
+
+    def test_publish_conflicts_on_every_backend(self):
+        """Test every backend refuses the same publishes: stored versions,
+        gaps after the head and pruned numbers."""
+        root = self.temp_dir.name
+        backends = {
+            "json": StorageJSON(os.path.join(root, "json")),
+            "packed": StorageJSON(os.path.join(root, "packed"),
+                                  version_storage="packed"),
+            "sqlite": StorageSQLite(),
+            "tiered": TieredStorage(
+                StorageSQLite(),
+                StorageSQLite(os.path.join(root, "shared.db"))),
+        }
+        for name, storage in backends.items():
+            with self.subTest(backend=name):
+                storage.publish_asset_versions([
+                    AssetVersion("hero_character", "modeling", version)
+                    for version in (1, 2)])
+                storage.delete_asset_versions(
+                    [("hero_character", "modeling", 2)])
+                for versions, head in [([1], 2), ([2], 2), ([4], 2),
+                                       ([3, 5], 2)]:
+                    with self.assertRaises(VersionConflictError) as context:
+                        storage.publish_asset_versions([
+                            AssetVersion("hero_character", "modeling", version)
+                            for version in versions])
+                    self.assertEqual(context.exception.head, head)
+                storage.publish_asset_versions([
+                    AssetVersion("hero_character", "modeling", version)
+                    for version in (3, 4)])
+                self.assertEqual(
+                    storage.get_head("hero_character", "modeling"), 4)
+
+    def test_lock_timeout(self):
+        """Test waiting for a lock held by another process times out."""
+        path = os.path.join(self.temp_dir.name, StorageJSON.LOCK_FILE)
+        locked = multiprocessing.Event()
+        release = multiprocessing.Event()
+        holder = multiprocessing.Process(
+            target=_hold_lock, args=(path, locked, release))
+        holder.start()
+        try:
+            self.assertTrue(locked.wait(10))
+            with self.assertRaises(TimeoutError):
+                with FileLock(path, timeout=0.05):
+                    pass
+        finally:
+            release.set()
+            holder.join(10)
+        # Reentrant within a thread once released
+        lock = FileLock(path, timeout=1)
+        with lock:
+            with lock:
+                self.assertTrue(lock.is_held)
+        self.assertFalse(lock.is_held)
+
+
+if __name__ == '__main__':
+    unittest.main()
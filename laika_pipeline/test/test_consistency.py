@@ -0,0 +1,117 @@
+import json
+import os
+import tempfile
+import unittest
+
+from laika_pipeline.pipeline.asset import Asset
+from laika_pipeline.pipeline.asset_version import AssetVersion
+from laika_pipeline.pipeline.project import Project
+from laika_pipeline.validation.consistency import sweep
+
+
+def _entry(name, department, version, status="active"):
+    return {"asset": {"name": name, "type": "character"},
+            "department": department, "version": version, "status": status}
+
+
+class TestConsistency(unittest.TestCase):
+    """Tests for trusted loads and the consistency sweep."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "assets.json")
+        self.project = Project("Test Project")
+
+    def tearDown(self):
+        """Clean up after each test."""
+        self.temp_dir.cleanup()
+
+    def _write(self, entries):
+        with open(self.path, 'w') as fp:
+            json.dump(entries, fp)
+
+    def test_trusted_load_matches_untrusted(self):
+        """Test that a consistent file loads the same records either way."""
+        self._write([_entry("hero", "modeling", version)
+                     for version in (1, 2, 3)]
+                    + [_entry("villain", "rigging", 1)])
+        untrusted = Project("Untrusted")
+        untrusted.load_assets(self.path)
+
+        self.project.load_assets(self.path, trusted=True)
+
+        self.assertEqual(self.project.validation_errors, [])
+        self.assertEqual(self.project.asset_versions,
+                         untrusted.asset_versions)
+        self.assertEqual(
+            [asset.code for asset in self.project.assets],
+            [asset.code for asset in untrusted.assets])
+        self.assertEqual(self.project.get_latest_version(
+            "hero_character", "modeling").version, 3)
+
+    def test_trusted_load_skips_contextual_rules(self):
+        """Test that contextual rules do not run per record."""
+        self._write([_entry("hero", "modeling", 1)])
+        self.project.rules.timing = True
+
+        self.project.load_assets(self.path, trusted=True)
+
+        timings = self.project.rules.timings()
+        self.assertEqual(timings['asset_version.valid'].calls, 1)
+        self.assertNotIn('asset_version.linear_versioning', timings)
+        self.assertNotIn('asset.has_version', timings)
+
+    def test_trusted_load_reports_violations_in_batch(self):
+        """Test that the sweep reports gaps and duplicates after loading."""
+        self._write([
+            _entry("hero", "modeling", 1),
+            _entry("hero", "modeling", 3),
+            _entry("hero", "modeling", 3),
+            _entry("hero", "rigging", 2),
+            _entry("villain", "", 1),
+        ])
+
+        self.project.load_assets(self.path, trusted=True)
+
+        errors = self.project.validation_errors
+        self.assertEqual(len(errors), 5)
+        self.assertIn("already exists", errors[0])
+        self.assertIn("Department must be", errors[1])
+        self.assertIn("'modeling' is missing versions 2", errors[2])
+        self.assertIn("'rigging' is missing versions 1", errors[3])
+        self.assertIn("'villain_character' has no versions", errors[4])
+
+    def test_check_consistency_respects_disabled_rules(self):
+        """Test that disabled rules are not reported by the sweep."""
+        self._write([_entry("hero", "modeling", 2)])
+        self.project.load_assets(self.path, trusted=True)
+
+        self.assertFalse(self.project.check_consistency().success)
+        self.project.rules.disable('asset_version.linear_versioning')
+
+        result = self.project.check_consistency()
+        self.assertTrue(result.success)
+        self.assertEqual(result.data, {"violations": []})
+
+    def test_sweep(self):
+        """Test the sweep on records outside a project."""
+        assets = [Asset("hero", "character"), Asset("hero", "character")]
+        asset_versions = [
+            AssetVersion("hero_character", "modeling", version, "active")
+            for version in (1, 4, 5, 7, 7)
+        ]
+
+        violations = sweep(assets, asset_versions)
+
+        self.assertEqual(
+            [(violation.rule, violation.key) for violation in violations],
+            [('asset_version.unique', ('hero_character', 'modeling', 7)),
+             ('asset_version.linear_versioning',
+              ('hero_character', 'modeling')),
+             ('asset.unique', ('hero_character',))])
+        self.assertIn("missing versions 2-3, 6", violations[1].message)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import csv
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from laika_pipeline import api
+from laika_pipeline.pipeline.asset import Asset
+from laika_pipeline.pipeline.asset_version import AssetVersion
+from laika_pipeline.pipeline.project import Project
+from laika_pipeline.db.storage_json import StorageJSON
+
+
+class TestExport(unittest.TestCase):
+    """Tests for streaming exports of a project."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.storage = StorageJSON(os.path.join(self.temp_dir.name, "db"))
+        self.assets = [Asset(f"asset{i}", "prop") for i in range(3)]
+        self.versions = [AssetVersion(asset.code, "modeling", version)
+                         for asset in self.assets for version in [1, 2]]
+        self.storage.save_assets(self.assets)
+        self.storage.save_asset_versions(self.versions)
+        api.initialize("Export", self.storage)
+
+    def tearDown(self):
+        """Clean up after each test."""
+        api.clear()
+        self.temp_dir.cleanup()
+
+    def _path(self, name):
+        return os.path.join(self.temp_dir.name, name)
+
+    def test_export_jsonl_from_storage(self):
+        """Test that stored versions are exported without loading them."""
+        result = api.export(self._path("versions.jsonl"))
+
+        self.assertTrue(result["success"])
+        self.assertEqual(result["count"], 6)
+        with open(self._path("versions.jsonl")) as fp:
+            records = [json.loads(line) for line in fp]
+        self.assertEqual(
+            sorted((r["asset"], r["version"]) for r in records),
+            sorted((v.asset, v.version) for v in self.versions))
+        self.assertEqual(api.get_project().asset_versions, [])
+
+    def test_export_csv(self):
+        """Test the CSV export of assets and versions."""
+        api.export(self._path("assets.csv"), "csv", "assets")
+        api.export(self._path("versions.csv"), "csv")
+
+        with open(self._path("assets.csv"), newline="") as fp:
+            assets = list(csv.DictReader(fp))
+        with open(self._path("versions.csv"), newline="") as fp:
+            versions = list(csv.DictReader(fp))
+        self.assertEqual(sorted(a["code"] for a in assets),
+                         ["asset0_prop", "asset1_prop", "asset2_prop"])
+        self.assertEqual(versions[0].keys(),
+                         {"asset", "department", "version", "status"})
+        self.assertEqual(len(versions), 6)
+
+    def test_export_streams_one_record_at_a_time(self):
+        """Test that each record is written before the next one is read."""
+        stream = io.StringIO()
+
+        def records():
+            for written, version in enumerate(self.versions):
+                self.assertEqual(stream.getvalue().count("\n"), written)
+                yield version
+
+        project = Project("Streaming", self.storage)
+        with mock.patch.object(self.storage, "iter_asset_versions",
+                               return_value=records()):
+            result = project.export(stream)
+
+        self.assertEqual(result.data["count"], 6)
+
+    def test_export_without_storage_uses_memory(self):
+        """Test that a project without storage exports its own records."""
+        project = Project("Memory")
+        project.add_asset(self.assets[0])
+        project.add_asset_version(self.versions[0])
+        stream = io.StringIO()
+
+        result = project.export(stream, "csv")
+
+        self.assertEqual(result.data["count"], 1)
+        self.assertIn("asset0_prop,modeling,1,active", stream.getvalue())
+
+    def test_invalid_options(self):
+        """Test that unknown formats and record types are reported."""
+        project = Project("Memory")
+        self.assertFalse(project.export(io.StringIO(), "xml").success)
+        self.assertFalse(
+            project.export(io.StringIO(), record_type="shots").success)
+        self.assertFalse(api.export(self._path("x.xml"), "xml")["success"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+
+from laika_pipeline import api
+from laika_pipeline.pipeline.asset import Asset
+from laika_pipeline.pipeline.asset_version import AssetVersion
+
+
+class TestGetBulk(unittest.TestCase):
+    """Tests for get_assets_bulk() and get_asset_versions_bulk()."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        api.initialize()
+        for name, asset_type in [("hero", "character"), ("sword", "prop")]:
+            asset = Asset(name, asset_type)
+            api.add_asset_version(AssetVersion(asset.code, "modeling", 1))
+            api.add_asset_version(AssetVersion(asset.code, "modeling", 2))
+            api.add_asset(asset)
+
+    def tearDown(self):
+        """Clean up after each test."""
+        api.clear()
+
+    def test_get_assets_bulk_aligned(self):
+        """Test results are aligned with the input keys."""
+        found = api.get_assets_bulk([
+            ("sword", "prop"), ("nobody", "prop"), ("hero", "character")])
+
+        names = [a.name if a else None for a in found['results']]
+        self.assertEqual(names, ["sword", None, "hero"])
+        self.assertEqual(found['missing'], [("nobody", "prop")])
+
+    def test_get_assets_bulk_does_not_log_misses(self):
+        """Test that misses are not added to the validation errors."""
+        api.get_assets_bulk([("nobody", "prop")] * 100)
+
+        self.assertEqual(api.get_validation_errors(), [])
+
+    def test_get_asset_versions_bulk_aligned(self):
+        """Test version results are aligned with the input keys."""
+        found = api.get_asset_versions_bulk([
+            ("hero", "character", 2),
+            ("hero", "character", 9),
+            ("sword", "prop", 1),
+            ("nobody", "prop", 1),
+        ])
+
+        versions = [v.version if v else None for v in found['results']]
+        self.assertEqual(versions, [2, None, 1, None])
+        self.assertEqual(found['missing'], [
+            ("hero", "character", 9), ("nobody", "prop", 1)])
+        self.assertEqual(api.get_validation_errors(), [])
+
+    def test_get_bulk_accepts_generators(self):
+        """Test that any iterable of keys is accepted."""
+        keys = ((name, "character") for name in ["hero", "villain"])
+
+        found = api.get_assets_bulk(keys)
+
+        self.assertEqual(len(found['results']), 2)
+        self.assertEqual(found['missing'], [("villain", "character")])
@@ -0,0 +1,105 @@
+import unittest
+
+from laika_pipeline import api
+from laika_pipeline.pipeline.asset import Asset
+from laika_pipeline.pipeline.asset_version import AssetVersion
+from laika_pipeline.pipeline.status import Status
+
+
+class TestGetLatestVersion(unittest.TestCase):
+    """Tests for get_latest_version() and get_latest_versions()."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        api.initialize()
+        self.asset = Asset("hero", "character")
+        for version, status in [(1, "active"), (2, "active"),
+                                (3, "inactive")]:
+            api.add_asset_version(
+                AssetVersion(self.asset.code, "modeling", version, status))
+        api.add_asset_version(AssetVersion(self.asset.code, "rigging", 1))
+        api.add_asset(self.asset)
+
+    def tearDown(self):
+        """Clean up after each test."""
+        api.clear()
+
+    def test_get_latest_version_any_status(self):
+        """Test the latest version regardless of status."""
+        latest = api.get_latest_version("hero", "character", "modeling")
+
+        self.assertEqual(latest.version, 3)
+
+    def test_get_latest_version_active(self):
+        """Test the latest active version skips inactive heads."""
+        latest = api.get_latest_version(
+            "hero", "character", "modeling", status="active")
+
+        self.assertEqual(latest.version, 2)
+
+    def test_get_latest_version_updated_on_add(self):
+        """Test that adding a version updates the cached head."""
+        api.add_asset_version(
+            AssetVersion(self.asset.code, "modeling", 4, "active"))
+
+        latest = api.get_latest_version(
+            "hero", "character", "modeling", status=Status.ACTIVE)
+
+        self.assertEqual(latest.version, 4)
+
+    def test_get_latest_version_updated_on_status_change(self):
+        """Test that status changes update the cached heads."""
+        project = api.get_project()
+        v2 = project.find_asset_version(self.asset.code, "modeling", 2)
+        v3 = project.find_asset_version(self.asset.code, "modeling", 3)
+
+        project.set_version_status(v2, "inactive")
+        self.assertEqual(api.get_latest_version(
+            "hero", "character", "modeling", "active").version, 1)
+
+        project.set_version_status(v3, "active")
+        self.assertEqual(api.get_latest_version(
+            "hero", "character", "modeling", "active").version, 3)
+        self.assertEqual(api.get_latest_version(
+            "hero", "character", "modeling", "inactive").version, 2)
+
+    def test_get_latest_version_missing(self):
+        """Test unknown assets and departments return None."""
+        self.assertIsNone(
+            api.get_latest_version("nobody", "character", "modeling"))
+        self.assertIsNone(
+            api.get_latest_version("hero", "character", "cfx"))
+        self.assertIsNone(api.get_latest_version(
+            "hero", "character", "rigging", status="inactive"))
+
+    def test_get_latest_versions_aligned_with_input(self):
+        """Test the bulk variant returns results in input order."""
+        results = api.get_latest_versions([
+            ("hero", "character", "rigging"),
+            ("nobody", "prop", "modeling"),
+            ("hero", "character", "modeling"),
+        ], status="active")
+
+        self.assertEqual(results[0].department, "rigging")
+        self.assertIsNone(results[1])
+        self.assertEqual(results[2].version, 2)
+
+    def test_get_latest_versions_invalid_status(self):
+        """Test an invalid status matches nothing, like the single lookup."""
+        keys = [("hero", "character", "rigging"),
+                ("hero", "character", "modeling")]
+
+        self.assertEqual(api.get_latest_versions(keys, status="bogus"),
+                         [None, None])
+        self.assertIsNone(api.get_latest_version(
+            "hero", "character", "rigging", status="bogus"))
+
+    def test_set_version_status_invalid(self):
+        """Test an invalid status is rejected."""
+        project = api.get_project()
+        v1 = project.find_asset_version(self.asset.code, "modeling", 1)
+
+        result = project.set_version_status(v1, "bogus")
+
+        self.assertFalse(result.success)
+        self.assertEqual(v1.status, Status.ACTIVE)
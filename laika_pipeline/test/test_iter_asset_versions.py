@@ -0,0 +1,84 @@
+import unittest
+
+from laika_pipeline import api
+from laika_pipeline.pipeline.asset import Asset
+from laika_pipeline.pipeline.asset_version import AssetVersion
+
+
+class TestIterAssetVersions(unittest.TestCase):
+    """Tests for iter_asset_versions() and list_asset_versions_page()."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        api.initialize()
+        self.asset = Asset("hero", "character")
+        for department in ["texturing", "modeling"]:
+            for version in [1, 2, 3]:
+                api.add_asset_version(
+                    AssetVersion(self.asset.code, department, version))
+        api.add_asset(self.asset)
+
+    def tearDown(self):
+        """Clean up after each test."""
+        api.clear()
+
+    def test_iter_asset_versions_ordering(self):
+        """Test versions are ordered by (department, version)."""
+        keys = [(v.department, v.version)
+                for v in api.iter_asset_versions("hero", "character")]
+
+        self.assertEqual(keys, [
+            ("modeling", 1), ("modeling", 2), ("modeling", 3),
+            ("texturing", 1), ("texturing", 2), ("texturing", 3),
+        ])
+
+    def test_iter_asset_versions_offset_limit(self):
+        """Test offset and limit select a slice of the ordering."""
+        keys = [(v.department, v.version)
+                for v in api.iter_asset_versions(
+                    "hero", "character", offset=2, limit=2)]
+
+        self.assertEqual(keys, [("modeling", 3), ("texturing", 1)])
+
+    def test_iter_asset_versions_after_cursor(self):
+        """Test that the cursor resumes after the given key."""
+        keys = [(v.department, v.version)
+                for v in api.iter_asset_versions(
+                    "hero", "character", after=("modeling", 2), limit=3)]
+
+        self.assertEqual(keys, [
+            ("modeling", 3), ("texturing", 1), ("texturing", 2)])
+
+    def test_iter_asset_versions_unknown_asset(self):
+        """Test iterating versions of an unknown asset yields nothing."""
+        versions = list(api.iter_asset_versions("nobody", "character"))
+
+        self.assertEqual(versions, [])
+
+    def test_paging_bounds(self):
+        """Test invalid limits and offsets are refused up front."""
+        for limit in (0, -1):
+            with self.subTest(limit=limit):
+                page = api.list_asset_versions_page(
+                    "hero", "character", limit=limit)
+                self.assertFalse(page['success'])
+                self.assertEqual(page['items'], [])
+                self.assertIn("limit", page['error'])
+        for arguments in ({'offset': -1}, {'limit': -1}):
+            with self.subTest(arguments=arguments):
+                with self.assertRaises(ValueError):
+                    api.iter_asset_versions("hero", "character", **arguments)
+
+    def test_list_asset_versions_page_walks_all_pages(self):
+        """Test walking pages with the cursor visits every version once."""
+        seen = []
+        page = api.list_asset_versions_page("hero", "character", limit=4)
+        while True:
+            seen.extend(page['items'])
+            if page['next_cursor'] is None:
+                break
+            page = api.list_asset_versions_page(
+                "hero", "character", limit=4, after=page['next_cursor'])
+
+        self.assertEqual(len(seen), 6)
+        self.assertEqual(len(set((v.department, v.version) for v in seen)), 6)
@@ -0,0 +1,93 @@
+import unittest
+
+from laika_pipeline import api
+from laika_pipeline.pipeline.asset import Asset
+from laika_pipeline.pipeline.asset_version import AssetVersion
+
+
+class TestIterAssets(unittest.TestCase):
+    """Tests for the iter_assets() and list_assets_page() functions."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        api.initialize()
+        for name in ["delta", "alpha", "charlie", "bravo", "echo"]:
+            asset = Asset(name, "prop")
+            api.add_asset_version(AssetVersion(asset.code, "modeling", 1))
+            api.add_asset(asset)
+
+    def tearDown(self):
+        """Clean up after each test."""
+        api.clear()
+
+    def test_iter_assets_is_lazy(self):
+        """Test that iter_assets returns an iterator, not a list."""
+        assets = api.iter_assets()
+
+        self.assertNotIsInstance(assets, list)
+        self.assertIsInstance(next(assets), Asset)
+
+    def test_iter_assets_sorted_by_code(self):
+        """Test that assets are yielded in stable code order."""
+        names = [asset.name for asset in api.iter_assets()]
+
+        self.assertEqual(
+            names, ["alpha", "bravo", "charlie", "delta", "echo"])
+
+    def test_iter_assets_offset_limit(self):
+        """Test offset and limit select a slice of the ordering."""
+        names = [asset.name for asset in api.iter_assets(offset=1, limit=2)]
+
+        self.assertEqual(names, ["bravo", "charlie"])
+
+    def test_iter_assets_after_cursor(self):
+        """Test that the cursor resumes after the given code."""
+        names = [asset.name
+                 for asset in api.iter_assets(after="bravo_prop", limit=2)]
+
+        self.assertEqual(names, ["charlie", "delta"])
+
+    def test_iter_assets_sees_new_assets(self):
+        """Test that a new asset is included in the ordering."""
+        asset = Asset("able", "prop")
+        api.add_asset_version(AssetVersion(asset.code, "modeling", 1))
+        api.add_asset(asset)
+
+        first = next(api.iter_assets())
+
+        self.assertEqual(first.name, "able")
+
+    def test_list_assets_page_walks_all_pages(self):
+        """Test walking pages with the cursor visits every asset once."""
+        seen = []
+        page = api.list_assets_page(limit=2)
+        while True:
+            seen.extend(asset.name for asset in page['items'])
+            if page['next_cursor'] is None:
+                break
+            page = api.list_assets_page(limit=2, after=page['next_cursor'])
+
+        self.assertEqual(
+            seen, ["alpha", "bravo", "charlie", "delta", "echo"])
+
+    def test_list_assets_page_last_page_has_no_cursor(self):
+        """Test that an exactly full last page has no next cursor."""
+        page = api.list_assets_page(limit=5)
+
+        self.assertEqual(len(page['items']), 5)
+        self.assertIsNone(page['next_cursor'])
+
+    def test_paging_bounds(self):
+        """Test invalid limits and offsets are refused up front."""
+        for limit in (0, -1):
+            with self.subTest(limit=limit):
+                page = api.list_assets_page(limit=limit)
+                self.assertEqual(
+                    page, {'success': False, 'items': [], 'next_cursor': None,
+                           'error': f"limit must be an integer of at least 1, "
+                                    f"not {limit}"})
+        for arguments in ({'offset': -1}, {'limit': -1}):
+            with self.subTest(arguments=arguments):
+                with self.assertRaises(ValueError):
+                    api.iter_assets(**arguments)
+        self.assertEqual(list(api.iter_assets(limit=0)), [])
@@ -83,6 +83,46 @@ class TestLoadAssets(unittest.TestCase):
         with self.assertRaises(Exception):
             api.load_assets(json_file)
 
+    def _write_out_of_order(self):
+        asset_data = [
+            {"asset": {"name": "hero", "type": "character"},
+             "department": department, "version": version,
+             "status": "active"}
+            for department, version in [
+                ("modeling", 3), ("rigging", 2), ("modeling", 1),
+                ("rigging", 1), ("modeling", 2), ("modeling", "four")]
+        ]
+        json_file = os.path.join(self.temp_path, "out_of_order.json")
+        with open(json_file, 'w') as f:
+            json.dump(asset_data, f)
+        return json_file
+
+    def test_load_assets_out_of_order_rejected(self):
+        """Test that versions listed out of order are rejected by default."""
+        api.load_assets(self._write_out_of_order())
+
+        versions = api.list_asset_versions("hero", "character")
+        self.assertEqual(
+            [(v.department, v.version) for v in versions],
+            [("modeling", 1), ("modeling", 2), ("rigging", 1)])
+
+    def test_load_assets_sort(self):
+        """Test that sorting accepts versions listed out of order."""
+        report = api.load_assets(self._write_out_of_order(), sort=True)
+
+        versions = api.list_asset_versions("hero", "character")
+        self.assertEqual(
+            [(v.department, v.version) for v in versions],
+            [("modeling", 1), ("modeling", 2), ("modeling", 3),
+             ("rigging", 1), ("rigging", 2)])
+        # Only the invalid version and the repeated asset are reported
+        exists = "Asset 'hero' of type 'AssetType.CHARACTER' already exists"
+        self.assertEqual(report['errors'],
+                         [exists, exists, "Version must be an integer",
+                          exists, exists, exists])
+        self.assertEqual(api.get_latest_version(
+            "hero", "character", "modeling").version, 3)
+
     def test_load_assets_nonexistent_file(self):
         """Test loading from a nonexistent file."""
         with self.assertRaises(Exception):
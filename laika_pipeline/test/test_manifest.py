@@ -0,0 +1,149 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from laika_pipeline import api
+from laika_pipeline.pipeline.asset import Asset
+from laika_pipeline.pipeline.asset_version import AssetVersion
+from laika_pipeline.pipeline.project import Project
+from laika_pipeline.pipeline.status import Status
+from laika_pipeline.db.storage_json import StorageJSON
+from laika_pipeline.db.storage_sqlite import StorageSQLite
+
+
+class TestManifest(unittest.TestCase):
+    """Tests for the manifest export and bulk import."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "manifest.json")
+        self.project = Project("Source")
+        for name, asset_type in [("hero", "character"), ("sword", "prop")]:
+            for version in [1, 2, 3]:
+                self.project.add_asset_version(AssetVersion(
+                    f"{name}_{asset_type}", "modeling", version))
+            self.project.add_asset(Asset(name, asset_type))
+        self.project.set_version_status(
+            self.project.find_asset_version("hero_character", "modeling", 3),
+            Status.INACTIVE)
+
+    def tearDown(self):
+        """Clean up after each test."""
+        api.clear()
+        self.temp_dir.cleanup()
+
+    def _export(self, project):
+        with open(self.path, "w") as stream:
+            return project.export_manifest(stream)
+
+    def test_export_matches_load_assets_format(self):
+        """Test the exported manifest loads back with load_assets."""
+        result = self._export(self.project)
+
+        self.assertEqual(result.data, {"count": 6, "orphans": 0})
+        with open(self.path) as fp:
+            entries = json.load(fp)
+        self.assertEqual(entries[2], {
+            "asset": {"name": "hero", "type": "character"},
+            "department": "modeling", "version": 3, "status": "inactive"})
+        loaded = Project("Loaded")
+        loaded.load_assets(self.path)
+        self.assertEqual(len(loaded.asset_versions), 6)
+        self.assertEqual(len(loaded.assets), 2)
+
+    def test_trusted_import_skips_validators(self):
+        """Test that a trusted import runs no validation rules."""
+        self._export(self.project)
+        target = Project("Target")
+
+        with mock.patch.object(target.rules, "compile") as compile_rules:
+            result = target.import_manifest(self.path, trusted=True)
+
+        compile_rules.assert_not_called()
+        self.assertEqual(result.data, {"assets": 2, "asset_versions": 6})
+        self.assertEqual(
+            target.get_latest_version("hero_character", "modeling").version,
+            3)
+        self.assertEqual(
+            target.get_latest_version(
+                "hero_character", "modeling", Status.ACTIVE).version, 2)
+
+    def test_trusted_import_skips_existing_entries(self):
+        """Test that importing twice does not duplicate records."""
+        self._export(self.project)
+        target = Project("Target")
+        target.import_manifest(self.path, trusted=True)
+
+        result = target.import_manifest(self.path, trusted=True)
+
+        self.assertEqual(result.data, {"assets": 0, "asset_versions": 0})
+        self.assertEqual(len(target.asset_versions), 6)
+
+    def test_trusted_import_rejects_malformed_records(self):
+        """Test that a trusted import still skips records that are invalid
+        on their own instead of indexing them."""
+        manifest = io.StringIO(json.dumps([
+            {"asset": {"name": "hero", "type": "character"},
+             "department": "modeling", "version": 1, "status": "active"},
+            {"asset": {"name": "ghost", "type": "spirit"},
+             "department": "modeling", "version": 1, "status": "active"},
+            {"asset": {"name": "hero", "type": "character"},
+             "department": "modeling", "version": 2, "status": "retired"},
+            {"asset": {"name": "hero", "type": "character"},
+             "department": "rigging", "version": "one", "status": "active"},
+        ]))
+        target = Project("Target")
+
+        result = target.import_manifest(manifest, trusted=True)
+
+        self.assertTrue(result.success)
+        self.assertEqual(result.data, {"assets": 1, "asset_versions": 2})
+        self.assertEqual([asset.code for asset in target.assets],
+                         ["hero_character"])
+        self.assertTrue(all(isinstance(av.status, Status)
+                            for av in target.asset_versions))
+        self.assertEqual(len(target.validation_errors), 3)
+        self.assertIn("spirit", target.validation_errors[0])
+        self.assertIn("retired", target.validation_errors[1])
+        self.assertEqual(target.validation_errors[2],
+                         "Version must be an integer")
+
+    def test_untrusted_import_validates(self):
+        """Test that an untrusted import reports invalid entries."""
+        manifest = io.StringIO(json.dumps([
+            {"asset": {"name": "hero", "type": "character"},
+             "department": "modeling", "version": 1, "status": "active"},
+            {"asset": {"name": "hero", "type": "character"},
+             "department": "modeling", "version": 3, "status": "active"},
+        ]))
+        target = Project("Target")
+
+        result = target.import_manifest(manifest)
+
+        self.assertEqual(result.data["asset_versions"], 1)
+        self.assertTrue(target.validation_errors)
+
+    def test_migrate_between_backends(self):
+        """Test a storage to storage migration through a manifest."""
+        source = StorageJSON(os.path.join(self.temp_dir.name, "json"))
+        self.project.storage_backend = source
+        self.project.save()
+        api.initialize("Source", source)
+        self.assertEqual(api.export_manifest(self.path)["count"], 6)
+
+        target = StorageSQLite()
+        api.initialize("Target", target)
+        result = api.import_manifest(self.path, trusted=True)
+        api.save()
+
+        self.assertEqual(result["asset_versions"], 6)
+        self.assertEqual(len(target.load_asset_versions()), 6)
+        self.assertEqual(len(target.load_assets()), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,177 @@
+import os
+import tempfile
+import unittest
+
+from laika_pipeline import api
+from laika_pipeline.pipeline.asset import Asset
+from laika_pipeline.pipeline.asset_version import AssetVersion
+from laika_pipeline.pipeline.events import ChangeType
+from laika_pipeline.pipeline.project import Project
+from laika_pipeline.pipeline.retention import RetentionPolicy, read_archive
+from laika_pipeline.pipeline.status import Status
+from laika_pipeline.db.storage_json import StorageJSON
+from laika_pipeline.db.storage_sqlite import StorageSQLite
+
+
+class TestPruneVersions(unittest.TestCase):
+    """Tests for the prune_versions() function."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self._initialize(StorageJSON(self.temp_dir.name))
+
+    def tearDown(self):
+        """Clean up after each test."""
+        api.clear()
+        self.temp_dir.cleanup()
+
+    def _initialize(self, storage):
+        """Store hero modeling versions 1 to 8, all deprecated but v3."""
+        self.storage = storage
+        api.initialize("Test Project", storage)
+        self.project = api.get_project()
+        for version in range(1, 9):
+            api.add_asset_version(AssetVersion(
+                "hero_character", "modeling", version,
+                "active" if version == 3 else "deprecated"))
+        api.add_asset(Asset("hero", "character"))
+        api.save()
+
+    def _versions(self, project):
+        return [av.version for av in project.get_department_versions(
+            "hero_character", "modeling")]
+
+    def test_prune(self):
+        """Test the last versions and the latest active one are kept and the
+        rest is deleted from the project and storage."""
+        paths = [self.storage._asset_version_file(
+            "hero_character", "modeling", version)
+            for version in (1, 2, 4, 5, 6)]
+        size = sum(os.path.getsize(path) for path in paths)
+        snapshot = api.snapshot()
+        subscription = self.project.events.subscribe(
+            change_types=[ChangeType.PRUNED])
+
+        result = api.prune_versions(keep_last=2)
+
+        self.assertTrue(result["success"])
+        report = result["report"]
+        self.assertEqual(
+            (report["checked"], report["pruned"], report["archived"],
+             report["bytes_reclaimed"]), (8, 5, 0, size))
+        self.assertGreater(report["estimated_load_seconds"], 0)
+        self.assertEqual([key[2] for key in report["keys"]], [1, 2, 4, 5, 6])
+        self.assertFalse(any(os.path.exists(path) for path in paths))
+        self.assertEqual(self._versions(self.project), [3, 7, 8])
+        self.assertEqual(len(self.project.asset_versions), 3)
+        self.assertEqual(api.get_latest_version(
+            "hero", "character", "modeling", "active").version, 3)
+        self.assertEqual(subscription.get(timeout=0).data["pruned"], 5)
+        subscription.close()
+        # A snapshot taken before still sees the pruned versions
+        self.assertEqual(snapshot.asset_version_count, 8)
+        # The pruned numbers are not gaps and are never reused
+        self.assertTrue(api.check_integrity()["success"])
+        self.assertTrue(api.check_integrity(from_storage=True)["success"])
+        self.assertEqual(api.publish_next_version(
+            "hero", "character", "modeling")["version"], 9)
+        reloaded = Project("Test Project", StorageJSON(self.temp_dir.name))
+        reloaded.load()
+        self.assertEqual(self._versions(reloaded), [3, 7, 8, 9])
+        self.assertTrue(reloaded.check_integrity().success)
+
+    def test_archive_packed_storage(self):
+        """Test pruned versions of packed files are archived and dropped
+        from the packed file, surviving an index rebuild."""
+        root = os.path.join(self.temp_dir.name, "packed")
+        self._initialize(StorageJSON(root, version_storage="packed"))
+        archive = os.path.join(self.temp_dir.name, "archive.jsonl")
+        packed = self.storage._packed_file("hero_character", "modeling")
+        size = os.path.getsize(packed)
+
+        result = api.prune_versions(keep_last=3, archive_path=archive)
+
+        report = result["report"]
+        self.assertEqual((report["pruned"], report["archived"]), (4, 4))
+        self.assertEqual(report["bytes_reclaimed"],
+                         size - os.path.getsize(packed))
+        self.assertEqual(
+            [(av.version, av.status) for av in read_archive(archive)],
+            [(version, Status.DEPRECATED) for version in (1, 2, 4, 5)])
+        self.assertEqual(
+            [av.version for av in self.storage.load_asset_history(
+                "hero_character", "modeling")], [3, 6, 7, 8])
+        self.assertEqual(
+            [av.version for av in StorageJSON(root).load_asset_versions()],
+            [3, 6, 7, 8])
+        self.storage.rebuild_index()
+        self.assertEqual(len(self.storage.list_pruned_asset_version_keys()),
+                         4)
+        self.assertTrue(api.check_integrity(from_storage=True)["success"])
+
+    def test_dry_run(self):
+        """Test a dry run reports the versions without deleting them."""
+        result = api.prune_versions(
+            keep_last=5, statuses=["deprecated", "inactive"], dry_run=True)
+
+        self.assertEqual(result["report"]["keys"],
+                         [["hero_character", "modeling", 1],
+                          ["hero_character", "modeling", 2]])
+        self.assertEqual(result["report"]["bytes_reclaimed"], 0)
+        self.assertEqual(len(self.storage.list_asset_version_keys()), 8)
+        self.assertEqual(len(self.project.asset_versions), 8)
+
+    def test_stored_status_wins(self):
+        """Test versions reactivated in storage since the load are kept."""
+        other = Project("Test Project", StorageJSON(self.temp_dir.name))
+        other.load()
+        other.set_version_status(
+            AssetVersion("hero_character", "modeling", 1), Status.ACTIVE)
+        other.save()
+
+        result = self.project.prune(RetentionPolicy(keep_last=6))
+
+        self.assertEqual(result.data["report"].keys,
+                         [("hero_character", "modeling", 2)])
+        self.assertTrue(self.storage.has_asset_version(
+            "hero_character", "modeling", 1))
+
+    def test_refused(self):
+        """Test invalid policies and unsaved projects are refused."""
+        for arguments, error in [
+                ({"keep_last": 0}, "keep_last"),
+                ({"statuses": ["retired"]}, "invalid status"),
+                ({"asset_name": "ghost", "asset_type": "prop"}, "not found")]:
+            with self.subTest(arguments=arguments):
+                result = api.prune_versions(**arguments)
+                self.assertFalse(result["success"])
+                self.assertIn(error, result["error"].lower())
+        api.set_version_status("hero", "character", "modeling", 7,
+                               "inactive")
+
+        result = api.prune_versions(keep_last=1)
+
+        self.assertFalse(result["success"])
+        self.assertIn("unsaved", result["error"])
+
+    def test_sqlite(self):
+        """Test pruning a SQLite storage keeps the numbers taken."""
+        self._initialize(StorageSQLite())
+
+        result = api.prune_versions(keep_last=1)
+
+        self.assertEqual(result["report"]["pruned"], 6)
+        self.assertGreater(result["report"]["bytes_reclaimed"], 0)
+        self.assertEqual(
+            [av.version for av in self.storage.load_asset_versions()], [3, 8])
+        self.assertEqual(self.storage.get_head("hero_character", "modeling"),
+                         8)
+        self.assertTrue(api.check_integrity(from_storage=True)["success"])
+        self.storage.delete_asset_versions([("hero_character", "modeling", 8)])
+        self.assertEqual(self.storage.get_head("hero_character", "modeling"),
+                         8)
+
+
+if __name__ == '__main__':
+    unittest.main()
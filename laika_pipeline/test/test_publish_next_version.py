@@ -0,0 +1,169 @@
+import multiprocessing
+import os
+import tempfile
+import threading
+import unittest
+
+from laika_pipeline import api
+from laika_pipeline.pipeline.asset import Asset
+from laika_pipeline.pipeline.asset_version import AssetVersion
+from laika_pipeline.pipeline.project import Project
+from laika_pipeline.db.storage_json import StorageJSON
+from laika_pipeline.db.storage_sqlite import StorageSQLite
+
+
+def _publish_from_process(backend, root, count):
+    """Publish count versions through a project of its own."""
+    if backend == "sqlite":
+        storage = StorageSQLite(os.path.join(root, "project.db"))
+    else:
+        storage = StorageJSON(root)
+    project = Project("Test Project", storage)
+    project.load()
+    for _ in range(count):
+        if not project.publish_next_version(
+                "hero", "character", "modeling").success:
+            raise SystemExit(1)
+
+
+class TestPublishNextVersion(unittest.TestCase):
+    """Tests for the publish_next_version() function."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.storage = StorageJSON(self.temp_dir.name)
+        api.initialize("Test Project", self.storage)
+        api.add_asset_version(AssetVersion("hero_character", "modeling", 1))
+        api.add_asset(Asset("hero", "character"))
+        api.save()
+
+    def tearDown(self):
+        """Clean up after each test."""
+        api.clear()
+        self.temp_dir.cleanup()
+
+    def _versions(self, project):
+        return [av.version for av in project.get_department_versions(
+            "hero_character", "modeling")]
+
+    def test_publish(self):
+        """Test the next version is added and stored at once."""
+        result = api.publish_next_version(
+            "hero", "character", "modeling", "inactive")
+
+        self.assertEqual(result, {
+            "success": True, "asset_code": "hero_character", "version": 2,
+            "fetched": 0, "error": None})
+        self.assertEqual(
+            self.storage.load_asset_version(
+                "hero_character", "modeling", 2).status.value, "inactive")
+        self.assertEqual(self.storage.get_head("hero_character", "modeling"),
+                         2)
+        # Nothing is left for the next save
+        self.assertEqual(api.get_project()._unsaved_versions, [])
+
+    def test_fetches_versions_of_other_publishers(self):
+        """Test versions published by another project since the load are
+        added before the allocated one."""
+        other = Project("Test Project", StorageJSON(self.temp_dir.name))
+        other.load()
+        other.publish_next_version("hero", "character", "modeling")
+        other.publish_next_version("hero", "character", "modeling")
+
+        result = api.publish_next_version("hero", "character", "modeling")
+
+        self.assertEqual((result["version"], result["fetched"]), (4, 2))
+        self.assertEqual(self._versions(api.get_project()), [1, 2, 3, 4])
+
+    def test_new_asset(self):
+        """Test publishing the first version of an unknown asset adds it."""
+        result = api.publish_next_version("villain", "character", "rigging")
+
+        self.assertEqual(result["version"], 1)
+        self.assertIsNotNone(api.get_asset("villain", "character"))
+        self.assertTrue(self.storage.has_asset("villain_character"))
+        self.assertEqual(api.get_project()._unsaved_assets, [])
+
+    def test_refused_versions_take_no_number(self):
+        """Test invalid fields and unsaved versions fail without moving the
+        stored head."""
+        api.add_asset_version(AssetVersion("hero_character", "rigging", 1))
+
+        for arguments, error in [
+                (("hero", "character", "modeling", "bogus"), "status"),
+                (("ghost", "monster", "modeling"), "asset type"),
+                (("hero", "character", "rigging"), "unsaved versions")]:
+            with self.subTest(arguments=arguments):
+                result = api.publish_next_version(*arguments)
+                self.assertFalse(result["success"])
+                self.assertIn(error, result["error"].lower())
+
+        self.assertEqual(self.storage.get_head("hero_character", "modeling"),
+                         1)
+        self.assertEqual(self.storage.get_head("hero_character", "rigging"),
+                         0)
+
+    def test_without_storage(self):
+        """Test numbers follow the project's head without a backend."""
+        api.initialize("Memory Project")
+
+        versions = [
+            api.publish_next_version("hero", "character", "modeling")[
+                "version"] for _ in range(3)]
+
+        self.assertEqual(versions, [1, 2, 3])
+
+    def test_threads(self):
+        """Test threads publishing through one project get distinct,
+        linear versions."""
+        project = api.get_project()
+        errors = []
+
+        def publish():
+            for _ in range(10):
+                result = project.publish_next_version(
+                    "hero", "character", "modeling")
+                if not result.success:
+                    errors.append(result.error_message)
+
+        threads = [threading.Thread(target=publish) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(self._versions(project), list(range(1, 42)))
+        self.assertEqual(api.check_integrity()["report"]["violations"], {})
+
+    def test_processes(self):
+        """Test processes sharing a storage get distinct, linear versions."""
+        for backend in ("json", "sqlite"):
+            with self.subTest(backend=backend):
+                root = os.path.join(self.temp_dir.name, backend)
+                os.makedirs(root)
+                if backend == "sqlite":
+                    storage = StorageSQLite(os.path.join(root, "project.db"))
+                else:
+                    storage = StorageJSON(root)
+                storage.save_assets([Asset("hero", "character")])
+                workers = [
+                    multiprocessing.Process(
+                        target=_publish_from_process,
+                        args=(backend, root, 10))
+                    for _ in range(3)
+                ]
+                for worker in workers:
+                    worker.start()
+                for worker in workers:
+                    worker.join(60)
+                    self.assertEqual(worker.exitcode, 0)
+
+                self.assertEqual(
+                    sorted(av.version for av in storage.load_asset_versions()),
+                    list(range(1, 31)))
+
+
+if __name__ == '__main__':
+    unittest.main()
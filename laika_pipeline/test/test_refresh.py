@@ -0,0 +1,169 @@
+import unittest
+import tempfile
+import os
+
+from laika_pipeline import api
+from laika_pipeline.pipeline.asset import Asset
+from laika_pipeline.pipeline.asset_version import AssetVersion
+from laika_pipeline.pipeline.project import Project
+from laika_pipeline.pipeline.status import Status
+from laika_pipeline.db.storage_json import StorageJSON
+from laika_pipeline.db.storage_watcher import (
+    InotifyWatcher, PollingWatcher, create_watcher)
+
+
+class TestRefresh(unittest.TestCase):
+    """Tests for the refresh() function."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        # A second process publishing into the same storage directory
+        self.publisher = Project("Publisher", StorageJSON(self.temp_dir.name))
+        self._publish("hero", "character", "modeling", 1)
+        self.publisher.save()
+
+        api.initialize("Reader", StorageJSON(self.temp_dir.name))
+        api.load()
+
+    def tearDown(self):
+        """Clean up after each test."""
+        api.clear()
+        self.temp_dir.cleanup()
+
+    def _publish(self, name, asset_type, department, version):
+        asset = Asset(name, asset_type)
+        self.publisher.add_asset_version(
+            AssetVersion(asset.code, department, version))
+        self.publisher.add_asset(asset)
+
+    def test_refresh_without_changes(self):
+        """Test refreshing when nothing changed merges nothing."""
+        result = api.refresh()
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['asset_versions'], 0)
+        self.assertEqual(len(api.list_assets()), 1)
+
+    def test_refresh_merges_new_publishes(self):
+        """Test that another process's publishes are merged."""
+        self._publish("hero", "character", "modeling", 2)
+        self._publish("sword", "prop", "modeling", 1)
+        self.publisher.save()
+
+        result = api.refresh()
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['assets'], 1)
+        self.assertEqual(result['asset_versions'], 2)
+        self.assertIsNotNone(api.get_asset("sword", "prop"))
+        latest = api.get_latest_version("hero", "character", "modeling")
+        self.assertEqual(latest.version, 2)
+
+    def test_refresh_applies_status_changes(self):
+        """Test that status changes saved elsewhere are applied."""
+        version = self.publisher.find_asset_version(
+            "hero_character", "modeling", 1)
+        self.publisher.set_version_status(version, "inactive")
+        self.publisher.save()
+
+        result = api.refresh()
+
+        self.assertEqual(result['status_changes'], 1)
+        version = api.get_asset_version("hero", "character", 1)
+        self.assertEqual(version.status, Status.INACTIVE)
+        self.assertIsNone(api.get_latest_version(
+            "hero", "character", "modeling", "active"))
+
+    def test_refresh_keeps_local_records(self):
+        """Test that unsaved local records survive a refresh."""
+        local = Asset("villain", "character")
+        api.add_asset_version(AssetVersion(local.code, "modeling", 1))
+        api.add_asset(local)
+        self._publish("sword", "prop", "modeling", 1)
+        self.publisher.save()
+
+        api.refresh()
+
+        self.assertIsNotNone(api.get_asset("villain", "character"))
+        self.assertIsNotNone(api.get_asset("sword", "prop"))
+
+    def test_refresh_without_prior_load(self):
+        """Test that refresh merges everything when nothing was loaded."""
+        api.clear()
+        api.initialize("Fresh", StorageJSON(self.temp_dir.name))
+
+        result = api.refresh()
+
+        self.assertEqual(result['assets'], 1)
+        self.assertEqual(result['asset_versions'], 1)
+
+    def test_refresh_polling_storage(self):
+        """Test a storage set to poll loads and refreshes with polling."""
+        api.initialize("Reader", StorageJSON(
+            self.temp_dir.name, use_inotify=False))
+        api.load()
+        project = api.get_project()
+        self.assertIsInstance(project._watcher, PollingWatcher)
+        self._publish("hero", "character", "modeling", 2)
+        self.publisher.save()
+
+        result = api.refresh()
+
+        self.assertEqual(result['asset_versions'], 1)
+        self.assertEqual(api.get_latest_version(
+            "hero", "character", "modeling").version, 2)
+
+
+class TestStorageWatcher(unittest.TestCase):
+    """Tests for the polling and inotify storage watchers."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = self.temp_dir.name
+        self._write("existing.json", "{}")
+
+    def tearDown(self):
+        """Clean up after each test."""
+        self.temp_dir.cleanup()
+
+    def _write(self, name, content):
+        path = os.path.join(self.root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as fp:
+            fp.write(content)
+        return path
+
+    def _check_watcher(self, watcher):
+        self.assertFalse(watcher.poll())
+        new = self._write("sub/new.json", "{}")
+        changed = self._write("existing.json", "{\"a\": 1}")
+        self._write("ignored.txt", "")
+
+        changes = watcher.poll()
+
+        self.assertEqual(sorted(changes.changed), sorted([new, changed]))
+        self.assertFalse(watcher.poll())
+        os.remove(new)
+        self.assertEqual(watcher.poll().removed, [new])
+        watcher.close()
+
+    def test_polling_watcher(self):
+        """Test the manifest based polling watcher."""
+        self._check_watcher(PollingWatcher([self.root], ('.json',)))
+
+    def test_inotify_watcher(self):
+        """Test the inotify watcher where the platform supports it."""
+        watcher = create_watcher([self.root])
+        if not isinstance(watcher, InotifyWatcher):
+            self.skipTest("inotify is not available")
+        self._check_watcher(watcher)
+
+    def test_watcher_without_baseline(self):
+        """Test that without a baseline existing files are reported."""
+        for use_inotify in (True, False):
+            watcher = create_watcher(
+                [self.root], baseline=False, use_inotify=use_inotify)
+            self.assertEqual(len(watcher.poll().changed), 1)
+            watcher.close()
@@ -1,8 +1,13 @@
+import os
 import unittest
 import tempfile
 
 from laika_pipeline import api
 from laika_pipeline.pipeline.asset import Asset
+from laika_pipeline.pipeline.asset_version import AssetVersion
+from laika_pipeline.pipeline.project import Project
+from laika_pipeline.pipeline.status import Status
+from laika_pipeline.db.storage_backend import VersionConflictError
 from laika_pipeline.db.storage_json import StorageJSON
 
 
@@ -52,6 +57,84 @@ class TestSave(unittest.TestCase):
         self.assertTrue(result1['success'])
         self.assertTrue(result2['success'])
 
+    def _add_hero(self, versions=3):
+        for version in range(1, versions + 1):
+            api.add_asset_version(
+                AssetVersion("hero_character", "modeling", version))
+        api.add_asset(Asset("hero", "character"))
+
+    def _reload(self, root):
+        project = Project("SaveTest", StorageJSON(root))
+        project.load()
+        return project
+
+    def test_status_setter_is_saved(self):
+        """Test a status set through the AssetVersion setter is written by
+        the next save and moves the latest version caches."""
+        self._add_hero()
+        api.save()
+        asset_version = api.get_project().find_asset_version(
+            "hero_character", "modeling", 3)
+
+        asset_version.status = 'deprecated'
+        self.assertTrue(api.save()['success'])
+
+        self.assertEqual(
+            self._reload(self.temp_dir.name).find_asset_version(
+                "hero_character", "modeling", 3).status, Status.DEPRECATED)
+        self.assertEqual(api.get_latest_version(
+            "hero", "character", "modeling", "active").version, 2)
+
+    def test_save_to_new_backend(self):
+        """Test the first save after replacing the storage backend writes
+        every record."""
+        self._add_hero()
+        api.save()
+        root = os.path.join(self.temp_dir.name, "copy")
+
+        api.get_project().storage_backend = StorageJSON(root)
+        self.assertTrue(api.save()['success'])
+
+        reloaded = self._reload(root)
+        self.assertEqual(len(reloaded.assets), 1)
+        self.assertEqual(len(reloaded.asset_versions), 3)
+
+    def test_full_save(self):
+        """Test a full save overwrites the stored records."""
+        self._add_hero()
+        api.save()
+        self.storage.save_asset_versions([AssetVersion(
+            "hero_character", "modeling", 2, "deprecated")])
+
+        self.assertTrue(api.save(full=True)['success'])
+
+        self.assertEqual(
+            self._reload(self.temp_dir.name).find_asset_version(
+                "hero_character", "modeling", 2).status, Status.ACTIVE)
+
+    def test_save_again_to_storage_holding_it(self):
+        """Test saving versions the storage already holds with the same
+        content succeeds, and a different content writes nothing."""
+        self._add_hero()
+        api.save()
+        api.initialize("SaveTest", StorageJSON(self.temp_dir.name))
+        self._add_hero(versions=4)
+
+        self.assertTrue(api.save()['success'])
+        self.assertEqual(
+            len(self._reload(self.temp_dir.name).asset_versions), 4)
+
+        api.initialize("SaveTest", StorageJSON(self.temp_dir.name))
+        api.add_asset_version(AssetVersion(
+            "hero_character", "modeling", 1, "inactive"))
+        api.add_asset(Asset("villain", "character"))
+        api.add_asset_version(
+            AssetVersion("villain_character", "modeling", 1))
+        with self.assertRaises(VersionConflictError):
+            api.get_project().save()
+        self.assertFalse(
+            StorageJSON(self.temp_dir.name).has_asset("villain_character"))
+
     def test_save_without_storage(self):
         """Test save without storage backend (in-memory)."""
         api.clear()
@@ -0,0 +1,154 @@
+import tempfile
+import unittest
+from unittest import mock
+
+from laika_pipeline import api
+from laika_pipeline.pipeline.asset import Asset
+from laika_pipeline.pipeline.asset_version import AssetVersion
+from laika_pipeline.pipeline.events import ChangeType
+from laika_pipeline.pipeline.status import Status
+from laika_pipeline.db.storage_json import StorageJSON
+
+
+class TestSetVersionStatus(unittest.TestCase):
+    """Tests for the set_version_status() and set_version_status_bulk()
+    functions."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.storage = StorageJSON(self.temp_dir.name)
+        api.initialize("Test Project", self.storage)
+        self.project = api.get_project()
+        for name in ("hero", "villain"):
+            asset = Asset(name, "character")
+            for department in ("modeling", "rigging"):
+                for version in range(1, 6):
+                    api.add_asset_version(
+                        AssetVersion(asset.code, department, version))
+            api.add_asset(asset)
+        api.save()
+
+    def tearDown(self):
+        """Clean up after each test."""
+        api.clear()
+        self.temp_dir.cleanup()
+
+    def _statuses(self, asset_code, department):
+        return [av.status.value for av in self.project.get_department_versions(
+            asset_code, department)]
+
+    def test_set_version_status(self):
+        """Test changing one version updates the latest version caches."""
+        result = api.set_version_status(
+            "hero", "character", "modeling", 5, "deprecated")
+
+        self.assertEqual(result, {
+            "success": True, "asset_code": "hero_character", "version": 5,
+            "status": "deprecated", "error": None})
+        self.assertEqual(api.get_latest_version(
+            "hero", "character", "modeling", "active").version, 4)
+        self.assertEqual(api.get_latest_version(
+            "hero", "character", "modeling", "deprecated").version, 5)
+
+    def test_set_version_status_failures(self):
+        """Test unknown assets, versions and statuses are refused."""
+        for arguments, error in [
+                (("ghost", "character", "modeling", 1, "inactive"),
+                 "not found"),
+                (("hero", "character", "modeling", 9, "inactive"),
+                 "not found"),
+                (("hero", "character", "modeling", 1, "retired"),
+                 "invalid status")]:
+            with self.subTest(arguments=arguments):
+                result = api.set_version_status(*arguments)
+                self.assertFalse(result["success"])
+                self.assertIn(error, result["error"].lower())
+
+    def test_bulk_older_than(self):
+        """Test deprecating a department's versions below a number for
+        every asset."""
+        subscription = self.project.events.subscribe()
+
+        result = api.set_version_status_bulk(
+            "deprecated", department="modeling", older_than=4)
+
+        self.assertEqual(result, {"success": True, "changed": 6,
+                                  "error": None})
+        for asset_code in ("hero_character", "villain_character"):
+            self.assertEqual(
+                self._statuses(asset_code, "modeling"),
+                ["deprecated"] * 3 + ["active"] * 2)
+            self.assertEqual(self._statuses(asset_code, "rigging"),
+                             ["active"] * 5)
+        self.assertEqual(self.project.get_latest_version(
+            "hero_character", "modeling", Status.DEPRECATED).version, 3)
+        self.assertEqual(self.project.get_latest_version(
+            "hero_character", "modeling", Status.ACTIVE).version, 5)
+        events = []
+        while (event := subscription.get(timeout=0)) is not None:
+            events.append(event.change_type)
+        self.assertEqual(events, [ChangeType.STATUS_CHANGED] * 6)
+        subscription.close()
+
+    def test_bulk_filters(self):
+        """Test the asset and current status filters."""
+        api.set_version_status("hero", "character", "rigging", 2, "inactive")
+
+        result = api.set_version_status_bulk(
+            "deprecated", asset_name="hero", asset_type="character",
+            current_status="inactive")
+
+        self.assertEqual(result["changed"], 1)
+        self.assertEqual(self._statuses("hero_character", "rigging"),
+                         ["active", "deprecated", "active", "active",
+                          "active"])
+        # Deprecating the head moves the cached latest active version
+        api.set_version_status_bulk(
+            "deprecated", asset_name="villain", asset_type="character",
+            department="rigging")
+        self.assertIsNone(self.project.get_latest_version(
+            "villain_character", "rigging", Status.ACTIVE))
+        self.assertFalse(api.set_version_status_bulk("retired")["success"])
+        self.assertFalse(api.set_version_status_bulk(
+            "deprecated", asset_name="ghost", asset_type="prop")["success"])
+
+    def test_save_writes_only_changed_versions(self):
+        """Test the next save writes the changed versions and nothing
+        else."""
+        api.set_version_status_bulk("inactive", older_than=2)
+
+        with mock.patch.object(self.storage, "save_asset_versions",
+                               wraps=self.storage.save_asset_versions) \
+                as save_asset_versions, \
+                mock.patch.object(self.storage, "save_assets") as save_assets:
+            self.assertTrue(api.save()["success"])
+
+        save_assets.assert_not_called()
+        save_asset_versions.assert_called_once()
+        self.assertEqual(
+            sorted((av.asset, av.department, av.version)
+                   for av in save_asset_versions.call_args[0][0]),
+            [("hero_character", "modeling", 1),
+             ("hero_character", "rigging", 1),
+             ("villain_character", "modeling", 1),
+             ("villain_character", "rigging", 1)])
+        self.assertEqual(
+            self.storage.load_asset_version(
+                "villain_character", "rigging", 1).status, Status.INACTIVE)
+
+    def test_bulk_rolled_back(self):
+        """Test a bulk change inside a failed transaction is undone."""
+        with self.project.transaction() as transaction:
+            api.set_version_status_bulk("deprecated", department="rigging")
+            transaction.rollback()
+
+        self.assertEqual(self._statuses("hero_character", "rigging"),
+                         ["active"] * 5)
+        self.assertEqual(self.project.get_latest_version(
+            "hero_character", "rigging", Status.ACTIVE).version, 5)
+        self.assertEqual(self.project._changed_versions, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
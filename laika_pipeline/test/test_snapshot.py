@@ -0,0 +1,157 @@
+import gc
+import io
+import json
+import threading
+import unittest
+
+from laika_pipeline import api
+from laika_pipeline.pipeline.asset import Asset
+from laika_pipeline.pipeline.asset_version import AssetVersion
+from laika_pipeline.pipeline.status import Status
+
+
+class TestSnapshot(unittest.TestCase):
+    """Tests for the snapshot() function."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        api.initialize()
+        self.project = api.get_project()
+        self._publish("hero", "modeling", 1)
+        self._publish("hero", "modeling", 2)
+
+    def tearDown(self):
+        """Clean up after each test."""
+        api.clear()
+
+    def _publish(self, name, department, version, status="active"):
+        asset = Asset(name, "character")
+        result = api.add_asset_version(
+            AssetVersion(asset.code, department, version, status))
+        if self.project.get_asset_by_code(asset.code) is None:
+            api.add_asset(asset)
+        return result
+
+    def test_snapshot_ignores_later_writes(self):
+        """Test records added and statuses changed later are not seen."""
+        with api.snapshot() as snapshot:
+            self._publish("hero", "modeling", 3)
+            self._publish("villain", "rigging", 1)
+            self.project.set_version_status(
+                AssetVersion("hero_character", "modeling", 2),
+                Status.DEPRECATED)
+
+            self.assertEqual(snapshot.asset_version_count, 2)
+            self.assertEqual(
+                [av.version for av in snapshot.iter_asset_versions()], [1, 2])
+            self.assertIsNone(snapshot.get_asset_by_code("villain_character"))
+            self.assertEqual(
+                snapshot.find_asset_version(
+                    "hero_character", "modeling", 2).status, Status.ACTIVE)
+            self.assertEqual(snapshot.get_latest_version(
+                "hero_character", "modeling", "active").version, 2)
+
+        self.assertEqual(self.project.find_asset_version(
+            "hero_character", "modeling", 2).status, Status.DEPRECATED)
+
+    def test_snapshot_ignores_status_setter(self):
+        """Test a status set directly on a project record is not seen."""
+        with api.snapshot() as snapshot:
+            self.project.find_asset_version(
+                "hero_character", "modeling", 2).status = "inactive"
+
+            self.assertEqual(
+                snapshot.find_asset_version(
+                    "hero_character", "modeling", 2).status, Status.ACTIVE)
+            self.assertEqual(snapshot.get_latest_version(
+                "hero_character", "modeling", "active").version, 2)
+
+        self.assertEqual(self.project.get_latest_version(
+            "hero_character", "modeling", "active").version, 1)
+
+    def test_records_are_copies(self):
+        """Test mutating records read from a snapshot changes nothing."""
+        snapshot = api.snapshot()
+
+        asset_version = snapshot.find_asset_version(
+            "hero_character", "modeling", 1)
+        asset_version.status = Status.INACTIVE
+
+        self.assertEqual(snapshot.find_asset_version(
+            "hero_character", "modeling", 1).status, Status.ACTIVE)
+        self.assertEqual(self.project.find_asset_version(
+            "hero_character", "modeling", 1).status, Status.ACTIVE)
+        snapshot.close()
+
+    def test_snapshot_excludes_open_transaction(self):
+        """Test changes staged by an open transaction are not seen."""
+        with self.project.transaction():
+            self._publish("hero", "modeling", 3)
+            self.project.set_version_status(
+                AssetVersion("hero_character", "modeling", 1),
+                Status.INACTIVE)
+            snapshot = self.project.snapshot()
+
+        self.assertEqual(
+            [(av.version, av.status) for av in snapshot.list_asset_versions()],
+            [(1, Status.ACTIVE), (2, Status.ACTIVE)])
+        self.assertEqual(len(self.project.asset_versions), 3)
+
+    def test_closed_snapshots_are_released(self):
+        """Test closed and collected snapshots stop receiving copies."""
+        snapshot = api.snapshot()
+        api.snapshot()
+        gc.collect()
+        self.assertEqual(len(self.project._snapshots), 1)
+
+        snapshot.close()
+
+        self.assertEqual(len(self.project._snapshots), 0)
+
+    def test_export_while_writing(self):
+        """Test a snapshot exports a consistent view while a writer thread
+        adds versions and changes statuses."""
+        for version in range(3, 2001):
+            self._publish("hero", "modeling", version)
+        snapshot = api.snapshot()
+        stop = threading.Event()
+
+        def write():
+            version = 2001
+            while not stop.is_set() and version < 4000:
+                self._publish("hero", "modeling", version)
+                self.project.set_version_status(
+                    AssetVersion("hero_character", "modeling",
+                                 version - 2000), Status.INACTIVE)
+                version += 1
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        stream = io.StringIO()
+        try:
+            result = snapshot.export(stream)
+        finally:
+            stop.set()
+            writer.join()
+
+        self.assertEqual(result.data, {"count": 2000})
+        records = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertEqual([record["version"] for record in records],
+                         list(range(1, 2001)))
+        self.assertTrue(all(record["status"] == "active"
+                            for record in records))
+
+    def test_export_manifest(self):
+        """Test exporting a snapshot in the manifest format."""
+        snapshot = api.snapshot()
+        self._publish("hero", "modeling", 3)
+        stream = io.StringIO()
+
+        result = snapshot.export_manifest(stream)
+
+        self.assertEqual(result.data, {"count": 2, "orphans": 0})
+        self.assertEqual(len(json.loads(stream.getvalue())), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
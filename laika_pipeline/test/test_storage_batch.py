@@ -0,0 +1,128 @@
+import tempfile
+import unittest
+from unittest import mock
+
+from laika_pipeline.pipeline.asset import Asset
+from laika_pipeline.pipeline.asset_version import AssetVersion
+from laika_pipeline.pipeline.project import Project
+from laika_pipeline.db.storage_json import StorageJSON
+from laika_pipeline.db.storage_sqlite import StorageSQLite
+from laika_pipeline.db.storage_cached import CachedStorage
+from laika_pipeline.db.storage_tiered import TieredStorage
+
+
+class TestStorageBatch(unittest.TestCase):
+    """Tests for the batched and streaming reads of the storage backends."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dirs = []
+        self.assets = [Asset(f"asset{i}", "prop") for i in range(4)]
+        self.versions = [
+            AssetVersion(asset.code, "modeling", version)
+            for asset in self.assets for version in [1, 2, 3]
+        ]
+
+    def tearDown(self):
+        """Clean up after each test."""
+        for temp_dir in self.temp_dirs:
+            temp_dir.cleanup()
+
+    def _directory(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.temp_dirs.append(temp_dir)
+        return temp_dir.name
+
+    def _backends(self):
+        backends = {
+            "json": StorageJSON(self._directory()),
+            "json_unindexed": StorageJSON(self._directory(), index=False),
+            "json_packed": StorageJSON(self._directory(),
+                                       version_storage="packed"),
+            "sqlite": StorageSQLite(),
+            "cached": CachedStorage(StorageJSON(self._directory())),
+            "tiered": TieredStorage(StorageSQLite(),
+                                    StorageJSON(self._directory()),
+                                    warm_up=False),
+        }
+        for backend in backends.values():
+            backend.save_assets(self.assets)
+            backend.save_asset_versions(self.versions)
+        return backends
+
+    def test_load_assets_by_code(self):
+        """Test that stored codes are returned and missing ones left out."""
+        for name, backend in self._backends().items():
+            with self.subTest(backend=name):
+                assets = backend.load_assets_by_code(
+                    ["asset1_prop", "missing_prop", "asset3_prop"])
+
+                self.assertEqual(sorted(assets),
+                                 ["asset1_prop", "asset3_prop"])
+                self.assertEqual(assets["asset3_prop"], self.assets[3])
+
+    def test_load_asset_versions_by_keys(self):
+        """Test that stored keys are returned and missing ones left out."""
+        keys = [("asset0_prop", "modeling", 2), ("asset0_prop", "modeling", 3),
+                ("asset2_prop", "modeling", 1), ("asset2_prop", "rigging", 1)]
+        for name, backend in self._backends().items():
+            with self.subTest(backend=name):
+                asset_versions = backend.load_asset_versions_by_keys(keys)
+
+                self.assertEqual(sorted(asset_versions), sorted(keys[:3]))
+                self.assertEqual(asset_versions[keys[2]], self.versions[6])
+
+    def test_iter_records(self):
+        """Test that streaming yields every record."""
+        for name, backend in self._backends().items():
+            with self.subTest(backend=name):
+                self.assertEqual(
+                    sorted(asset.code for asset in backend.iter_assets()),
+                    sorted(asset.code for asset in self.assets))
+                self.assertEqual(
+                    len(list(backend.iter_asset_versions())), 12)
+
+    def test_sqlite_streams_in_pages(self):
+        """Test that SQLite streaming crosses page boundaries."""
+        backend = StorageSQLite()
+        backend.save_asset_versions(self.versions)
+        with mock.patch.object(StorageSQLite, "PAGE_SIZE", 5):
+            self.assertEqual(list(backend.iter_asset_versions()),
+                             self.versions)
+
+    def test_project_load_streams(self):
+        """Test that Project.load reads through the streaming methods."""
+        backend = StorageJSON(self._directory())
+        backend.save_assets(self.assets)
+        backend.save_asset_versions(self.versions)
+        project = Project("Batch", backend)
+
+        with mock.patch.object(backend, "load_asset_versions") as load:
+            project.load()
+
+        load.assert_not_called()
+        self.assertEqual(len(project.asset_versions), 12)
+
+    def test_project_fetch(self):
+        """Test fetching specific records into a project in one batch."""
+        backend = StorageJSON(self._directory())
+        backend.save_assets(self.assets)
+        backend.save_asset_versions(self.versions)
+        project = Project("Batch", backend)
+
+        result = project.fetch(
+            ["asset0_prop"],
+            [("asset0_prop", "modeling", 1), ("asset0_prop", "modeling", 2),
+             ("asset0_prop", "modeling", 9)])
+
+        self.assertTrue(result.success)
+        self.assertEqual(result.data["assets"], 1)
+        self.assertEqual(result.data["asset_versions"], 2)
+        self.assertEqual(result.data["missing"],
+                         [("asset0_prop", "modeling", 9)])
+        self.assertIsNotNone(
+            project.find_asset_version("asset0_prop", "modeling", 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
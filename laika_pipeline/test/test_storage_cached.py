@@ -0,0 +1,120 @@
+import tempfile
+import unittest
+from unittest import mock
+
+from laika_pipeline import api
+from laika_pipeline.pipeline.asset import Asset
+from laika_pipeline.pipeline.asset_version import AssetVersion
+from laika_pipeline.pipeline.status import Status
+from laika_pipeline.db.storage_json import StorageJSON
+from laika_pipeline.db.storage_cached import CachedStorage
+
+
+class TestCachedStorage(unittest.TestCase):
+    """Tests for the read-through LRU cache in front of a storage."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.backend = StorageJSON(self.temp_dir.name)
+        self.storage = CachedStorage(self.backend)
+        self.assets = [Asset(f"asset{i}", "prop") for i in range(3)]
+        self.versions = [AssetVersion("asset0_prop", "modeling", v)
+                         for v in range(1, 4)]
+        self.backend.save_assets(self.assets)
+        self.backend.save_asset_versions(self.versions)
+
+    def tearDown(self):
+        """Clean up after each test."""
+        api.clear()
+        self.temp_dir.cleanup()
+
+    def test_point_loads_hit_after_first_miss(self):
+        """Test that a repeated point load is served from the cache."""
+        with mock.patch.object(self.backend, "load_asset_version",
+                               wraps=self.backend.load_asset_version) as load:
+            for _ in range(3):
+                self.assertEqual(
+                    self.storage.load_asset_version("asset0_prop",
+                                                    "modeling", 2),
+                    self.versions[1])
+
+        self.assertEqual(load.call_count, 1)
+        stats = self.storage.stats()
+        self.assertEqual((stats.hits, stats.misses), (2, 1))
+        self.assertAlmostEqual(stats.hit_rate, 2 / 3)
+
+    def test_listing_cached_and_invalidated_by_save(self):
+        """Test that listings are cached until a save writes through."""
+        self.assertEqual(len(self.storage.load_assets()), 3)
+        self.assertEqual(len(self.storage.load_assets()), 3)
+        self.assertEqual(self.storage.stats().hits, 1)
+
+        self.storage.save_asset(Asset("asset9", "prop"))
+
+        self.assertEqual(len(self.storage.load_assets()), 4)
+        self.assertTrue(self.backend.has_asset("asset9_prop"))
+
+    def test_save_updates_cached_record(self):
+        """Test that saving a cached record replaces the cached copy."""
+        self.storage.load_asset_version("asset0_prop", "modeling", 1)
+        changed = AssetVersion("asset0_prop", "modeling", 1, Status.INACTIVE)
+
+        self.storage.save_asset_versions([changed])
+
+        self.assertEqual(
+            self.storage.load_asset_version(
+                "asset0_prop", "modeling", 1).status, Status.INACTIVE)
+
+    def test_loaded_objects_are_copies(self):
+        """Test that mutating a loaded record does not change the cache."""
+        loaded = self.storage.load_asset_version("asset0_prop", "modeling", 1)
+        loaded.status = Status.INACTIVE
+
+        self.assertEqual(
+            self.storage.load_asset_version(
+                "asset0_prop", "modeling", 1).status, Status.ACTIVE)
+
+    def test_evicts_least_recently_used_by_count(self):
+        """Test that the least recently used entry is evicted first."""
+        storage = CachedStorage(self.backend, max_entries=2)
+        storage.load_asset("asset0_prop")
+        storage.load_asset("asset1_prop")
+        storage.load_asset("asset0_prop")
+        storage.load_asset("asset2_prop")
+
+        storage.load_asset("asset0_prop")
+        storage.load_asset("asset1_prop")
+
+        stats = storage.stats()
+        self.assertEqual(stats.entries, 2)
+        self.assertEqual(stats.evictions, 2)
+        self.assertEqual((stats.hits, stats.misses), (2, 4))
+
+    def test_evicts_by_bytes(self):
+        """Test that the byte bound is respected."""
+        storage = CachedStorage(self.backend, max_bytes=300)
+        for asset in self.assets:
+            storage.load_asset(asset.code)
+        storage.load_asset_versions()
+
+        stats = storage.stats()
+        self.assertLessEqual(stats.bytes, 300)
+        self.assertGreater(stats.evictions, 0)
+
+    def test_project_round_trip(self):
+        """Test a project saves and loads through the cache."""
+        api.initialize("Cached", self.storage)
+        api.load()
+        api.add_asset_version(AssetVersion("asset0_prop", "modeling", 4))
+        api.save()
+        api.clear()
+
+        api.initialize("Cached", self.storage)
+        api.load()
+        self.assertEqual(len(api.list_asset_versions("asset0", "prop")), 4)
+        self.assertEqual(len(self.backend.load_asset_versions()), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+import tempfile
+import os
+
+from laika_pipeline.pipeline.asset import Asset
+from laika_pipeline.pipeline.asset_version import AssetVersion
+from laika_pipeline.db.storage_json import StorageJSON
+from laika_pipeline.db.json_codec import JSONCodec, available_codecs
+
+
+class TestStorageJSONEncoding(unittest.TestCase):
+    """Tests for the configurable StorageJSON encodings."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.asset = Asset("hero", "character")
+        self.asset_path = os.path.join(
+            self.temp_dir.name, "assets", "hero_character.json")
+
+    def tearDown(self):
+        """Clean up after each test."""
+        self.temp_dir.cleanup()
+
+    def _raw(self):
+        with open(self.asset_path, 'rb') as fp:
+            return fp.read()
+
+    def test_default_is_readable_json(self):
+        """Test that the default encoding stays indented JSON."""
+        StorageJSON(self.temp_dir.name).save_asset(self.asset)
+
+        self.assertTrue(self._raw().startswith(b'{\n    '))
+
+    def test_compact_is_smaller(self):
+        """Test that compact JSON has no whitespace."""
+        StorageJSON(self.temp_dir.name, compact=True).save_asset(self.asset)
+
+        self.assertNotIn(b' ', self._raw())
+
+    def test_compression_round_trip(self):
+        """Test each compression round trips through save and load."""
+        for compression, magic in [("gzip", b'\x1f\x8b'), ("zlib", b'\x78')]:
+            storage = StorageJSON(
+                self.temp_dir.name, compact=True, compression=compression)
+            storage.save_asset(self.asset)
+
+            self.assertTrue(self._raw().startswith(magic))
+            self.assertEqual(storage.load_asset(self.asset.code), self.asset)
+
+    def test_load_mixed_formats(self):
+        """Test that files of every format are read back together."""
+        settings = [
+            {},
+            {"compact": True},
+            {"compression": "gzip"},
+            {"compact": True, "compression": "zlib"},
+        ]
+        for version, kwargs in enumerate(settings, start=1):
+            StorageJSON(self.temp_dir.name, **kwargs).save_asset_version(
+                AssetVersion(self.asset.code, "modeling", version))
+
+        versions = StorageJSON(self.temp_dir.name).load_asset_versions()
+
+        self.assertEqual(
+            sorted(v.version for v in versions), [1, 2, 3, 4])
+
+    def test_unknown_settings_are_rejected(self):
+        """Test unknown compressions and codecs raise ValueError."""
+        with self.assertRaises(ValueError):
+            StorageJSON(self.temp_dir.name, compression="lz4")
+        with self.assertRaises(ValueError):
+            StorageJSON(self.temp_dir.name, codec="yaml")
+
+    def test_available_codecs_round_trip(self):
+        """Test every installed codec reads what the others write."""
+        data = {"asset": "hero_character", "version": 3}
+        for writer in available_codecs():
+            for reader in available_codecs():
+                raw = JSONCodec(codec=writer, compression="gzip").encode(data)
+                self.assertEqual(JSONCodec(codec=reader).decode(raw), data)
+
+    def test_corrupt_compressed_file_raises_value_error(self):
+        """Test that a truncated compressed file raises ValueError."""
+        raw = JSONCodec(compression="gzip").encode({"a": 1})
+
+        with self.assertRaises(ValueError):
+            JSONCodec().decode(raw[:-4])
@@ -0,0 +1,141 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from laika_pipeline.pipeline.asset import Asset
+from laika_pipeline.pipeline.asset_version import AssetVersion
+from laika_pipeline.db.storage_json import StorageJSON
+from laika_pipeline.db.storage_index import StorageIndex
+
+
+class TestStorageJSONIndex(unittest.TestCase):
+    """Tests for the project wide index file of StorageJSON."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = self.temp_dir.name
+        self.assets = [Asset(f"asset{i}", "prop") for i in range(5)]
+        self.versions = [
+            AssetVersion(asset.code, department, version)
+            for asset in self.assets
+            for department in ["modeling", "rigging"]
+            for version in [1, 2]
+        ]
+
+    def tearDown(self):
+        """Clean up after each test."""
+        self.temp_dir.cleanup()
+
+    def _save(self, storage):
+        storage.save_assets(self.assets)
+        storage.save_asset_versions(self.versions)
+
+    def _index_lines(self):
+        with open(os.path.join(self.root, StorageIndex.FILE_NAME)) as fp:
+            return [json.loads(line) for line in fp]
+
+    def test_save_writes_index_entries(self):
+        """Test that a batched save appends one entry per record."""
+        self._save(StorageJSON(self.root))
+
+        lines = self._index_lines()
+        self.assertEqual(len(lines), 25)
+        entry = lines[0]
+        self.assertEqual(entry["path"], "assets/asset0_prop.json")
+        self.assertEqual(len(entry["hash"]), 40)
+
+    def test_load_and_existence_checks_do_not_walk(self):
+        """Test that loads and existence checks read the index only."""
+        self._save(StorageJSON(self.root))
+        storage = StorageJSON(self.root)
+
+        with mock.patch("os.scandir") as scandir, \
+                mock.patch("os.walk") as walk, \
+                mock.patch("os.listdir") as listdir:
+            self.assertEqual(len(storage.load_assets()), 5)
+            self.assertEqual(len(storage.load_asset_versions()), 20)
+            self.assertTrue(storage.has_asset("asset3_prop"))
+            self.assertFalse(storage.has_asset("missing_prop"))
+            self.assertTrue(
+                storage.has_asset_version("asset3_prop", "rigging", 2))
+            self.assertFalse(
+                storage.has_asset_version("asset3_prop", "rigging", 3))
+            self.assertEqual(len(storage.list_asset_version_keys()), 20)
+
+        scandir.assert_not_called()
+        walk.assert_not_called()
+        listdir.assert_not_called()
+
+    def test_index_built_for_existing_storage(self):
+        """Test that a storage written without index is indexed on use."""
+        self._save(StorageJSON(self.root, index=False))
+        self.assertFalse(
+            os.path.exists(os.path.join(self.root, StorageIndex.FILE_NAME)))
+
+        storage = StorageJSON(self.root)
+
+        self.assertEqual(sorted(storage.list_asset_codes()),
+                         sorted(asset.code for asset in self.assets))
+        self.assertEqual(len(self._index_lines()), 25)
+
+    def test_other_writers_are_picked_up(self):
+        """Test that entries appended by another instance become visible."""
+        reader = StorageJSON(self.root)
+        self.assertEqual(reader.load_assets(), [])
+
+        self._save(StorageJSON(self.root))
+
+        self.assertEqual(len(reader.load_assets()), 5)
+        self.assertTrue(reader.has_asset_version("asset0_prop", "modeling", 1))
+
+    def test_missing_file_of_indexed_record_is_skipped(self):
+        """Test that an entry of a writer killed before writing is ignored."""
+        storage = StorageJSON(self.root)
+        self._save(storage)
+        os.remove(storage._asset_file("asset0_prop"))
+
+        self.assertEqual(len(StorageJSON(self.root).load_assets()), 4)
+
+    def test_packed_entries_point_at_lines(self):
+        """Test that packed versions are indexed with their line offset."""
+        storage = StorageJSON(self.root, version_storage="packed")
+        self._save(storage)
+        storage.save_asset_version(AssetVersion("asset0_prop", "modeling", 3))
+
+        path, _, offset = storage.index.versions[
+            ("asset0_prop", "modeling", 3)]
+        with open(storage.index.full_path(path), 'rb') as fp:
+            fp.seek(offset)
+            self.assertEqual(json.loads(fp.readline())["version"], 3)
+        self.assertEqual(len(StorageJSON(self.root).load_asset_versions()), 21)
+
+    def test_migrate_layout_keeps_index_valid(self):
+        """Test that migrating the layout points the index at the new files."""
+        storage = StorageJSON(self.root)
+        self._save(storage)
+
+        storage.migrate_layout("hashed")
+
+        path, _ = storage.index.assets["asset1_prop"]
+        self.assertEqual(storage.index.full_path(path),
+                         storage._asset_file("asset1_prop"))
+        self.assertEqual(len(StorageJSON(self.root).load_asset_versions()), 20)
+
+    def test_compact_index(self):
+        """Test that compaction drops superseded entries."""
+        storage = StorageJSON(self.root)
+        self._save(storage)
+        storage.save_assets(self.assets)
+        self.assertEqual(len(self._index_lines()), 30)
+
+        storage.compact_index()
+
+        self.assertEqual(len(self._index_lines()), 25)
+        self.assertEqual(len(StorageJSON(self.root).load_assets()), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import unittest
+import tempfile
+import os
+from unittest import mock
+
+from laika_pipeline.pipeline.asset import Asset
+from laika_pipeline.pipeline.asset_version import AssetVersion
+from laika_pipeline.pipeline.status import Status
+from laika_pipeline.db.storage_json import StorageJSON, Layout
+
+
+class TestStorageJSONLayout(unittest.TestCase):
+    """Tests for the flat and hashed StorageJSON directory layouts."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = self.temp_dir.name
+        self.assets = [Asset(f"asset{i}", "prop") for i in range(20)]
+        self.versions = [
+            AssetVersion(asset.code, "modeling", version)
+            for asset in self.assets for version in (1, 2)
+        ]
+
+    def tearDown(self):
+        """Clean up after each test."""
+        self.temp_dir.cleanup()
+
+    def _save(self, storage):
+        storage.save_assets(self.assets)
+        storage.save_asset_versions(self.versions)
+
+    def _check_loads_everything(self, storage):
+        self.assertEqual(len(storage.load_assets()), 20)
+        self.assertEqual(len(storage.load_asset_versions()), 40)
+        self.assertEqual(storage.load_asset("asset3_prop"), self.assets[3])
+        self.assertEqual(
+            storage.load_asset_version("asset3_prop", "modeling", 2),
+            self.versions[7])
+
+    def test_hashed_layout_fans_out(self):
+        """Test that the hashed layout uses two prefix directories."""
+        storage = StorageJSON(self.root, layout="hashed")
+        self._save(storage)
+
+        self.assertEqual(
+            [f for f in os.listdir(storage.asset_path)
+             if f.endswith('.json')], [])
+        path = storage._asset_file("asset3_prop")
+        self.assertEqual(
+            len(os.path.relpath(path, storage.asset_path).split(os.sep)), 3)
+        self._check_loads_everything(storage)
+
+    def test_hashed_storage_reads_flat_files(self):
+        """Test backward compatible reading of the flat layout."""
+        self._save(StorageJSON(self.root))
+
+        self._check_loads_everything(StorageJSON(self.root, layout="hashed"))
+
+    def test_migrate_layout_round_trip(self):
+        """Test migrating flat to hashed and back moves every file."""
+        storage = StorageJSON(self.root)
+        self._save(storage)
+
+        self.assertEqual(storage.migrate_layout("hashed"), 60)
+        self.assertIs(storage.layout, Layout.HASHED)
+        self._check_loads_everything(StorageJSON(self.root, layout="hashed"))
+
+        self.assertEqual(storage.migrate_layout(Layout.FLAT), 60)
+        self.assertEqual(len(os.listdir(storage.asset_path)), 20)
+        self._check_loads_everything(StorageJSON(self.root))
+
+    def test_migrate_layout_is_resumable(self):
+        """Test rerunning a migration only moves the remaining files."""
+        storage = StorageJSON(self.root)
+        self._save(storage)
+        storage.migrate_layout("hashed")
+
+        self.assertEqual(storage.migrate_layout("hashed"), 0)
+
+    def test_configured_layout_wins_on_duplicates(self):
+        """Test the configured layout's copy wins if both exist."""
+        StorageJSON(self.root).save_asset_version(self.versions[0])
+        newer = AssetVersion(self.assets[0].code, "modeling", 1, "inactive")
+        StorageJSON(self.root, layout="hashed").save_asset_version(newer)
+
+        versions = StorageJSON(
+            self.root, layout="hashed").load_asset_versions()
+
+        self.assertEqual(len(versions), 1)
+        self.assertEqual(versions[0].status, Status.INACTIVE)
+
+    def test_unindexed_reads_stream(self):
+        """Test reading without index streams the records and the configured
+        layout still wins on duplicates."""
+        StorageJSON(self.root, index=False).save_asset(self.assets[0])
+        StorageJSON(self.root, index=False).save_asset_version(
+            self.versions[0])
+        storage = StorageJSON(self.root, layout="hashed", index=False)
+        self._save(storage)
+        newer = AssetVersion(self.assets[0].code, "modeling", 1, "inactive")
+        storage.save_asset_version(newer)
+
+        with mock.patch.object(storage, "read_asset_version_file",
+                               wraps=storage.read_asset_version_file) as read:
+            next(storage.iter_asset_versions())
+            self.assertEqual(read.call_count, 1)
+        versions = storage.load_asset_versions()
+        assets = storage.load_assets()
+
+        self.assertEqual(len(versions), 40)
+        self.assertEqual(len(assets), 20)
+        self.assertEqual(
+            [av.status for av in versions
+             if (av.asset, av.version) == (self.assets[0].code, 1)],
+            [Status.INACTIVE])
@@ -0,0 +1,124 @@
+import unittest
+import tempfile
+import os
+
+from laika_pipeline import api
+from laika_pipeline.pipeline.asset import Asset
+from laika_pipeline.pipeline.asset_version import AssetVersion
+from laika_pipeline.pipeline.status import Status
+from laika_pipeline.db.storage_json import StorageJSON
+
+
+class TestStorageJSONPacked(unittest.TestCase):
+    """Tests for packed per asset and department version files."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.storage = StorageJSON(
+            self.temp_dir.name, version_storage="packed")
+        self.asset = Asset("hero", "character")
+        self.versions = [
+            AssetVersion(self.asset.code, "modeling", version)
+            for version in (1, 2, 3)
+        ]
+        self.path = os.path.join(
+            self.storage.asset_version_path, "modeling",
+            "hero_character.jsonl")
+
+    def tearDown(self):
+        """Clean up after each test."""
+        api.clear()
+        self.temp_dir.cleanup()
+
+    def _lines(self):
+        with open(self.path, 'rb') as fp:
+            return fp.read().splitlines()
+
+    def test_one_file_per_asset_and_department(self):
+        """Test that all versions of a department share one file."""
+        self.storage.save_asset_versions(self.versions)
+        self.storage.save_asset_version(
+            AssetVersion(self.asset.code, "rigging", 1))
+
+        files = sorted(
+            name for _, _, names in os.walk(self.storage.asset_version_path)
+            for name in names)
+        self.assertEqual(files, ["hero_character.jsonl"] * 2)
+        self.assertEqual(len(self._lines()), 3)
+
+    def test_append_does_not_rewrite_history(self):
+        """Test that new versions are appended to the existing file."""
+        self.storage.save_asset_versions(self.versions[:2])
+        before = self._lines()
+
+        self.storage.save_asset_version(self.versions[2])
+        self.storage.save_asset_versions(self.versions)
+
+        self.assertEqual(self._lines()[:2], before)
+        self.assertEqual(len(self._lines()), 3)
+
+    def test_load_history_and_point_loads(self):
+        """Test loading a whole history and single versions."""
+        self.storage.save_asset_versions(self.versions)
+
+        history = self.storage.load_asset_history(self.asset.code, "modeling")
+
+        self.assertEqual([v.version for v in history], [1, 2, 3])
+        self.assertEqual(
+            self.storage.load_asset_version(self.asset.code, "modeling", 2),
+            self.versions[1])
+        self.assertEqual(len(self.storage.load_asset_versions()), 3)
+
+    def test_status_change_supersedes_previous_line(self):
+        """Test a changed version compacts the file, a single save appends."""
+        self.storage.save_asset_versions(self.versions)
+        self.versions[0].status = Status.INACTIVE
+
+        self.storage.save_asset_versions(self.versions)
+        self.assertEqual(len(self._lines()), 3)
+
+        self.versions[1].status = Status.INACTIVE
+        self.storage.save_asset_version(self.versions[1])
+        self.assertEqual(len(self._lines()), 4)
+
+        statuses = [v.status for v in self.storage.load_asset_versions()]
+        self.assertEqual(statuses.count(Status.INACTIVE), 2)
+
+    def test_torn_last_line_is_ignored(self):
+        """Test that a killed append does not break loading."""
+        self.storage.save_asset_versions(self.versions[:2])
+        with open(self.path, 'ab') as fp:
+            fp.write(b'{"asset": "hero_char')
+
+        self.assertEqual(len(self.storage.load_asset_versions()), 2)
+        self.storage.save_asset_version(self.versions[2])
+        self.assertEqual(len(self.storage.load_asset_versions()), 3)
+
+    def test_reads_per_version_files(self):
+        """Test packed storage still reads per version files."""
+        StorageJSON(self.temp_dir.name).save_asset_versions(self.versions)
+
+        self.assertEqual(len(self.storage.load_asset_versions()), 3)
+        history = self.storage.load_asset_history(self.asset.code, "modeling")
+        self.assertEqual(len(history), 3)
+
+    def test_project_round_trip(self):
+        """Test a project saves and loads through packed storage."""
+        api.initialize("Packed", self.storage)
+        for version in self.versions:
+            api.add_asset_version(version)
+        api.add_asset(self.asset)
+        api.save()
+        api.clear()
+        api.initialize("Packed", StorageJSON(self.temp_dir.name))
+        api.load()
+
+        self.assertEqual(
+            len(api.list_asset_versions("hero", "character")), 3)
+
+    def test_compression_is_rejected(self):
+        """Test that compression cannot be combined with packed files."""
+        with self.assertRaises(ValueError):
+            StorageJSON(self.temp_dir.name, version_storage="packed",
+                        compression="gzip")
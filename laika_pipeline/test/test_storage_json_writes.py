@@ -0,0 +1,108 @@
+import unittest
+import tempfile
+import os
+import time
+from unittest import mock
+
+from laika_pipeline.pipeline.asset import Asset
+from laika_pipeline.pipeline.asset_version import AssetVersion
+from laika_pipeline.db.storage_json import StorageJSON, FsyncPolicy
+
+
+class TestStorageJSONWrites(unittest.TestCase):
+    """Tests for atomic, crash-safe writes in StorageJSON."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.asset = Asset("hero", "character")
+        self.versions = [
+            AssetVersion(self.asset.code, department, 1)
+            for department in ["modeling", "rigging"]
+        ]
+
+    def tearDown(self):
+        """Clean up after each test."""
+        self.temp_dir.cleanup()
+
+    def _all_files(self):
+        return [name for _, _, files in os.walk(self.temp_dir.name)
+                for name in files]
+
+    def test_save_leaves_no_temp_files(self):
+        """Test that saving leaves only the target files."""
+        storage = StorageJSON(self.temp_dir.name)
+        storage.save_assets([self.asset])
+        storage.save_asset_versions(self.versions)
+
+        self.assertEqual(sorted(self._all_files()), [
+            "hero_character.1.json",
+            "hero_character.1.json",
+            "hero_character.json",
+            "index.jsonl",
+            "storage.lock",
+        ])
+
+    def test_failed_write_keeps_previous_file(self):
+        """Test that a write killed midway keeps the old content intact."""
+        storage = StorageJSON(self.temp_dir.name)
+        storage.save_asset(self.asset)
+
+        with mock.patch("laika_pipeline.lib.atomic_write.os.replace",
+                        side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                storage.save_asset(self.asset)
+
+        self.assertEqual(storage.load_asset(self.asset.code), self.asset)
+        self.assertEqual(sorted(self._all_files()),
+                         ["hero_character.json", "index.jsonl",
+                          "storage.lock"])
+
+    def test_fsync_policy_none(self):
+        """Test that the default policy never fsyncs."""
+        storage = StorageJSON(self.temp_dir.name)
+        with mock.patch("os.fsync") as fsync:
+            storage.save_asset_versions(self.versions)
+
+        fsync.assert_not_called()
+
+    def test_fsync_policy_file(self):
+        """Test that the file policy fsyncs every file, directory and the
+        index once per batch."""
+        storage = StorageJSON(self.temp_dir.name, fsync="file")
+        with mock.patch("os.fsync") as fsync:
+            storage.save_asset_versions(self.versions)
+
+        self.assertEqual(fsync.call_count, 5)
+
+    def test_fsync_policy_batch_groups_per_directory(self):
+        """Test that the batch policy fsyncs each directory and the index
+        once."""
+        storage = StorageJSON(self.temp_dir.name, fsync=FsyncPolicy.BATCH)
+        versions = [AssetVersion(self.asset.code, "modeling", v)
+                    for v in range(1, 11)]
+        with mock.patch("os.fsync") as fsync:
+            storage.save_asset_versions(versions)
+
+        self.assertEqual(fsync.call_count, 2)
+
+    def test_invalid_fsync_policy(self):
+        """Test that an unknown policy is rejected."""
+        with self.assertRaises(ValueError):
+            StorageJSON(self.temp_dir.name, fsync="sometimes")
+
+    def test_remove_stale_temp_files(self):
+        """Test that old temporary files of killed writers are removed."""
+        storage = StorageJSON(self.temp_dir.name)
+        stale = os.path.join(storage.asset_path, ".hero.json.1.2.tmp")
+        fresh = os.path.join(storage.asset_path, ".hero.json.3.4.tmp")
+        for path in (stale, fresh):
+            open(path, 'w').close()
+        old = time.time() - 7200
+        os.utime(stale, (old, old))
+
+        removed = storage.remove_stale_temp_files()
+
+        self.assertEqual(removed, 1)
+        self.assertFalse(os.path.exists(stale))
+        self.assertTrue(os.path.exists(fresh))
@@ -0,0 +1,77 @@
+import os
+import tempfile
+import unittest
+
+from laika_pipeline import api
+from laika_pipeline.pipeline.asset import Asset
+from laika_pipeline.pipeline.asset_version import AssetVersion
+from laika_pipeline.pipeline.status import Status
+from laika_pipeline.db.storage_sqlite import StorageSQLite
+
+
+class TestStorageSQLite(unittest.TestCase):
+    """Tests for the SQLite storage backend."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "project.db")
+        self.asset = Asset("hero", "character")
+        self.versions = [AssetVersion(self.asset.code, "modeling", v)
+                         for v in range(1, 4)]
+
+    def tearDown(self):
+        """Clean up after each test."""
+        api.clear()
+        self.temp_dir.cleanup()
+
+    def test_round_trip_across_connections(self):
+        """Test records persist in the database file."""
+        storage = StorageSQLite(self.path)
+        storage.save_assets([self.asset])
+        storage.save_asset_versions(self.versions)
+        storage.close()
+
+        storage = StorageSQLite(self.path)
+        self.assertEqual(storage.load_asset(self.asset.code), self.asset)
+        self.assertEqual(storage.load_asset_versions(), self.versions)
+        storage.close()
+
+    def test_update_keeps_order(self):
+        """Test that saving an existing record updates it in place."""
+        storage = StorageSQLite()
+        storage.save_asset_versions(self.versions)
+        changed = AssetVersion(self.asset.code, "modeling", 1,
+                               Status.INACTIVE)
+
+        storage.save_asset_version(changed)
+
+        loaded = storage.load_asset_versions()
+        self.assertEqual([v.version for v in loaded], [1, 2, 3])
+        self.assertEqual(loaded[0].status, Status.INACTIVE)
+
+    def test_missing_records_raise(self):
+        """Test that missing records raise FileNotFoundError."""
+        storage = StorageSQLite()
+        with self.assertRaises(FileNotFoundError):
+            storage.load_asset("missing_prop")
+        with self.assertRaises(FileNotFoundError):
+            storage.load_asset_version("missing_prop", "modeling", 1)
+
+    def test_project_round_trip(self):
+        """Test a project saves and loads through SQLite."""
+        storage = StorageSQLite(self.path)
+        api.initialize("SQLite", storage)
+        for version in self.versions:
+            api.add_asset_version(version)
+        api.add_asset(self.asset)
+        api.save()
+        api.clear()
+
+        api.initialize("SQLite", storage)
+        api.load()
+        self.assertEqual(len(api.list_asset_versions("hero", "character")), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
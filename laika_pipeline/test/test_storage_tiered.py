@@ -0,0 +1,123 @@
+import tempfile
+import unittest
+from unittest import mock
+
+from laika_pipeline import api
+from laika_pipeline.pipeline.asset import Asset
+from laika_pipeline.pipeline.asset_version import AssetVersion
+from laika_pipeline.pipeline.status import Status
+from laika_pipeline.db.storage_json import StorageJSON
+from laika_pipeline.db.storage_sqlite import StorageSQLite
+from laika_pipeline.db.storage_tiered import TieredStorage
+
+
+class TestTieredStorage(unittest.TestCase):
+    """Tests for the local + shared tiered storage."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.shared = StorageJSON(self.temp_dir.name)
+        self.local = StorageSQLite()
+        self.asset = Asset("hero", "character")
+        self.versions = [AssetVersion(self.asset.code, "modeling", v)
+                         for v in range(1, 4)]
+        self.shared.save_assets([self.asset])
+        self.shared.save_asset_versions(self.versions)
+
+    def tearDown(self):
+        """Clean up after each test."""
+        api.clear()
+        self.local.close()
+        self.temp_dir.cleanup()
+
+    def _tiered(self, **kwargs):
+        kwargs.setdefault("warm_up", False)
+        return TieredStorage(self.local, self.shared, **kwargs)
+
+    def test_miss_falls_back_to_shared_and_fills_local(self):
+        """Test that a local miss is read from the shared tier once."""
+        storage = self._tiered()
+
+        self.assertEqual(storage.load_asset(self.asset.code), self.asset)
+        self.assertEqual(
+            storage.load_asset_version(self.asset.code, "modeling", 2),
+            self.versions[1])
+
+        self.assertEqual(self.local.load_asset(self.asset.code), self.asset)
+        with mock.patch.object(self.shared, "load_asset") as load:
+            storage.load_asset(self.asset.code)
+        load.assert_not_called()
+
+    def test_warm_up_serves_listings_locally(self):
+        """Test that listings come from the local tier once warm."""
+        storage = self._tiered(warm_up=True)
+        self.assertTrue(storage.wait_warm_up(timeout=5))
+
+        with mock.patch.object(self.shared, "load_asset_versions") as load:
+            self.assertEqual(len(storage.load_asset_versions()), 3)
+            self.assertEqual(storage.load_assets(), [self.asset])
+        load.assert_not_called()
+
+    def test_write_through(self):
+        """Test that saves reach both tiers immediately."""
+        storage = self._tiered()
+        new = AssetVersion(self.asset.code, "modeling", 4)
+
+        storage.save_asset_version(new)
+
+        self.assertEqual(
+            self.shared.load_asset_version(self.asset.code, "modeling", 4),
+            new)
+        self.assertEqual(
+            self.local.load_asset_version(self.asset.code, "modeling", 4),
+            new)
+
+    def test_write_back(self):
+        """Test that saves are deferred to the shared tier until flushed."""
+        storage = self._tiered(write_policy="back", flush_interval=60)
+        new = AssetVersion(self.asset.code, "modeling", 4)
+
+        storage.save_asset_versions([new])
+
+        self.assertEqual(storage.pending_count, 1)
+        self.assertFalse(
+            self.shared.has_asset_version(self.asset.code, "modeling", 4))
+        self.assertEqual(len(storage.load_asset_versions()), 4)
+
+        storage.close()
+
+        self.assertEqual(storage.pending_count, 0)
+        self.assertTrue(
+            self.shared.has_asset_version(self.asset.code, "modeling", 4))
+
+    def test_warm_up_keeps_newer_local_records(self):
+        """Test that warming up does not overwrite pending local saves."""
+        storage = self._tiered(write_policy="back", flush_interval=60)
+        changed = AssetVersion(self.asset.code, "modeling", 1,
+                               Status.INACTIVE)
+        storage.save_asset_versions([changed])
+
+        storage.warm_up()
+
+        self.assertTrue(storage.is_warm)
+        self.assertEqual(
+            storage.load_asset_version(self.asset.code, "modeling", 1).status,
+            Status.INACTIVE)
+        storage.close()
+
+    def test_project_round_trip(self):
+        """Test a project loads and saves through both tiers."""
+        storage = self._tiered(warm_up=True)
+        api.initialize("Tiered", storage)
+        api.load()
+        api.add_asset_version(AssetVersion(self.asset.code, "modeling", 4))
+        api.save()
+
+        self.assertEqual(len(self.shared.load_asset_versions()), 4)
+        storage.wait_warm_up(timeout=5)
+        self.assertEqual(len(self.local.load_asset_versions()), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
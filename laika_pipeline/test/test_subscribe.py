@@ -0,0 +1,150 @@
+import unittest
+import tempfile
+import os
+import threading
+import time
+from unittest import mock
+
+from laika_pipeline import api
+from laika_pipeline.pipeline.asset import Asset
+from laika_pipeline.pipeline.asset_version import AssetVersion
+from laika_pipeline.pipeline.events import ChangeType, iter_socket_events
+from laika_pipeline.db.storage_json import StorageJSON
+
+
+class TestSubscribe(unittest.TestCase):
+    """Tests for the subscribe() and serve_events() functions."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        api.initialize("Events", StorageJSON(self.temp_dir.name))
+        self.asset = Asset("hero", "character")
+
+    def tearDown(self):
+        """Clean up after each test."""
+        api.clear()
+        self.temp_dir.cleanup()
+
+    def test_subscribe_receives_mutations_in_order(self):
+        """Test that every mutation is delivered as an event in order."""
+        subscription = api.subscribe()
+        api.add_asset_version(AssetVersion(self.asset.code, "modeling", 1))
+        api.add_asset(self.asset)
+        version = api.get_asset_version("hero", "character", 1)
+        api.get_project().set_version_status(version, "inactive")
+        api.save()
+        api.load()
+
+        events = subscription.drain()
+
+        self.assertEqual([e.change_type for e in events], [
+            ChangeType.VERSION_ADDED,
+            ChangeType.ASSET_ADDED,
+            ChangeType.STATUS_CHANGED,
+            ChangeType.SAVED,
+            ChangeType.LOADED,
+        ])
+        self.assertEqual([e.sequence for e in events], [1, 2, 3, 4, 5])
+        self.assertEqual(events[2].data["old_status"], "active")
+        self.assertEqual(events[4].data["asset_versions"], 1)
+
+    def test_subscribe_filters_change_types(self):
+        """Test that subscribers only get the requested change types."""
+        subscription = api.subscribe(
+            change_types=[ChangeType.ASSET_ADDED])
+        api.add_asset_version(AssetVersion(self.asset.code, "modeling", 1))
+        api.add_asset(self.asset)
+
+        events = subscription.drain()
+
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0].data["code"], self.asset.code)
+
+    def test_subscribe_failed_adds_are_not_published(self):
+        """Test that rejected records produce no events."""
+        subscription = api.subscribe()
+        api.add_asset(self.asset)
+        api.add_asset_version(AssetVersion(self.asset.code, "modeling", 3))
+
+        self.assertEqual(subscription.drain(), [])
+
+    def test_subscribe_bounded_queue_drops_oldest(self):
+        """Test that a full queue drops the oldest events."""
+        subscription = api.subscribe(maxsize=2)
+        for version in [1, 2, 3]:
+            api.add_asset_version(
+                AssetVersion(self.asset.code, "modeling", version))
+
+        events = subscription.drain()
+
+        self.assertEqual(subscription.dropped, 1)
+        self.assertEqual([e.data["version"] for e in events], [2, 3])
+
+    def test_subscribe_close_stops_delivery(self):
+        """Test that a closed subscription no longer receives events."""
+        subscription = api.subscribe()
+        subscription.close()
+        api.add_asset_version(AssetVersion(self.asset.code, "modeling", 1))
+
+        self.assertEqual(subscription.drain(), [])
+
+    def test_serve_events_keeps_other_files(self):
+        """Test that a file other than a socket at the path is not removed."""
+        address = os.path.join(self.temp_dir.name, "events.sock")
+        with open(address, "w") as fp:
+            fp.write("not a socket")
+
+        with self.assertRaises(FileExistsError):
+            api.serve_events(address)
+
+        with open(address) as fp:
+            self.assertEqual(fp.read(), "not a socket")
+
+    def test_no_payload_without_subscribers(self):
+        """Test that no event payload is built when nobody is subscribed."""
+        events = api.get_project().events
+        self.assertFalse(events.has_subscribers)
+        with mock.patch.object(AssetVersion, "to_dict") as to_dict:
+            api.add_asset_version(
+                AssetVersion(self.asset.code, "modeling", 1))
+            api.add_asset(self.asset)
+            result = api.set_version_status(
+                "hero", "character", "modeling", 1, "inactive")
+
+        self.assertTrue(result['success'])
+        to_dict.assert_not_called()
+        subscription = api.subscribe()
+        self.assertTrue(events.has_subscribers)
+        subscription.close()
+        self.assertFalse(events.has_subscribers)
+
+    def test_serve_events_over_unix_socket(self):
+        """Test that events are fanned out to socket clients."""
+        address = os.path.join(self.temp_dir.name, "events.sock")
+        server = api.serve_events(address)
+        received = []
+
+        def listen():
+            for event in iter_socket_events(address, timeout=2):
+                received.append(event)
+                if len(received) == 2:
+                    return
+
+        try:
+            thread = threading.Thread(target=listen)
+            thread.start()
+            # Wait until the server accepted the client before publishing
+            for _ in range(100):
+                if server.client_count:
+                    break
+                time.sleep(0.02)
+            api.add_asset_version(
+                AssetVersion(self.asset.code, "modeling", 1))
+            api.add_asset(self.asset)
+            thread.join(3)
+        finally:
+            server.stop()
+
+        self.assertEqual([e.change_type for e in received], [
+            ChangeType.VERSION_ADDED, ChangeType.ASSET_ADDED])
@@ -0,0 +1,169 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from laika_pipeline.pipeline.asset import Asset
+from laika_pipeline.pipeline.asset_version import AssetVersion
+from laika_pipeline.pipeline.events import ChangeType
+from laika_pipeline.pipeline.project import Project
+from laika_pipeline.pipeline.status import Status
+from laika_pipeline.db.storage_backend import VersionConflictError
+from laika_pipeline.db.storage_json import StorageJSON
+
+
+class TestTransaction(unittest.TestCase):
+    """Tests for Project.transaction()."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.storage = StorageJSON(self.temp_dir.name)
+        self.project = Project("Test Project", self.storage)
+        self._publish("hero", "modeling", 1)
+        self.project.save()
+        self.subscription = self.project.events.subscribe()
+
+    def tearDown(self):
+        """Clean up after each test."""
+        self.subscription.close()
+        self.temp_dir.cleanup()
+
+    def _publish(self, name, department, version, status="active"):
+        asset = Asset(name, "character")
+        result = self.project.add_asset_version(
+            AssetVersion(asset.code, department, version, status))
+        if self.project.get_asset_by_code(asset.code) is None:
+            self.project.add_asset(asset)
+        return result
+
+    def _events(self):
+        events = []
+        while True:
+            event = self.subscription.get(timeout=0)
+            if event is None:
+                return events
+            events.append(event.change_type)
+
+    def test_commit(self):
+        """Test committed changes are kept, saved and published together."""
+        with self.project.transaction() as transaction:
+            self._publish("hero", "modeling", 2)
+            self._publish("villain", "rigging", 1)
+            # Validation sees the staged versions
+            self._publish("hero", "modeling", 3, "inactive")
+            self.assertEqual(self._events(), [])
+
+        self.assertTrue(transaction.result.success)
+        self.assertEqual(transaction.result.data, {
+            "assets": 1, "asset_versions": 3, "status_changes": 0})
+        self.assertEqual(self._events(), [
+            ChangeType.VERSION_ADDED, ChangeType.VERSION_ADDED,
+            ChangeType.ASSET_ADDED, ChangeType.VERSION_ADDED])
+        self.assertEqual(
+            self.storage.load_asset_version(
+                "hero_character", "modeling", 3).status, Status.INACTIVE)
+        self.assertTrue(self.storage.has_asset("villain_character"))
+
+    def test_failed_operation_rolls_back(self):
+        """Test a failed add undoes every change of the transaction."""
+        with self.project.transaction() as transaction:
+            self._publish("villain", "rigging", 1)
+            self._publish("hero", "modeling", 2, "inactive")
+            self.project.set_version_status(
+                AssetVersion("hero_character", "modeling", 1),
+                Status.DEPRECATED)
+            result = self._publish("hero", "modeling", 4)
+
+        self.assertFalse(result.success)
+        self.assertFalse(transaction.result.success)
+        self.assertIn("Expected version 3", transaction.result.error_message)
+        self.assertEqual(len(self.project.assets), 1)
+        self.assertEqual(len(self.project.asset_versions), 1)
+        self.assertIsNone(self.project.get_asset("villain", "character"))
+        self.assertIsNone(self.project.find_asset_version(
+            "hero_character", "modeling", 2))
+        self.assertEqual(
+            self.project.get_latest_version(
+                "hero_character", "modeling", Status.ACTIVE).version, 1)
+        self.assertIsNone(self.project.get_latest_version(
+            "hero_character", "modeling", Status.INACTIVE))
+        self.assertEqual(self._events(), [])
+        self.assertFalse(self.storage.has_asset("villain_character"))
+        # The project keeps working after the rollback
+        self.assertTrue(self._publish("hero", "modeling", 2).success)
+
+    def test_exception_rolls_back(self):
+        """Test an exception inside the block undoes the changes."""
+        with self.assertRaises(ValueError):
+            with self.project.transaction():
+                self._publish("hero", "modeling", 2)
+                raise ValueError("publish aborted")
+
+        self.assertEqual(len(self.project.asset_versions), 1)
+        self.assertEqual(self.project.get_latest_version(
+            "hero_character", "modeling").version, 1)
+
+    def test_storage_failure_rolls_back(self):
+        """Test a failing storage write undoes the changes."""
+        with mock.patch.object(self.storage, "publish_asset_versions",
+                               side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                with self.project.transaction() as transaction:
+                    self._publish("hero", "modeling", 2)
+
+        self.assertIn("disk full", transaction.result.error_message)
+        self.assertEqual(len(self.project.asset_versions), 1)
+
+    def test_conflict_writes_nothing(self):
+        """Test a conflicting publish leaves no staged asset in storage."""
+        other = Project("Test Project", StorageJSON(self.temp_dir.name))
+        other.add_asset_version(AssetVersion(
+            "villain_character", "rigging", 1, "inactive"))
+        other.save()
+
+        with self.assertRaises(VersionConflictError):
+            with self.project.transaction() as transaction:
+                self._publish("villain", "rigging", 1)
+
+        self.assertFalse(transaction.result.success)
+        self.assertIsNone(
+            self.project.get_asset_by_code("villain_character"))
+        self.assertFalse(self.storage.has_asset("villain_character"))
+        self.assertFalse(os.path.exists(
+            self.storage._asset_file("villain_character")))
+
+    def test_operations_not_allowed_inside(self):
+        """Test loading, fetching, saving and nesting are refused while
+        open."""
+        with self.project.transaction() as transaction:
+            for operation in (self.project.save, self.project.load,
+                              self.project.refresh, self.project.fetch,
+                              self.project.transaction):
+                with self.assertRaises(RuntimeError):
+                    operation()
+            transaction.rollback()
+
+        self.assertFalse(transaction.result.success)
+        with self.assertRaises(RuntimeError):
+            transaction.commit()
+
+    def test_commit_writes_only_staged_records(self):
+        """Test the commit writes one batch of the staged records."""
+        with mock.patch.object(self.storage, "publish_asset_versions",
+                               wraps=self.storage.publish_asset_versions) \
+                as publish_asset_versions, \
+                mock.patch.object(self.storage, "save_assets") as save_assets:
+            with self.project.transaction():
+                self._publish("hero", "modeling", 2)
+                self._publish("hero", "modeling", 3)
+
+        save_assets.assert_not_called()
+        publish_asset_versions.assert_called_once()
+        self.assertEqual(
+            [av.version for av in publish_asset_versions.call_args[0][0]],
+            [2, 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
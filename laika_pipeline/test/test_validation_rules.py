@@ -0,0 +1,134 @@
+import unittest
+
+from laika_pipeline.pipeline.asset import Asset
+from laika_pipeline.pipeline.asset_version import AssetVersion
+from laika_pipeline.pipeline.project import Project
+from laika_pipeline.validation.operation_result import OperationResult
+from laika_pipeline.validation.rules import (
+    DEFAULT_RULES, Rule, RuleEngine, RuleRegistry)
+
+
+def _require_lowercase(asset, project):
+    if asset.name != asset.name.lower():
+        return OperationResult(
+            success=False,
+            error_message=f"Asset name '{asset.name}' must be lowercase")
+    return OperationResult(success=True)
+
+
+class TestValidationRules(unittest.TestCase):
+    """Tests for the validation rule engine."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.project = Project("Test Project")
+
+    def _add(self, name="hero"):
+        asset = Asset(name, "character")
+        self.project.add_asset_version(
+            AssetVersion(asset.code, "modeling", 1, "active"))
+        return self.project.add_asset(asset)
+
+    def test_default_rules_run_in_order(self):
+        """Test that the built-in rules keep the historical order."""
+        names = [rule.name for rule in DEFAULT_RULES.rules('asset_version')]
+
+        self.assertEqual(names, [
+            'asset_version.valid',
+            'asset_version.linear_versioning',
+            'asset_version.unique',
+        ])
+        self.assertFalse(DEFAULT_RULES.get('asset.valid').is_contextual)
+        self.assertEqual(
+            DEFAULT_RULES.get('asset.unique').requires, ('assets_by_code',))
+
+    def test_disable_rule_per_project(self):
+        """Test that disabling a rule only affects its project."""
+        other = Project("Other Project")
+        self.project.rules.disable('asset_version.linear_versioning')
+
+        result = self.project.add_asset_version(
+            AssetVersion("hero_character", "modeling", 3, "active"))
+        other_result = other.add_asset_version(
+            AssetVersion("hero_character", "modeling", 3, "active"))
+
+        self.assertTrue(result.success)
+        self.assertFalse(other_result.success)
+
+        self.project.rules.enable('asset_version.linear_versioning')
+        result = self.project.add_asset_version(
+            AssetVersion("hero_character", "modeling", 5, "active"))
+        self.assertFalse(result.success)
+
+    def test_disable_unknown_rule(self):
+        """Test that disabling an unknown rule raises KeyError."""
+        with self.assertRaises(KeyError):
+            self.project.rules.disable('asset.missing')
+
+    def test_custom_rule(self):
+        """Test that a studio rule added to a registry is enforced."""
+        registry = DEFAULT_RULES.copy()
+        registry.rule('asset.lowercase', 'asset')(_require_lowercase)
+        self.project.rules = RuleEngine(registry)
+
+        result = self._add("Hero")
+
+        self.assertFalse(result.success)
+        self.assertIn("must be lowercase", result.error_message)
+        self.assertTrue(self._add("villain").success)
+        self.assertIsNone(DEFAULT_RULES.get('asset.lowercase'))
+
+    def test_register_recompiles(self):
+        """Test that rules registered after compiling are picked up."""
+        registry = DEFAULT_RULES.copy()
+        self.project.rules = RuleEngine(registry)
+        self.assertTrue(self._add("Hero").success)
+
+        registry.register(Rule(
+            name='asset.lowercase', record_type='asset',
+            check=_require_lowercase))
+
+        self.assertFalse(self._add("Villain").success)
+
+    def test_register_validates_declarations(self):
+        """Test that unknown record types and indexes are rejected."""
+        registry = RuleRegistry()
+
+        with self.assertRaises(ValueError):
+            registry.register(Rule('a', 'shot', _require_lowercase))
+        with self.assertRaises(ValueError):
+            registry.register(Rule(
+                'b', 'asset', _require_lowercase, requires=('shots',)))
+
+    def test_timings(self):
+        """Test that per-rule timings are collected when enabled."""
+        self.project.rules.timing = True
+
+        self._add()
+        self._add()
+
+        timings = self.project.rules.timings()
+        self.assertEqual(timings['asset.valid'].calls, 2)
+        self.assertEqual(timings['asset.unique'].failures, 1)
+        self.assertEqual(
+            timings['asset_version.linear_versioning'].failures, 1)
+        self.assertGreaterEqual(timings['asset.unique'].seconds, 0.0)
+
+        self.project.rules.reset_timings()
+        self.assertEqual(self.project.rules.timings(), {})
+
+    def test_contextual_rules_can_be_skipped(self):
+        """Test that the intrinsic rules can run without the contextual
+        ones."""
+        check = self.project.rules.compile('asset_version', contextual=False)
+
+        self.assertTrue(check(
+            AssetVersion("hero_character", "modeling", 7, "active"),
+            self.project).success)
+        self.assertFalse(check(
+            AssetVersion("hero_character", "", 1, "active"),
+            self.project).success)
+
+
+if __name__ == '__main__':
+    unittest.main()
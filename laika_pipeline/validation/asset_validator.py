@@ -29,12 +29,7 @@ class AssetValidator:
             OperationResult: success=True if valid, otherwise False with
             message.
         """
-        versions = [
-            av for av in project.asset_versions
-            if av.asset == asset.code
-        ]
-
-        if not versions:
+        if not project.has_asset_versions(asset.code):
             return OperationResult(
                 success=False,
                 error_message=(
@@ -61,7 +56,7 @@ class AssetValidator:
             OperationResult: success=True if valid, otherwise False with
             message.
         """
-        if asset in project.assets:
+        if project.get_asset_by_code(asset.code) is not None:
             return OperationResult(
                 success=False,
                 error_message=(
@@ -36,12 +36,9 @@ class AssetVersionValidator:
                              message.
         """
 
-        # Collect all existing versions for this asset AND department
-        existing_versions = sorted(
-            av.version for av in project.asset_versions
-            if av.asset == asset_version.asset
-            and av.department == asset_version.department
-        )
+        # Existing versions for this asset AND department, sorted by version
+        existing_versions = project.get_department_versions(
+            asset_version.asset, asset_version.department)
 
         # If no versions exist yet for this department, the first version must
         # be 1
@@ -59,7 +56,7 @@ class AssetVersionValidator:
             return OperationResult(success=True)
 
         # Determine the expected next version
-        expected_next = existing_versions[-1] + 1
+        expected_next = existing_versions[-1].version + 1
 
         if asset_version.version != expected_next:
             return OperationResult(
@@ -80,7 +77,10 @@ class AssetVersionValidator:
             asset_version: AssetVersion,
             project: 'Project'
     ) -> OperationResult:
-        if asset_version in project.asset_versions:
+        if project.find_asset_version(
+                asset_version.asset,
+                asset_version.department,
+                asset_version.version) is not None:
             return OperationResult(
                 success=False,
                 error_message=(
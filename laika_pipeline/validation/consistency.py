@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Iterable
+
+from laika_pipeline.pipeline.asset import Asset
+from laika_pipeline.pipeline.asset_version import AssetVersion
+
+
+@dataclass(frozen=True)
+class Violation:
+    """
+    A consistency violation found by check_integrity().
+
+    Attributes:
+        rule (str): name of the validation rule the records violate, see
+                    validation/rules.py, or 'asset_version.orphan' for
+                    versions whose asset is missing
+        key (tuple): asset code, (asset code, department) or asset version
+                     key of the offending records
+        message (str): human readable description
+    """
+    rule: str
+    key: tuple
+    message: str
+
+
+@dataclass
+class IntegrityReport:
+    """
+    The result of check_integrity().
+
+    Attributes:
+        assets (int): number of assets checked
+        asset_versions (int): number of asset versions checked
+        violations (list[Violation]): every violation found
+    """
+    assets: int = 0
+    asset_versions: int = 0
+    violations: list[Violation] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.violations
+
+    def by_rule(self) -> dict[str, list[Violation]]:
+        """
+        Group the violations by rule name.
+        """
+        grouped = {}
+        for violation in self.violations:
+            grouped.setdefault(violation.rule, []).append(violation)
+        return grouped
+
+    def to_dict(self) -> dict:
+        return {
+            "ok": self.ok,
+            "assets": self.assets,
+            "asset_versions": self.asset_versions,
+            "violations": {
+                rule: [{"key": list(violation.key),
+                        "message": violation.message}
+                       for violation in violations]
+                for rule, violations in self.by_rule().items()
+            }
+        }
+
+
+def check_integrity(
+        assets: Iterable[Asset],
+        asset_versions: Iterable[AssetVersion],
+        pruned: Iterable[tuple[str, str, int]] = ()
+) -> IntegrityReport:
+    """
+    Check a whole set of records at once, instead of record by record as
+    they are added: unique assets and asset versions, linear versions per
+    department, versions whose asset is missing and assets with at least one
+    version.
+
+    Each record is visited once and only its key is kept, so the records can
+    be streamed from a storage backend. Runs in O(N), plus sorting the
+    version numbers of the departments that have gaps.
+
+    Args:
+        assets (Iterable[Asset]): the assets, e.g. of a project
+        asset_versions (Iterable[AssetVersion]): their asset versions
+        pruned (Iterable[tuple[str, str, int]]): keys of the asset versions
+                                                 deleted by retention, their
+                                                 numbers are not missing
+
+    Returns:
+        IntegrityReport: the record counts and violations
+    """
+    report = IntegrityReport()
+    violations = report.violations
+    # Version numbers per (asset code, department)
+    versions = {}
+    for asset_version in asset_versions:
+        report.asset_versions += 1
+        numbers = versions.get(
+            (asset_version.asset, asset_version.department))
+        if numbers is None:
+            numbers = versions[
+                (asset_version.asset, asset_version.department)] = set()
+        elif asset_version.version in numbers:
+            violations.append(Violation(
+                rule='asset_version.unique',
+                key=(asset_version.asset, asset_version.department,
+                     asset_version.version),
+                message=(
+                    f"Asset version for asset '{asset_version.asset}' "
+                    f"department '{asset_version.department}' version "
+                    f"'{asset_version.version}' is duplicated."
+                )
+            ))
+        numbers.add(asset_version.version)
+    for asset_code, department, version in pruned:
+        numbers = versions.get((asset_code, department))
+        if numbers is not None:
+            numbers.add(version)
+
+    versioned = set()
+    for (asset_code, department), numbers in versions.items():
+        versioned.add(asset_code)
+        # Unique numbers from 1 without gaps are exactly 1..len(numbers)
+        if min(numbers) == 1 and max(numbers) == len(numbers):
+            continue
+        violations.append(Violation(
+            rule='asset_version.linear_versioning',
+            key=(asset_code, department),
+            message=(
+                f"Asset '{asset_code}' in department '{department}' is "
+                f"missing versions {_format_ranges(_missing(numbers))}."
+            )
+        ))
+
+    seen = set()
+    for asset in assets:
+        report.assets += 1
+        if asset.code in seen:
+            violations.append(Violation(
+                rule='asset.unique',
+                key=(asset.code,),
+                message=f"Asset '{asset.code}' is duplicated."
+            ))
+            continue
+        seen.add(asset.code)
+        if asset.code not in versioned:
+            violations.append(Violation(
+                rule='asset.has_version',
+                key=(asset.code,),
+                message=f"Asset '{asset.code}' has no versions in the project."
+            ))
+
+    for asset_code in versioned - seen:
+        violations.append(Violation(
+            rule='asset_version.orphan',
+            key=(asset_code,),
+            message=f"Asset '{asset_code}' has versions but does not exist."
+        ))
+    return report
+
+
+def sweep(
+        assets: Iterable[Asset],
+        asset_versions: Iterable[AssetVersion],
+        pruned: Iterable[tuple[str, str, int]] = ()
+) -> list[Violation]:
+    """
+    Return the violations of check_integrity().
+    """
+    return check_integrity(assets, asset_versions, pruned).violations
+
+
+def _missing(numbers: set[int]) -> list[tuple[int, int]]:
+    """ Return the (first, last) ranges of version numbers missing from 1 to
+        the highest number, without materializing them.
+    """
+    missing = []
+    previous = 0
+    for number in sorted(numbers):
+        if number > previous + 1:
+            missing.append((previous + 1, number - 1))
+        previous = number
+    return missing
+
+
+def _format_ranges(ranges: list[tuple[int, int]]) -> str:
+    """ Format ranges compactly, e.g. [(2, 4), (7, 7)] as '2-4, 7'. """
+    return ', '.join(str(first) if first == last else f"{first}-{last}"
+                     for first, last in ranges)
@@ -0,0 +1,347 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Callable, TYPE_CHECKING
+
+from laika_pipeline.validation.operation_result import OperationResult
+from laika_pipeline.validation.asset_validator import AssetValidator
+from laika_pipeline.validation.asset_version_validator import (
+    AssetVersionValidator)
+
+if TYPE_CHECKING:
+    # Avoid circular imports for type hints
+    from laika_pipeline.pipeline.project import Project
+
+
+# Record types a rule can check
+RECORD_TYPES = ('asset', 'asset_version')
+# Project indexes a rule can declare it reads
+INDEXES = ('assets_by_code', 'versions_by_key', 'versions_by_asset')
+
+
+@dataclass(frozen=True)
+class Rule:
+    """
+    A validation rule for one record type.
+
+    Attributes:
+        name (str): unique name, used to enable or disable the rule
+        record_type (str): 'asset' or 'asset_version'
+        check (Callable): called with the record and the project, returns an
+                          OperationResult
+        requires (tuple[str]): Project indexes the check reads, see INDEXES.
+                               Rules requiring none only look at the record.
+        description (str): what the rule enforces
+    """
+    name: str
+    record_type: str
+    check: Callable[[object, 'Project'], OperationResult]
+    requires: tuple[str, ...] = ()
+    description: str = ''
+
+    @property
+    def is_contextual(self) -> bool:
+        """Whether the rule depends on the project's other records."""
+        return bool(self.requires)
+
+
+@dataclass
+class RuleTiming:
+    """
+    Counters of one rule, collected while RuleEngine.timing is on.
+
+    Attributes:
+        calls (int): records checked
+        failures (int): records rejected
+        seconds (float): total time spent in the check
+    """
+    calls: int = 0
+    failures: int = 0
+    seconds: float = 0.0
+
+
+class RuleRegistry:
+    """
+    An ordered set of rules. Rules run in registration order and the first
+    failure rejects the record.
+    """
+
+    def __init__(self, rules: list[Rule] | None = None):
+        self._rules = {}
+        # Bumped on every change so engines know to recompile
+        self.generation = 0
+        for rule in rules or []:
+            self.register(rule)
+
+    def register(self, rule: Rule) -> Rule:
+        """
+        Add a rule, replacing any rule with the same name in place.
+
+        Raises:
+            ValueError: if the record type or a required index is unknown
+        """
+        if rule.record_type not in RECORD_TYPES:
+            raise ValueError(
+                f"Unknown record type '{rule.record_type}', expected one of "
+                f"{', '.join(RECORD_TYPES)}")
+        unknown = [index for index in rule.requires if index not in INDEXES]
+        if unknown:
+            raise ValueError(
+                f"Rule '{rule.name}' requires unknown indexes: "
+                f"{', '.join(unknown)}")
+        self._rules[rule.name] = rule
+        self.generation += 1
+        return rule
+
+    def unregister(self, name: str) -> None:
+        """
+        Remove a rule.
+
+        Raises:
+            KeyError: if no rule has this name
+        """
+        del self._rules[name]
+        self.generation += 1
+
+    def rule(
+            self,
+            name: str,
+            record_type: str,
+            requires: tuple[str, ...] = (),
+            description: str = ''
+    ) -> Callable:
+        """
+        Decorator registering a check function as a rule.
+
+        Example:
+            >>> @DEFAULT_RULES.rule('asset.lowercase', 'asset')
+            ... def asset_lowercase(asset, project):
+            ...     return OperationResult(success=asset.name.islower())
+        """
+        def decorator(check: Callable) -> Callable:
+            self.register(Rule(
+                name=name,
+                record_type=record_type,
+                check=check,
+                requires=tuple(requires),
+                description=description or (check.__doc__ or '').strip()
+            ))
+            return check
+        return decorator
+
+    def get(self, name: str) -> Rule | None:
+        return self._rules.get(name)
+
+    def rules(self, record_type: str | None = None) -> list[Rule]:
+        """
+        Return the rules in order, optionally only those of a record type.
+        """
+        return [rule for rule in self._rules.values()
+                if record_type is None or rule.record_type == record_type]
+
+    def copy(self) -> RuleRegistry:
+        return RuleRegistry(self.rules())
+
+
+class RuleEngine:
+    """
+    Runs the rules of a registry for one project. Rules can be disabled per
+    engine, and the enabled rules of each record type are compiled into a
+    single check function, rebuilt only when the rule set changes.
+    """
+
+    def __init__(self, registry: RuleRegistry | None = None):
+        """
+        Args:
+            registry (RuleRegistry): the rules to run. Defaults to
+                                     DEFAULT_RULES, shared by every project.
+        """
+        self.registry = registry if registry is not None else DEFAULT_RULES
+        self._disabled = set()
+        self._timing = False
+        self._timings = {}
+        # (record type, contextual) -> (registry generation, check function)
+        self._compiled = {}
+
+    @property
+    def timing(self) -> bool:
+        """Whether checks record per-rule timings, off by default."""
+        return self._timing
+
+    @timing.setter
+    def timing(self, value: bool) -> None:
+        self._timing = bool(value)
+        self._compiled.clear()
+
+    def enable(self, name: str) -> None:
+        """
+        Enable a rule disabled with disable().
+        """
+        self._disabled.discard(name)
+        self._compiled.clear()
+
+    def disable(self, name: str) -> None:
+        """
+        Disable a rule for this engine only.
+
+        Raises:
+            KeyError: if the registry has no rule with this name
+        """
+        if self.registry.get(name) is None:
+            raise KeyError(f"Unknown rule: {name}")
+        self._disabled.add(name)
+        self._compiled.clear()
+
+    def is_enabled(self, name: str) -> bool:
+        return name not in self._disabled
+
+    def active_rules(
+            self,
+            record_type: str,
+            contextual: bool = True
+    ) -> list[Rule]:
+        """
+        Return the enabled rules of a record type, in order.
+
+        Args:
+            record_type (str): 'asset' or 'asset_version'
+            contextual (bool): include the rules requiring project indexes
+        """
+        return [rule for rule in self.registry.rules(record_type)
+                if rule.name not in self._disabled
+                and (contextual or not rule.is_contextual)]
+
+    def check(
+            self,
+            record_type: str,
+            record,
+            project: 'Project',
+            contextual: bool = True
+    ) -> OperationResult:
+        """
+        Run the enabled rules of a record type on a record.
+
+        Returns:
+            OperationResult: the first failure, or success
+        """
+        return self.compile(record_type, contextual)(record, project)
+
+    def compile(
+            self,
+            record_type: str,
+            contextual: bool = True
+    ) -> Callable[[object, 'Project'], OperationResult]:
+        """
+        Return the check function running the enabled rules of a record type.
+        """
+        key = (record_type, contextual)
+        compiled = self._compiled.get(key)
+        if compiled is not None and compiled[0] == self.registry.generation:
+            return compiled[1]
+        rules = self.active_rules(record_type, contextual)
+        if self._timing:
+            check = self._compile_timed(rules)
+        else:
+            check = _compile(tuple(rule.check for rule in rules))
+        self._compiled[key] = (self.registry.generation, check)
+        return check
+
+    def timings(self) -> dict[str, RuleTiming]:
+        """
+        Return a copy of the per-rule counters, by rule name.
+        """
+        return {name: RuleTiming(timing.calls, timing.failures, timing.seconds)
+                for name, timing in self._timings.items()}
+
+    def reset_timings(self) -> None:
+        self._timings = {}
+        self._compiled.clear()
+
+    def _compile_timed(self, rules: list[Rule]) -> Callable:
+        checks = tuple(
+            (rule.check, self._timings.setdefault(rule.name, RuleTiming()))
+            for rule in rules
+        )
+        clock = time.perf_counter
+
+        def check(record, project) -> OperationResult:
+            for rule_check, timing in checks:
+                start = clock()
+                result = rule_check(record, project)
+                timing.seconds += clock() - start
+                timing.calls += 1
+                if not result.success:
+                    timing.failures += 1
+                    return result
+            return OperationResult(success=True)
+        return check
+
+
+def _compile(checks: tuple[Callable, ...]) -> Callable:
+    """ Build the check function of a rule set. A single rule is returned
+        as is, saving a call per record.
+    """
+    if not checks:
+        return lambda record, project: OperationResult(success=True)
+    if len(checks) == 1:
+        return checks[0]
+
+    def check(record, project) -> OperationResult:
+        for rule_check in checks:
+            result = rule_check(record, project)
+            if not result.success:
+                return result
+        return result
+    return check
+
+
+# ------------------------------------------------------------------------------
+# Built-in rules
+# ------------------------------------------------------------------------------
+
+_asset_validator = AssetValidator()
+_asset_version_validator = AssetVersionValidator()
+
+DEFAULT_RULES = RuleRegistry([
+    Rule(
+        name='asset.valid',
+        record_type='asset',
+        check=lambda asset, project: asset.validate(),
+        description="Name and type are valid"
+    ),
+    Rule(
+        name='asset.has_version',
+        record_type='asset',
+        check=_asset_validator.validate_asset_has_version,
+        requires=('versions_by_asset',),
+        description="The asset has at least one version in the project"
+    ),
+    Rule(
+        name='asset.unique',
+        record_type='asset',
+        check=_asset_validator.validate_asset_is_unique,
+        requires=('assets_by_code',),
+        description="No asset with the same name and type exists"
+    ),
+    Rule(
+        name='asset_version.valid',
+        record_type='asset_version',
+        check=lambda asset_version, project: asset_version.validate(),
+        description="Asset code, department, version and status are valid"
+    ),
+    Rule(
+        name='asset_version.linear_versioning',
+        record_type='asset_version',
+        check=_asset_version_validator.validate_linear_versioning,
+        requires=('versions_by_asset',),
+        description="Versions start at 1 and increase without gaps"
+    ),
+    Rule(
+        name='asset_version.unique',
+        record_type='asset_version',
+        check=_asset_version_validator.validate_version_is_unique,
+        requires=('versions_by_key',),
+        description="No version with the same key exists"
+    ),
+])